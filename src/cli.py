@@ -0,0 +1,324 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Junly文件转换工具 - 命令行入口
+
+不依赖图形界面，可在服务器和容器中使用，例如：
+
+    python -m cli convert pdf_to_text "reports/**/*.pdf" -o out -j 8 --json
+    python -m cli convert image_format_convert photos -o out --option target_format=webp
+    python -m cli watch pdf_to_text inbox -o out -j 4
+    python -m cli list
+
+版权所有 (c) 2025 Junly
+"""
+
+import os
+import sys
+import json
+import glob
+import time
+import argparse
+import logging
+import contextlib
+
+# 将源代码目录添加到系统路径，支持在项目根目录下以 python -m src.cli 运行
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.insert(0, current_dir)
+
+# 注意：命令行入口不能导入PyQt6及界面模块，转换器在确定转换类型后才导入
+from core.batch.batch_scheduler import (
+    BatchScheduler, CONVERSION_OUTPUT_EXTENSIONS, create_converter,
+    get_input_extensions, get_output_path
+)
+from core.batch.sync_manifest import SKIPPED_MESSAGE, SyncManifest
+from core.batch.folder_watcher import FolderWatcher
+from core.cache.result_cache import ResultCache
+
+
+def parse_option(text):
+    """解析 key=value 形式的转换选项，值按JSON解析，解析失败时作为字符串"""
+    if "=" not in text:
+        raise argparse.ArgumentTypeError(f"选项格式应为 key=value: {text}")
+
+    key, value = text.split("=", 1)
+    try:
+        value = json.loads(value)
+    except ValueError:
+        pass
+    return key.strip(), value
+
+
+def get_pattern_root(pattern):
+    """返回输入路径中第一个含通配符部分之前的目录，不含通配符时返回None"""
+    if not glob.has_magic(pattern):
+        return None
+    root = pattern
+    while glob.has_magic(root):
+        root = os.path.dirname(root)
+    return root or "."
+
+
+def collect_input_files(patterns, conversion_type):
+    """展开输入路径
+
+    支持通配符（含 ** 递归匹配），目录会递归添加其中符合转换类型的文件。
+    同时返回每个文件相对于所在目录或通配符起始目录的子目录，
+    输出时保持这一结构，不同子目录中的同名文件不会写到同一个输出文件
+
+    Returns:
+        list: (文件路径, 相对子目录) 列表，直接指定的文件的相对子目录为 "."
+    """
+    extensions = get_input_extensions(conversion_type)
+    files = []
+    seen = set()
+
+    for pattern in patterns:
+        pattern_root = get_pattern_root(pattern)
+        matches = sorted(glob.glob(pattern, recursive=True)) or [pattern]
+        for path in matches:
+            if os.path.isdir(path):
+                root = path if pattern_root is None else pattern_root
+                candidates = []
+                for walk_root, _, names in os.walk(path):
+                    for name in names:
+                        if os.path.splitext(name)[1].lower() in extensions:
+                            candidates.append(os.path.join(walk_root, name))
+                candidates.sort()
+            else:
+                root = os.path.dirname(path) if pattern_root is None else pattern_root
+                candidates = [path]
+
+            for file_path in candidates:
+                if file_path not in seen:
+                    seen.add(file_path)
+                    relative_dir = os.path.relpath(os.path.dirname(file_path) or ".", root or ".")
+                    files.append((file_path, relative_dir))
+
+    return files
+
+
+def run_convert(args):
+    """执行批量转换命令"""
+    if args.conversion_type not in CONVERSION_OUTPUT_EXTENSIONS:
+        print(f"不支持的转换类型: {args.conversion_type}", file=sys.stderr)
+        return 2
+
+    files = collect_input_files(args.inputs, args.conversion_type)
+    if not files:
+        print("没有找到符合条件的输入文件", file=sys.stderr)
+        return 2
+
+    missing = [path for path, _ in files if not os.path.exists(path)]
+    if missing:
+        print(f"输入文件不存在: {', '.join(missing)}", file=sys.stderr)
+        return 2
+
+    options = dict(args.option or [])
+
+    jobs = []
+    inputs_by_output = {}
+    for file_path, relative_dir in files:
+        output_dir = os.path.normpath(os.path.join(args.output_dir, relative_dir))
+        output_path = get_output_path(file_path, output_dir, args.conversion_type, options)
+        jobs.append((file_path, output_path))
+        inputs_by_output.setdefault(os.path.normcase(os.path.abspath(output_path)), []).append(file_path)
+
+    # 分别指定的同名文件仍会写到同一个输出路径，后转换的会覆盖先转换的
+    conflicts = [paths for paths in inputs_by_output.values() if len(paths) > 1]
+    if conflicts:
+        details = "; ".join(", ".join(paths) for paths in conflicts)
+        print(f"多个输入文件的输出路径相同: {details}", file=sys.stderr)
+        return 2
+
+    for _, output_path in jobs:
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+
+    results = []
+
+    def on_result(index, success, message):
+        input_path, output_path = jobs[index]
+        results.append({
+            "input": input_path,
+            "output": output_path,
+            "success": success,
+            "message": message,
+        })
+        # 增量同步时未变化的文件只在最后汇总，不逐个输出
+        if not args.json and message != SKIPPED_MESSAGE:
+            status = message if success else f"失败 - {message}"
+            print(f"[{index + 1}/{len(jobs)}] {input_path} -> {output_path}: {status}")
+
+    start_time = time.time()
+
+    # JSON模式下转换器及依赖库的打印信息转到标准错误，保证标准输出只有JSON结果
+    redirect = contextlib.redirect_stdout(sys.stderr) if args.json else contextlib.nullcontext()
+    with redirect:
+        converter = create_converter(args.conversion_type)
+        cache = None if args.no_cache else ResultCache(args.cache_dir, args.cache_size * 1024 * 1024)
+        manifest = None
+        if args.sync:
+            # 只删除本次指定的目录、通配符起始目录和文件范围内已删除文件的输出
+            roots = [get_pattern_root(pattern) or pattern for pattern in args.inputs]
+            manifest = SyncManifest(args.output_dir, args.conversion_type, options, roots)
+        scheduler = BatchScheduler(converter, args.conversion_type, options, args.jobs, cache, manifest)
+        scheduler.run(jobs, result_callback=on_result)
+
+    elapsed = time.time() - start_time
+
+    failed = sum(1 for result in results if not result["success"])
+    if args.json:
+        report = {
+            "conversion_type": args.conversion_type,
+            "output_dir": args.output_dir,
+            "total": len(results),
+            "succeeded": len(results) - failed,
+            "failed": failed,
+            "elapsed": round(elapsed, 3),
+            "results": results,
+        }
+        if manifest:
+            report["sync"] = {
+                "converted": len(manifest.converted),
+                "skipped": len(manifest.skipped),
+                "pruned": manifest.pruned,
+            }
+        json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+        sys.stdout.write("\n")
+    else:
+        print(f"完成: 成功 {len(results) - failed} 个，失败 {failed} 个，耗时 {elapsed:.2f} 秒")
+        if manifest:
+            print(manifest.summary())
+
+    return 1 if failed else 0
+
+
+def run_watch(args):
+    """执行监控目录命令，按 Ctrl+C 停止"""
+    if args.conversion_type not in CONVERSION_OUTPUT_EXTENSIONS:
+        print(f"不支持的转换类型: {args.conversion_type}", file=sys.stderr)
+        return 2
+
+    missing = [path for path in args.directories if not os.path.isdir(path)]
+    if missing:
+        print(f"监控目录不存在: {', '.join(missing)}", file=sys.stderr)
+        return 2
+
+    options = dict(args.option or [])
+    counts = {"succeeded": 0, "failed": 0}
+
+    def on_result(input_path, output_path, success, message):
+        counts["succeeded" if success else "failed"] += 1
+        if args.json:
+            # 每个文件输出一行JSON，便于其他程序逐行读取
+            line = json.dumps({
+                "input": input_path,
+                "output": output_path,
+                "success": success,
+                "message": message,
+            }, ensure_ascii=False)
+        else:
+            status = message if success else f"失败 - {message}"
+            line = f"{input_path} -> {output_path}: {status}"
+        print(line, flush=True)
+
+    redirect = contextlib.redirect_stdout(sys.stderr) if args.json else contextlib.nullcontext()
+    with redirect:
+        converter = create_converter(args.conversion_type)
+
+    watcher = FolderWatcher(
+        converter, args.conversion_type, args.directories, args.output_dir, options,
+        args.jobs, polling=args.poll
+    )
+    if not args.json:
+        print(f"正在监控 {', '.join(args.directories)}，按 Ctrl+C 停止", flush=True)
+
+    try:
+        watcher.run(result_callback=on_result)
+    except KeyboardInterrupt:
+        # run() 退出前已等待提交的任务完成
+        watcher.stop()
+
+    if not args.json:
+        print(f"已停止: 成功 {counts['succeeded']} 个，失败 {counts['failed']} 个")
+    return 0
+
+
+def run_list(args):
+    """列出支持的转换类型"""
+    for conversion_type in CONVERSION_OUTPUT_EXTENSIONS:
+        extensions = " ".join(get_input_extensions(conversion_type))
+        print(f"{conversion_type:<28} {extensions}")
+    return 0
+
+
+def build_parser():
+    """创建命令行参数解析器"""
+    parser = argparse.ArgumentParser(
+        prog="file-converter",
+        description="Junly文件转换工具命令行版本"
+    )
+    parser.add_argument("-v", "--verbose", action="store_true", help="在标准错误输出中显示详细日志")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    convert_parser = subparsers.add_parser("convert", help="批量转换文件")
+    convert_parser.add_argument("conversion_type", help="转换类型，使用 list 命令查看全部类型")
+    convert_parser.add_argument("inputs", nargs="+", help="输入文件、目录或通配符")
+    convert_parser.add_argument("-o", "--output-dir", required=True, help="输出目录")
+    convert_parser.add_argument(
+        "-j", "--jobs", type=int, default=os.cpu_count() or 1, help="并发数，默认为CPU核心数"
+    )
+    convert_parser.add_argument(
+        "--option", type=parse_option, action="append", metavar="KEY=VALUE",
+        help="转换选项，例如 target_format=png、quality=80，可多次指定"
+    )
+    convert_parser.add_argument("--json", action="store_true", help="以JSON格式输出结果")
+    convert_parser.add_argument(
+        "--sync", action="store_true",
+        help="增量同步：只转换新增或修改的文件，并删除已删除文件的输出"
+    )
+    convert_parser.add_argument("--no-cache", action="store_true", help="不使用转换结果缓存")
+    convert_parser.add_argument("--cache-dir", help="转换结果缓存目录，默认为 ~/.file-converter/cache")
+    convert_parser.add_argument(
+        "--cache-size", type=int, default=1024, metavar="MB", help="转换结果缓存的容量上限，默认1024MB"
+    )
+    convert_parser.set_defaults(func=run_convert)
+
+    watch_parser = subparsers.add_parser("watch", help="监控目录，新文件写完后自动转换")
+    watch_parser.add_argument("conversion_type", help="转换类型，使用 list 命令查看全部类型")
+    watch_parser.add_argument("directories", nargs="+", help="监控的输入目录，子目录一并监控")
+    watch_parser.add_argument("-o", "--output-dir", required=True, help="输出目录")
+    watch_parser.add_argument(
+        "-j", "--jobs", type=int, default=os.cpu_count() or 1, help="并发数，默认为CPU核心数"
+    )
+    watch_parser.add_argument(
+        "--option", type=parse_option, action="append", metavar="KEY=VALUE",
+        help="转换选项，例如 target_format=png、quality=80，可多次指定"
+    )
+    watch_parser.add_argument("--poll", action="store_true", help="使用定时扫描代替inotify")
+    watch_parser.add_argument("--json", action="store_true", help="每个文件输出一行JSON结果")
+    watch_parser.set_defaults(func=run_watch)
+
+    list_parser = subparsers.add_parser("list", help="列出支持的转换类型")
+    list_parser.set_defaults(func=run_list)
+
+    return parser
+
+
+def main(argv=None):
+    """命令行入口函数"""
+    args = build_parser().parse_args(argv)
+
+    # 日志输出到标准错误，避免干扰JSON结果
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        stream=sys.stderr,
+        format="[%(asctime)s] [%(levelname)s] - %(message)s"
+    )
+
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
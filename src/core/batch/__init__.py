@@ -0,0 +1,6 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Junly文件转换工具 - 批量处理模块
+版权所有 (c) 2025 Junly
+"""
\ No newline at end of file
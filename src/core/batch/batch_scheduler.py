@@ -0,0 +1,520 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Junly文件转换工具 - 批量转换调度器
+版权所有 (c) 2025 Junly
+"""
+
+import os
+import logging
+import importlib
+from concurrent.futures import (
+    ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+)
+
+from .sync_manifest import SKIPPED_MESSAGE
+# 预设模块不依赖Pillow，命令行入口导入调度器时不会加载图片库
+from ..image.pipeline_presets import get_pipeline_extension, get_pipeline_operations
+
+# 与界面共用同一个日志记录器，日志写入应用日志文件
+logger = logging.getLogger("file-converter")
+
+# 各转换类型的输出文件扩展名
+CONVERSION_OUTPUT_EXTENSIONS = {
+    "word_to_markdown": ".md",
+    "word_to_html": ".html",
+    "word_remove_images": ".docx",
+    "word_to_text": ".txt",
+    "excel_to_txt": ".txt",
+    "excel_to_markdown": ".md",
+    "markdown_to_word": ".docx",
+    "markdown_tables_to_excel": ".xlsx",
+    "pdf_to_word": ".docx",
+    "pdf_to_text": ".txt",
+    "pdf_extract_images": "",  # 将创建一个图片目录
+    "image_format_convert": "",  # 根据目标格式确定
+    "image_resize": "",  # 保持原格式
+    "image_compress": "",  # 保持原格式
+    "image_pipeline": "",  # 根据组合处理的格式操作确定
+    "text_encoding_convert": ".txt",
+    "text_to_html": ".html",
+    "text_to_markdown": ".md",
+    "text_batch_replace": ".txt"
+}
+
+# 各转换类型支持的输入文件扩展名
+CONVERSION_INPUT_EXTENSIONS = {
+    "word_to_markdown": [".docx", ".doc"],
+    "word_to_html": [".docx", ".doc"],
+    "word_remove_images": [".docx", ".doc"],
+    "word_to_text": [".docx", ".doc"],
+    "excel_to_txt": [".xlsx", ".xls"],
+    "excel_to_markdown": [".xlsx", ".xls"],
+    "markdown_to_word": [".md"],
+    "markdown_tables_to_excel": [".md"],
+    "pdf_to_word": [".pdf"],
+    "pdf_to_text": [".pdf"],
+    "pdf_extract_images": [".pdf"],
+    "image_format_convert": [".jpg", ".jpeg", ".png", ".bmp", ".tiff"],
+    "image_resize": [".jpg", ".jpeg", ".png", ".bmp", ".tiff"],
+    "image_compress": [".jpg", ".jpeg", ".png", ".bmp", ".tiff"],
+    "image_pipeline": [".jpg", ".jpeg", ".png", ".bmp", ".tiff", ".webp"],
+    "text_encoding_convert": [".txt"],
+    "text_to_html": [".txt"],
+    "text_to_markdown": [".txt"],
+    "text_batch_replace": [".txt"]
+}
+
+# 各类转换使用的转换器（模块, 类名），按转换类型前缀区分
+# 首次使用时才导入，只用到一种转换时不会加载其他转换器的依赖库
+CONVERTER_CLASSES = {
+    "word": ("..word.word_converter", "WordConverter"),
+    "excel": ("..excel.excel_converter", "ExcelConverter"),
+    "markdown": ("..markdown.markdown_converter", "MarkdownConverter"),
+    "pdf": ("..pdf.pdf_converter", "PDFConverter"),
+    "image": ("..image.image_processor", "ImageProcessor"),
+    "text": ("..text.text_processor", "TextProcessor"),
+}
+
+# 各类转换的并发限制，按转换类型前缀区分
+# executor: 执行方式，process为进程池，thread为线程池
+# cpu_bound: 是否为CPU密集型，CPU密集型的并发数不超过CPU核心数
+CONVERSION_LIMITS = {
+    "word": {"executor": "process", "cpu_bound": True},
+    "excel": {"executor": "process", "cpu_bound": True},
+    "markdown": {"executor": "process", "cpu_bound": True},
+    "pdf": {"executor": "process", "cpu_bound": True},
+    "image": {"executor": "process", "cpu_bound": True},
+    # 文本处理主要受磁盘I/O限制，线程池即可，并发数只受批处理线程数约束
+    "text": {"executor": "thread", "cpu_bound": False},
+}
+
+# 每个工作者最多预先提交的任务数，避免一次性提交上万个任务
+TASKS_PER_WORKER = 2
+
+
+def get_output_extension(conversion_type):
+    """根据转换类型获取输出文件扩展名"""
+    return CONVERSION_OUTPUT_EXTENSIONS.get(conversion_type, "")
+
+
+def get_input_extensions(conversion_type):
+    """根据转换类型获取支持的输入文件扩展名"""
+    return CONVERSION_INPUT_EXTENSIONS.get(conversion_type, [])
+
+
+def get_output_path(input_path, output_dir, conversion_type, options=None):
+    """构建单个文件的输出路径"""
+    options = options or {}
+    name_without_ext = os.path.splitext(os.path.basename(input_path))[0]
+
+    if conversion_type == "pdf_extract_images":
+        # 为图片创建独立目录
+        return os.path.join(output_dir, f"{name_without_ext}_images")
+    if conversion_type == "image_format_convert":
+        target_format = options.get("target_format", "jpg").lower()
+        return os.path.join(output_dir, f"{name_without_ext}.{target_format}")
+    if conversion_type in ("image_resize", "image_compress"):
+        # 保持原格式
+        return os.path.join(output_dir, os.path.basename(input_path))
+    if conversion_type == "image_pipeline":
+        extension = get_pipeline_extension(get_pipeline_operations(options), input_path)
+        return os.path.join(output_dir, f"{name_without_ext}{extension}")
+
+    return os.path.join(output_dir, f"{name_without_ext}{get_output_extension(conversion_type)}")
+
+
+def create_converter(conversion_type):
+    """创建转换类型对应的转换器"""
+    category = conversion_type.split("_", 1)[0]
+    if category not in CONVERTER_CLASSES:
+        raise Exception(f"不支持的转换类型: {conversion_type}")
+
+    module_name, class_name = CONVERTER_CLASSES[category]
+    module = importlib.import_module(module_name, __package__)
+    return getattr(module, class_name)()
+
+
+def prepare_converter(converter, conversion_type, options):
+    """在提交任务前完成转换器的一次性设置
+
+    线程池中的任务共用同一个转换器对象，需要在提交任务前设置好，避免并发修改
+    """
+    if conversion_type == "text_batch_replace":
+        # 使用之前设置的替换规则
+        if not getattr(converter, "replace_rules", None):
+            # 如果没有设置替换规则，尝试从选项中获取并设置
+            rules_text = options.get("replace_rules", "")
+            if rules_text:
+                converter.set_replace_rules(rules_text)
+
+
+def run_conversion(converter, conversion_type, input_path, output_path, options, outputs=None):
+    """调用转换器的对应方法
+
+    模块级函数，可以提交到进程池中执行
+
+    Args:
+        outputs (list): 传入时追加实际写出的输出路径，与 output_path 不同时才追加，
+            例如多工作表的Excel转Markdown为每个工作表生成的文件
+
+    Returns:
+        bool: 是否成功
+    """
+    # 文本处理功能
+    if conversion_type == "text_encoding_convert":
+        # 编码转换
+        target_encoding = options.get("target_encoding", "UTF-8")
+        return converter.convert_encoding(input_path, output_path, target_encoding)
+
+    elif conversion_type == "text_to_html":
+        # 转换为HTML
+        return converter.text_to_html(input_path, output_path)
+
+    elif conversion_type == "text_to_markdown":
+        # 转换为Markdown
+        return converter.text_to_markdown(input_path, output_path)
+
+    elif conversion_type == "text_batch_replace":
+        # 批量替换
+        prepare_converter(converter, conversion_type, options)
+        if not getattr(converter, "replace_rules", None):
+            logger.error("未设置替换规则")
+            return False
+
+        return converter.batch_replace(input_path, output_path)
+
+    # Word转换功能
+    elif conversion_type == "word_to_markdown":
+        # 读取文档
+        doc = converter.read_word(input_path)
+        # 转换为Markdown
+        return converter.save_as_markdown(
+            doc, output_path,
+            options.get("include_images", True),
+            max_workers=1
+        )
+
+    elif conversion_type == "word_to_html":
+        # 读取文档
+        doc = converter.read_word(input_path)
+        # 转换为HTML
+        return converter.save_as_html(
+            doc, output_path,
+            options.get("include_images", True),
+            max_workers=1
+        )
+
+    elif conversion_type == "word_remove_images":
+        # 移除图片
+        return converter.remove_images(input_path, output_path)
+
+    elif conversion_type == "word_to_text":
+        # 读取文档
+        doc = converter.read_word(input_path)
+        # 转换为文本
+        return converter.save_as_text(doc, output_path)
+
+    # Excel转换功能
+    elif conversion_type == "excel_to_txt":
+        workbook = converter.read_excel(input_path)
+        try:
+            return converter.save_as_txt(workbook, output_path, options.get("delimiter", "\t"))
+        finally:
+            workbook.close()
+
+    elif conversion_type == "excel_to_markdown":
+        workbook = converter.read_excel(input_path)
+        try:
+            # 批量处理时已按文件并行，单个文件内不再启动进程池
+            result = converter.save_as_markdown(workbook, output_path, max_workers=1)
+            if outputs is not None:
+                outputs.extend(path for _, path in converter.get_markdown_outputs(workbook, output_path))
+            return result
+        finally:
+            workbook.close()
+
+    # Markdown转换功能
+    elif conversion_type == "markdown_to_word":
+        md_content = converter.read_markdown(input_path)
+        return converter.to_word(md_content, output_path)
+
+    elif conversion_type == "markdown_tables_to_excel":
+        md_content = converter.read_markdown(input_path)
+        return converter.extract_tables_to_excel(md_content, output_path)
+
+    # PDF转换功能
+    elif conversion_type in ("pdf_to_word", "pdf_to_text", "pdf_extract_images"):
+        pdf = converter.read_pdf(input_path)
+        try:
+            if conversion_type == "pdf_to_word":
+                return converter.to_word(
+                    pdf, output_path,
+                    options.get("include_images", True),
+                    save_image_files=options.get("save_image_files", True)
+                )
+            elif conversion_type == "pdf_to_text":
+                # 批量处理时已按文件并行，单个文件内不再启动进程池
+                return converter.to_text(pdf, output_path, max_workers=1)
+            else:
+                converter.extract_images(pdf, output_path)
+                return True
+        finally:
+            pdf.close()
+
+    # 图片处理功能
+    elif conversion_type == "image_format_convert":
+        return converter.convert_format(
+            input_path, output_path, options.get("target_format", "jpg")
+        )
+
+    elif conversion_type == "image_resize":
+        return converter.resize_image(
+            input_path, output_path,
+            options.get("width", 0), options.get("height", 0),
+            options.get("keep_aspect_ratio", True)
+        )
+
+    elif conversion_type == "image_compress":
+        converter.compress_image(input_path, output_path, options.get("quality", 85))
+        return True
+
+    elif conversion_type == "image_pipeline":
+        # 组合处理，使用预设或自定义的操作列表
+        converter.process_pipeline(input_path, output_path, get_pipeline_operations(options))
+        return True
+
+    # 其他转换类型暂未实现
+    logger.warning(f"未实现的转换类型: {conversion_type}")
+    return False
+
+
+def _run_job(converter, conversion_type, input_path, output_path, options):
+    """执行单个转换任务，返回 (成功标志, 消息, 实际写出的输出路径列表)"""
+    outputs = []
+    if run_conversion(converter, conversion_type, input_path, output_path, options, outputs):
+        return True, "成功", outputs or [output_path]
+    return False, "处理失败", []
+
+
+class BatchScheduler:
+    """批量转换调度器
+
+    按 batch_threads 配置的并发数调度转换任务：CPU密集型的转换提交到进程池并受CPU
+    核心数限制，文本处理提交到线程池。结果按文件顺序回调，stop() 后不再提交新任务，
+    已在执行的任务完成后再返回。设置了结果缓存时，命中缓存的文件直接复制缓存的结果，
+    设置了同步清单时，自上次同步后未变化的文件直接跳过，都不再提交转换任务。
+    """
+
+    def __init__(self, converter, conversion_type, options=None, max_workers=4, cache=None, manifest=None):
+        """初始化调度器
+
+        Args:
+            converter: 转换器对象
+            conversion_type (str): 转换类型
+            options (dict): 转换选项
+            max_workers (int): 最大并发数，通常来自 batch_threads 配置
+            cache (ResultCache): 转换结果缓存，为None时不使用缓存
+            manifest (SyncManifest): 增量同步清单，为None时转换全部文件
+        """
+        self.converter = converter
+        self.conversion_type = conversion_type
+        self.options = options or {}
+        self.max_workers = max(1, int(max_workers or 1))
+        self.cache = cache
+        self.manifest = manifest
+        self.running = True
+        # 文件索引 -> 缓存键，转换成功后按该键写入缓存
+        self._cache_keys = {}
+
+    def get_limits(self):
+        """获取当前转换类型的并发限制"""
+        category = self.conversion_type.split("_", 1)[0]
+        return CONVERSION_LIMITS.get(category, {"executor": "thread", "cpu_bound": False})
+
+    def get_worker_count(self, job_count):
+        """计算实际使用的并发数"""
+        workers = self.max_workers
+        if self.get_limits()["cpu_bound"]:
+            workers = min(workers, os.cpu_count() or 1)
+        return max(1, min(workers, job_count))
+
+    def stop(self):
+        """停止调度，已在执行的任务会继续完成"""
+        self.running = False
+
+    def run(self, jobs, result_callback=None, progress_callback=None):
+        """执行批量转换
+
+        Args:
+            jobs (list): (输入路径, 输出路径) 列表
+            result_callback (function): 结果回调，参数为 (文件索引, 成功标志, 消息)，按文件顺序调用
+            progress_callback (function): 进度回调，参数为 (已完成数, 总数)
+
+        Returns:
+            int: 已处理的文件数
+        """
+        if not jobs:
+            return 0
+
+        prepare_converter(self.converter, self.conversion_type, self.options)
+        self._cache_keys = {}
+
+        try:
+            workers = self.get_worker_count(len(jobs))
+            if workers == 1:
+                return self._run_serial(jobs, result_callback, progress_callback)
+            return self._run_parallel(jobs, workers, result_callback, progress_callback)
+        finally:
+            if self.cache:
+                self.cache.log_stats()
+            if self.manifest:
+                self._finish_sync()
+
+    def _run_parallel(self, jobs, workers, result_callback=None, progress_callback=None):
+        """在进程池或线程池中处理文件"""
+        if self.get_limits()["executor"] == "process":
+            executor = ProcessPoolExecutor(max_workers=workers)
+        else:
+            executor = ThreadPoolExecutor(max_workers=workers)
+
+        in_flight = {}  # future -> 文件索引
+        finished = {}  # 已完成但还不能按顺序回调的结果
+        next_submit = 0
+        next_report = 0
+        completed = 0
+
+        try:
+            while True:
+                # 保持有限数量的任务在队列中，停止后不再提交新任务
+                while (self.running and next_submit < len(jobs)
+                       and len(in_flight) < workers * TASKS_PER_WORKER):
+                    input_path, output_path = jobs[next_submit]
+                    resolved = self._resolve_before_run(next_submit, input_path, output_path)
+                    if resolved:
+                        finished[next_submit] = resolved
+                        next_submit += 1
+                        completed += 1
+                        if progress_callback:
+                            progress_callback(completed, len(jobs))
+                        continue
+
+                    future = executor.submit(
+                        _run_job, self.converter, self.conversion_type,
+                        input_path, output_path, self.options
+                    )
+                    in_flight[future] = next_submit
+                    next_submit += 1
+
+                # 按文件顺序回调结果
+                while next_report in finished:
+                    success, message, _ = finished.pop(next_report)
+                    if result_callback:
+                        result_callback(next_report, success, message)
+                    next_report += 1
+
+                if not in_flight:
+                    break
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = in_flight.pop(future)
+                    finished[index] = self._get_result(future, jobs[index][0])
+                    self._after_run(index, finished[index], *jobs[index])
+                    completed += 1
+
+                    # 更新进度
+                    if progress_callback:
+                        progress_callback(completed, len(jobs))
+        finally:
+            # 出错时取消已提交但尚未开始的任务
+            for future in in_flight:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+        return completed
+
+    def _run_serial(self, jobs, result_callback=None, progress_callback=None):
+        """在当前线程中逐个处理文件"""
+        completed = 0
+        for i, (input_path, output_path) in enumerate(jobs):
+            if not self.running:
+                break
+
+            resolved = self._resolve_before_run(i, input_path, output_path)
+            if resolved:
+                success, message, _ = resolved
+            else:
+                try:
+                    result = _run_job(
+                        self.converter, self.conversion_type, input_path, output_path, self.options
+                    )
+                except Exception as e:
+                    logger.exception(f"处理文件失败: {input_path}")
+                    result = False, str(e), []
+                success, message, _ = result
+                self._after_run(i, result, input_path, output_path)
+
+            completed += 1
+            if result_callback:
+                result_callback(i, success, message)
+            if progress_callback:
+                progress_callback(completed, len(jobs))
+
+        return completed
+
+    def _resolve_before_run(self, index, input_path, output_path):
+        """提交任务前检查同步清单和缓存
+
+        Returns:
+            tuple: 不需要转换时返回 (成功标志, 消息, 输出路径列表)，否则返回None
+        """
+        if self.manifest and self.manifest.is_unchanged(input_path, output_path, self.converter):
+            return True, SKIPPED_MESSAGE, []
+
+        if self.cache:
+            key = self.cache.make_key(
+                self.converter, self.conversion_type, input_path, output_path, self.options
+            )
+            outputs = self.cache.restore(key, output_path)
+            if outputs:
+                self._record_sync(input_path, output_path, outputs)
+                return True, "成功（缓存）", outputs
+            self._cache_keys[index] = key
+
+        return None
+
+    def _after_run(self, index, result, input_path, output_path):
+        """转换成功后写入缓存并记录到同步清单"""
+        key = self._cache_keys.pop(index, None)
+        success, _, outputs = result
+        if not success:
+            return
+        if key:
+            self.cache.store(key, output_path, outputs)
+        self._record_sync(input_path, output_path, outputs)
+
+    def _record_sync(self, input_path, output_path, outputs=None):
+        if not self.manifest:
+            return
+        try:
+            self.manifest.record(input_path, output_path, outputs, self.converter)
+        except OSError as e:
+            logger.warning(f"记录同步清单失败: {input_path}: {str(e)}")
+
+    def _finish_sync(self):
+        """删除已删除文件的输出并保存同步清单"""
+        try:
+            self.manifest.prune()
+            self.manifest.save()
+        except OSError as e:
+            logger.error(f"保存同步清单失败: {self.manifest.path}: {str(e)}")
+        logger.info(self.manifest.summary())
+
+    def _get_result(self, future, input_path):
+        """获取任务结果，任务异常时转换为失败结果"""
+        try:
+            return future.result()
+        except Exception as e:
+            logger.error(f"处理文件失败: {input_path}: {str(e)}")
+            return False, str(e), []
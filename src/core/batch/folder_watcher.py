@@ -0,0 +1,394 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Junly文件转换工具 - 监控目录自动转换
+版权所有 (c) 2025 Junly
+"""
+
+import os
+import sys
+import time
+import struct
+import select
+import logging
+import threading
+import ctypes
+import ctypes.util
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from .batch_scheduler import (
+    CONVERSION_LIMITS, TASKS_PER_WORKER, _run_job, get_input_extensions, get_output_path,
+    prepare_converter
+)
+
+logger = logging.getLogger("file-converter")
+
+# 文件最后一次变化后保持不变的时间（秒），超过后才认为已写完
+DEBOUNCE_SECONDS = 0.3
+
+# 轮询模式的扫描间隔（秒）
+POLL_INTERVAL = 0.5
+
+# inotify 事件掩码
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+# struct inotify_event 的固定部分：wd, mask, cookie, len
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class _BaseWatcher:
+    """目录监控的公共部分：过滤文件类型并对写入中的文件去抖
+
+    文件需要先被标记为已写完（inotify 的关闭写入或移入事件，轮询模式下为大小和修改时间
+    不再变化），并且在 DEBOUNCE_SECONDS 内没有新的变化，才会作为新文件返回
+    """
+
+    def __init__(self, directories, extensions, exclude_dirs=None, debounce=DEBOUNCE_SECONDS):
+        self.directories = [os.path.abspath(directory) for directory in directories]
+        self.extensions = {extension.lower() for extension in extensions}
+        self.exclude_dirs = [os.path.abspath(directory) for directory in exclude_dirs or []]
+        self.debounce = debounce
+        # 文件路径 -> [最后变化时间, 是否已写完, 变化时的(大小, 修改时间)]
+        self.pending = {}
+
+    def accepts(self, path):
+        """判断文件是否需要处理"""
+        if os.path.splitext(path)[1].lower() not in self.extensions:
+            return False
+        # 排除输出目录，避免输出文件再次触发转换
+        return not any(
+            path == directory or path.startswith(directory + os.sep) for directory in self.exclude_dirs
+        )
+
+    @staticmethod
+    def _stat_key(path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def touch(self, path, closed, now=None):
+        """记录文件的一次变化"""
+        if not self.accepts(path):
+            return
+        self.pending[path] = [now or time.monotonic(), closed, self._stat_key(path)]
+
+    def collect_ready(self, now=None):
+        """返回已写完且去抖时间内没有再变化的文件"""
+        now = now or time.monotonic()
+        ready = []
+        for path, (changed_at, closed, stat_key) in list(self.pending.items()):
+            if not closed or now - changed_at < self.debounce:
+                continue
+
+            current = self._stat_key(path)
+            if current is None:
+                # 文件已被删除或移走
+                del self.pending[path]
+            elif current != stat_key:
+                # 去抖期间又有写入，重新计时
+                self.pending[path] = [now, closed, current]
+            else:
+                del self.pending[path]
+                ready.append(path)
+        return sorted(ready)
+
+    def iter_files(self):
+        """遍历所有监控目录中符合条件的文件"""
+        for directory in self.directories:
+            for root, dirs, files in os.walk(directory):
+                dirs[:] = [name for name in dirs if self.accepts_dir(os.path.join(root, name))]
+                for name in files:
+                    path = os.path.join(root, name)
+                    if self.accepts(path):
+                        yield path
+
+    def accepts_dir(self, path):
+        return path not in self.exclude_dirs
+
+    def next_timeout(self, default):
+        """下一次需要检查去抖状态的等待时间"""
+        if any(closed for _, closed, _ in self.pending.values()):
+            return min(default, self.debounce / 2)
+        return default
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher(_BaseWatcher):
+    """基于 Linux inotify 的目录监控，文件关闭后立即得到通知"""
+
+    def __init__(self, directories, extensions, exclude_dirs=None, debounce=DEBOUNCE_SECONDS):
+        super().__init__(directories, extensions, exclude_dirs, debounce)
+
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, f"inotify初始化失败: {os.strerror(error)}")
+
+        # 监控描述符 -> 目录
+        self._watches = {}
+        # 新建子目录中可能已有文件，需要补充扫描
+        self._rescan_dirs = []
+        # 上一次成功读取事件的时间，事件队列溢出时据此查找丢失事件的文件
+        self._last_read = time.time()
+        try:
+            for directory in self.directories:
+                self._add_tree(directory)
+        except OSError:
+            self.close()
+            raise
+
+    def _add_watch(self, directory):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, f"无法监控目录 {directory}: {os.strerror(error)}")
+        self._watches[wd] = directory
+
+    def _add_tree(self, directory):
+        """监控目录及其所有子目录"""
+        for root, dirs, _ in os.walk(directory):
+            dirs[:] = [name for name in dirs if self.accepts_dir(os.path.join(root, name))]
+            self._add_watch(root)
+
+    def wait(self, timeout):
+        """等待事件，返回已写完的新文件列表"""
+        readable, _, _ = select.select([self._fd], [], [], self.next_timeout(timeout))
+        if readable:
+            self._read_events()
+
+        # 新建的子目录在开始监控之前可能已经写入了文件
+        while self._rescan_dirs:
+            directory = self._rescan_dirs.pop()
+            for root, _, files in os.walk(directory):
+                for name in files:
+                    self.touch(os.path.join(root, name), closed=True)
+
+        return self.collect_ready()
+
+    def _read_events(self):
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return
+
+        now = time.monotonic()
+        last_read, self._last_read = self._last_read, time.time()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                # 事件队列溢出，部分事件丢失，重新扫描监控目录中上次读取后变化过的文件
+                # （移入的文件保留原修改时间，但状态改变时间会更新）
+                logger.warning("监控事件过多，部分事件丢失，重新扫描监控目录")
+                for path in self.iter_files():
+                    try:
+                        changed = os.stat(path).st_ctime >= last_read - 1
+                    except OSError:
+                        continue
+                    if changed:
+                        self.touch(path, closed=True, now=now)
+                continue
+            if mask & IN_IGNORED:
+                self._watches.pop(wd, None)
+                continue
+
+            directory = self._watches.get(wd)
+            if directory is None or not name:
+                continue
+            path = os.path.join(directory, name)
+
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO) and self.accepts_dir(path):
+                    try:
+                        self._add_tree(path)
+                        self._rescan_dirs.append(path)
+                    except OSError as e:
+                        logger.warning(str(e))
+                continue
+
+            # 只有关闭写入和移入才表示文件已写完，修改事件只重新计时
+            self.touch(path, closed=bool(mask & (IN_CLOSE_WRITE | IN_MOVED_TO)), now=now)
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class PollingWatcher(_BaseWatcher):
+    """定时扫描目录的监控方式，用于不支持 inotify 的系统
+
+    无法得知文件何时被关闭，大小和修改时间在一个扫描间隔加去抖时间内不再变化时认为已写完
+    """
+
+    def __init__(self, directories, extensions, exclude_dirs=None, debounce=DEBOUNCE_SECONDS,
+                 interval=POLL_INTERVAL):
+        super().__init__(directories, extensions, exclude_dirs, debounce)
+        self.interval = interval
+        # 已存在的文件不处理，只记录其状态
+        self._known = {path: self._stat_key(path) for path in self.iter_files()}
+
+    def wait(self, timeout):
+        """等待一个扫描间隔，返回已写完的新文件列表"""
+        time.sleep(min(timeout, self.interval))
+
+        now = time.monotonic()
+        for path in self.iter_files():
+            stat_key = self._stat_key(path)
+            if stat_key is not None and self._known.get(path) != stat_key:
+                self._known[path] = stat_key
+                self.touch(path, closed=True, now=now)
+
+        return self.collect_ready()
+
+
+def create_watcher(directories, extensions, exclude_dirs=None, polling=False):
+    """创建目录监控，Linux上优先使用inotify，不可用时改为轮询"""
+    if not polling and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(directories, extensions, exclude_dirs)
+        except (OSError, AttributeError) as e:
+            logger.warning(f"inotify不可用，改为定时扫描: {str(e)}")
+    return PollingWatcher(directories, extensions, exclude_dirs)
+
+
+class FolderWatcher:
+    """监控目录，新文件写完后自动转换
+
+    转换任务按 CONVERSION_LIMITS 提交到进程池或线程池，同时在执行和排队的任务数有上限，
+    达到上限时暂停提交，直到有任务完成（背压），避免大量文件同时到达时占满内存。
+    """
+
+    def __init__(self, converter, conversion_type, directories, output_dir, options=None,
+                 max_workers=None, polling=False):
+        """初始化目录监控
+
+        Args:
+            converter: 转换器对象
+            conversion_type (str): 转换类型
+            directories (list): 监控的输入目录，子目录一并监控
+            output_dir: 输出目录，保持输入文件相对于监控目录的子目录结构
+            options (dict): 转换选项
+            max_workers (int): 最大并发数，默认为CPU核心数
+            polling (bool): 是否强制使用轮询方式
+        """
+        self.converter = converter
+        self.conversion_type = conversion_type
+        self.directories = [os.path.abspath(directory) for directory in directories]
+        self.output_dir = os.path.abspath(output_dir)
+        self.options = options or {}
+        self.max_workers = max(1, int(max_workers or os.cpu_count() or 1))
+        self.polling = polling
+        self.running = True
+        self._slots = threading.BoundedSemaphore(self.max_workers * TASKS_PER_WORKER)
+
+    def get_output_path(self, input_path):
+        """构建输出路径，保持相对于监控目录的子目录结构"""
+        for directory in self.directories:
+            if input_path.startswith(directory + os.sep):
+                relative_dir = os.path.relpath(os.path.dirname(input_path), directory)
+                output_dir = os.path.normpath(os.path.join(self.output_dir, relative_dir))
+                break
+        else:
+            output_dir = self.output_dir
+
+        os.makedirs(output_dir, exist_ok=True)
+        return get_output_path(input_path, output_dir, self.conversion_type, self.options)
+
+    def stop(self):
+        """停止监控，已提交的任务完成后 run() 返回"""
+        self.running = False
+
+    def run(self, result_callback=None, ready_callback=None):
+        """开始监控，直到调用 stop()
+
+        Args:
+            result_callback (function): 结果回调，参数为 (输入路径, 输出路径, 成功标志, 消息)，
+                在任务完成的线程中调用
+            ready_callback (function): 开始监控后调用，无参数
+        """
+        prepare_converter(self.converter, self.conversion_type, self.options)
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        watcher = create_watcher(
+            self.directories, get_input_extensions(self.conversion_type), [self.output_dir], self.polling
+        )
+        category = self.conversion_type.split("_", 1)[0]
+        limits = CONVERSION_LIMITS.get(category, {"executor": "thread", "cpu_bound": False})
+        if limits["executor"] == "process":
+            executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        else:
+            executor = ThreadPoolExecutor(max_workers=self.max_workers)
+
+        logger.info(
+            f"开始监控目录（{type(watcher).__name__}）: {', '.join(self.directories)} -> {self.output_dir}"
+        )
+        if ready_callback:
+            ready_callback()
+
+        try:
+            while self.running:
+                for input_path in watcher.wait(POLL_INTERVAL):
+                    if not self._acquire_slot():
+                        break
+                    self._submit(executor, input_path, result_callback)
+        finally:
+            watcher.close()
+            executor.shutdown(wait=True)
+            logger.info("已停止监控目录")
+
+    def _acquire_slot(self):
+        """等待空闲的任务位置，停止监控时返回False"""
+        while self.running:
+            if self._slots.acquire(timeout=POLL_INTERVAL):
+                return True
+        return False
+
+    def _submit(self, executor, input_path, result_callback):
+        try:
+            output_path = self.get_output_path(input_path)
+            future = executor.submit(
+                _run_job, self.converter, self.conversion_type, input_path, output_path, self.options
+            )
+        except Exception as e:
+            self._slots.release()
+            logger.error(f"提交转换任务失败: {input_path}: {str(e)}")
+            if result_callback:
+                result_callback(input_path, "", False, str(e))
+            return
+
+        def on_done(done_future):
+            self._slots.release()
+            try:
+                success, message, _ = done_future.result()
+            except Exception as e:
+                success, message = False, str(e)
+
+            if success:
+                logger.info(f"已转换: {input_path} -> {output_path}")
+            else:
+                logger.error(f"转换失败: {input_path}: {message}")
+            if result_callback:
+                result_callback(input_path, output_path, success, message)
+
+        future.add_done_callback(on_done)
@@ -0,0 +1,219 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Junly文件转换工具 - 增量同步清单
+版权所有 (c) 2025 Junly
+"""
+
+import os
+import json
+import shutil
+import logging
+
+from ..cache.result_cache import SIDECAR_SUFFIXES, file_sha256, get_converter_version
+
+logger = logging.getLogger("file-converter")
+
+# 清单文件格式版本，格式变化时递增，旧清单作废
+MANIFEST_VERSION = 2
+
+# 每记录该数量的文件保存一次清单，中途中断时已完成的文件不必重新转换
+SAVE_INTERVAL = 500
+
+# 增量同步跳过文件时的结果消息
+SKIPPED_MESSAGE = "未变化，已跳过"
+
+
+class SyncManifest:
+    """增量同步清单
+
+    每个输出目录的每种转换类型保存一份清单，记录已转换文件的路径、大小、修改时间、
+    内容哈希、输出路径、实际写出的全部输出文件（如多工作表Excel的各工作表文件）
+    以及转换器的类名和 CACHE_VERSION。
+    再次同步时只转换新增或修改过的文件：大小和修改时间都未变化时直接跳过；
+    变化时再比较内容哈希，内容相同（如只是被touch）的文件同样跳过。
+    转换器或其版本与记录不同的文件重新转换，转换选项变化时清单作废，全部重新转换。
+    输入文件已被删除的，删除其输出文件，只处理本次同步扫描的输入范围内的文件，
+    同一输出目录中其他输入目录（例如暂时未挂载的目录）的输出不受影响。
+    """
+
+    def __init__(self, output_dir, conversion_type, options=None, roots=None):
+        """初始化并加载清单
+
+        Args:
+            output_dir: 输出目录，清单保存在该目录下
+            conversion_type (str): 转换类型
+            options (dict): 转换选项
+            roots (list): 本次同步扫描的输入目录或文件，prune() 只删除其中已删除文件的输出；
+                为None时只处理本次检查过的输入文件所在的目录（不含子目录）
+        """
+        self.output_dir = os.path.abspath(output_dir)
+        self.conversion_type = conversion_type
+        self.options = json.loads(json.dumps(options or {}, sort_keys=True, default=repr))
+        self.path = os.path.join(self.output_dir, f".sync-{conversion_type}.json")
+        self.roots = None if roots is None else [os.path.abspath(root) for root in roots]
+
+        # 输入文件绝对路径 -> {"size", "mtime_ns", "hash", "output", "outputs", "converter", "converter_version"}
+        self.entries = {}
+        self._unsaved = 0
+        # 本次检查过的输入文件所在的目录，未指定 roots 时作为删除输出的范围
+        self._checked_dirs = set()
+
+        # 本次同步的统计
+        self.skipped = []
+        self.converted = []
+        self.pruned = []
+
+        self.load()
+
+    def load(self):
+        """加载清单，清单不存在、损坏或转换选项不同时从空清单开始"""
+        if not os.path.exists(self.path):
+            return
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"读取同步清单失败，将重新转换全部文件: {self.path}: {str(e)}")
+            return
+
+        if data.get("version") != MANIFEST_VERSION or data.get("options") != self.options:
+            logger.info(f"转换选项已变化，将重新转换全部文件: {self.path}")
+            return
+
+        self.entries = data.get("files", {})
+
+    def save(self):
+        """保存清单，先写临时文件再重命名，中断时不会留下损坏的清单"""
+        data = {
+            "version": MANIFEST_VERSION,
+            "conversion_type": self.conversion_type,
+            "options": self.options,
+            "files": self.entries,
+        }
+        os.makedirs(self.output_dir, exist_ok=True)
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(temp_path, self.path)
+        self._unsaved = 0
+
+    def is_unchanged(self, input_path, output_path, converter=None):
+        """判断文件自上次转换后是否未变化，未变化的文件本次跳过
+
+        Args:
+            input_path: 输入文件路径
+            output_path: 输出路径
+            converter: 转换器对象，与记录的转换器或版本不同时重新转换
+        """
+        key = os.path.abspath(input_path)
+        self._checked_dirs.add(os.path.dirname(key))
+        entry = self.entries.get(key)
+        if entry is None or entry["output"] != os.path.abspath(output_path):
+            return False
+        if converter is not None and self._converter_fields(converter) != {
+            "converter": entry.get("converter"),
+            "converter_version": entry.get("converter_version"),
+        }:
+            return False
+        if not all(os.path.exists(path) for path in entry["outputs"]):
+            return False
+
+        try:
+            stat = os.stat(input_path)
+        except OSError:
+            return False
+
+        if stat.st_size == entry["size"] and stat.st_mtime_ns == entry["mtime_ns"]:
+            self.skipped.append(input_path)
+            return True
+
+        # 修改时间变化但内容可能相同，比较内容哈希
+        if stat.st_size != entry["size"] or file_sha256(input_path) != entry["hash"]:
+            return False
+
+        entry["mtime_ns"] = stat.st_mtime_ns
+        self._mark_changed()
+        self.skipped.append(input_path)
+        return True
+
+    def record(self, input_path, output_path, outputs=None, converter=None):
+        """记录转换成功的文件
+
+        Args:
+            input_path: 输入文件路径
+            output_path: 输出路径
+            outputs (list): 实际写出的输出路径，为None时只有 output_path
+            converter: 完成转换的转换器对象
+        """
+        stat = os.stat(input_path)
+        entry = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "hash": file_sha256(input_path),
+            "output": os.path.abspath(output_path),
+            "outputs": [os.path.abspath(path) for path in (outputs or [output_path])],
+        }
+        if converter is not None:
+            entry.update(self._converter_fields(converter))
+        self.entries[os.path.abspath(input_path)] = entry
+        self.converted.append(input_path)
+        self._mark_changed()
+
+    @staticmethod
+    def _converter_fields(converter):
+        name, version = get_converter_version(converter)
+        return {"converter": name, "converter_version": version}
+
+    def _mark_changed(self):
+        self._unsaved += 1
+        if self._unsaved >= SAVE_INTERVAL:
+            self.save()
+
+    def prune(self):
+        """删除本次同步范围内已不存在的输入文件对应的输出
+
+        Returns:
+            list: 已删除的输出路径
+        """
+        for input_path in list(self.entries):
+            if os.path.exists(input_path) or not self._in_scope(input_path):
+                continue
+
+            paths = []
+            for output_path in self.entries.pop(input_path)["outputs"]:
+                stem = os.path.splitext(output_path)[0]
+                paths.append(output_path)
+                paths.extend(stem + suffix for suffix in SIDECAR_SUFFIXES)
+
+            for path in paths:
+                # 只删除输出目录中的文件
+                if os.path.commonpath([self.output_dir, path]) != self.output_dir:
+                    continue
+                if os.path.isdir(path):
+                    shutil.rmtree(path, ignore_errors=True)
+                elif os.path.exists(path):
+                    os.remove(path)
+                else:
+                    continue
+                self.pruned.append(path)
+            self._unsaved += 1
+
+        return self.pruned
+
+    def _in_scope(self, input_path):
+        """判断输入文件是否在本次同步扫描的范围内"""
+        if self.roots is None:
+            return os.path.dirname(input_path) in self._checked_dirs
+        return any(
+            input_path == root or input_path.startswith(os.path.join(root, ""))
+            for root in self.roots
+        )
+
+    def summary(self):
+        """本次同步的统计说明"""
+        return (
+            f"增量同步: 转换{len(self.converted)}个，跳过未变化的{len(self.skipped)}个，"
+            f"删除已删除文件的输出{len(self.pruned)}个"
+        )
@@ -0,0 +1,335 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Junly文件转换工具 - 转换结果缓存
+版权所有 (c) 2025 Junly
+"""
+
+import os
+import json
+import time
+import uuid
+import shutil
+import hashlib
+import logging
+import threading
+from pathlib import Path
+
+logger = logging.getLogger("file-converter")
+
+# 默认缓存目录，与配置文件在同一目录下
+DEFAULT_CACHE_DIR = Path.home() / ".file-converter" / "cache"
+
+# 默认缓存容量上限
+DEFAULT_MAX_SIZE = 1024 * 1024 * 1024
+
+# 超出容量后清理到上限的该比例，避免每次写入都触发清理
+EVICT_TARGET_RATIO = 0.9
+
+# 计算文件哈希时每次读取的字节数
+HASH_BLOCK_SIZE = 1024 * 1024
+
+# 缓存条目的格式版本，条目布局变化时递增
+CACHE_FORMAT_VERSION = 2
+
+# 与输出文件一起生成的附属目录后缀，例如PDF转Word时另存的图片目录
+SIDECAR_SUFFIXES = ("_images",)
+
+# 缓存条目中保存输出文件和附属目录的子目录
+FILES_DIR = "files"
+
+# 缓存条目中记录输出文件名列表的文件
+OUTPUTS_NAME = "outputs.json"
+
+
+def file_sha256(file_path):
+    """计算文件内容的SHA-256，按块读取，不会一次性载入大文件"""
+    sha = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def get_converter_version(converter):
+    """返回转换器的类名和 CACHE_VERSION，转换结果的格式变化时转换器递增版本"""
+    return type(converter).__name__, getattr(converter, "CACHE_VERSION", 1)
+
+
+class ResultCache:
+    """按内容寻址的转换结果缓存
+
+    缓存键由输入文件内容的SHA-256、转换类型、转换选项、转换器版本和输出文件名计算，
+    输入文件内容或任一参数变化都会得到新的键。每个条目是缓存目录下的一个子目录，
+    保存转换写出的全部输出文件（如多工作表Excel的各工作表文件）及其附属目录，
+    先写入临时目录再整体重命名，其他进程不会读到写了一半的条目。
+    命中时复制（或硬链接）缓存的输出，总大小超过上限时按最近使用时间清理最旧的条目。
+    """
+
+    def __init__(self, cache_dir=None, max_size=DEFAULT_MAX_SIZE, hardlink=False):
+        """初始化缓存
+
+        Args:
+            cache_dir: 缓存目录，默认为 ~/.file-converter/cache
+            max_size (int): 缓存总大小上限（字节）
+            hardlink (bool): 命中时是否以硬链接代替复制。硬链接与缓存共用同一份数据，
+                直接修改输出文件会同时修改缓存，只适合输出不会被原地修改的场景
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else DEFAULT_CACHE_DIR
+        self.max_size = max_size
+        self.hardlink = hardlink
+
+        # 文件路径、大小和修改时间 -> 内容哈希，同一文件不重复计算
+        self._digests = {}
+        # 缓存目录当前的总大小，首次写入时统计
+        self._total_size = None
+        self._lock = threading.Lock()
+
+        # 统计信息
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def file_digest(self, file_path):
+        """计算文件内容的SHA-256"""
+        stat = os.stat(file_path)
+        memo_key = (os.path.realpath(file_path), stat.st_size, stat.st_mtime_ns)
+        digest = self._digests.get(memo_key)
+        if digest is None:
+            digest = file_sha256(file_path)
+            self._digests[memo_key] = digest
+        return digest
+
+    def make_key(self, converter, conversion_type, input_path, output_path, options=None):
+        """计算缓存键
+
+        转换器可以定义 CACHE_VERSION 类属性，转换结果的格式变化时递增使旧条目失效；
+        结果还依赖转换器内部状态（如替换规则）时，转换器可以提供 get_cache_state() 方法
+
+        Returns:
+            str: 缓存键，输入文件无法读取时返回None
+        """
+        try:
+            digest = self.file_digest(input_path)
+        except OSError:
+            return None
+
+        get_state = getattr(converter, "get_cache_state", None)
+        converter_name, converter_version = get_converter_version(converter)
+        key_data = {
+            "format": CACHE_FORMAT_VERSION,
+            "input": digest,
+            "conversion_type": conversion_type,
+            "converter": converter_name,
+            "version": converter_version,
+            "state": get_state() if get_state else None,
+            "options": options or {},
+            # Markdown等输出中引用附属目录时使用输出文件名，文件名也要一致
+            "output_name": os.path.basename(output_path),
+        }
+        text = json.dumps(key_data, sort_keys=True, ensure_ascii=False, default=repr)
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def _entry_dir(self, key):
+        return self.cache_dir / key[:2] / key
+
+    @staticmethod
+    def _with_sidecars(names):
+        """输出文件名及其附属目录名"""
+        for name in names:
+            yield name
+            stem = os.path.splitext(name)[0]
+            for suffix in SIDECAR_SUFFIXES:
+                yield stem + suffix
+
+    def restore(self, key, output_path):
+        """将缓存的结果复制到输出路径所在的目录
+
+        Returns:
+            list: 恢复的输出路径，未命中时返回None
+        """
+        if key is None:
+            return None
+
+        entry_dir = self._entry_dir(key)
+        output_dir = os.path.dirname(output_path)
+        try:
+            if not (entry_dir / OUTPUTS_NAME).exists():
+                with self._lock:
+                    self.misses += 1
+                return None
+
+            with open(entry_dir / OUTPUTS_NAME, "r", encoding="utf-8") as f:
+                names = json.load(f)
+            for name in self._with_sidecars(names):
+                cached = entry_dir / FILES_DIR / name
+                if cached.exists():
+                    self._copy(cached, os.path.join(output_dir, name))
+
+            # 更新使用时间，清理时按该时间淘汰
+            now = time.time()
+            os.utime(entry_dir, (now, now))
+        except (OSError, ValueError) as e:
+            # 条目可能正在被其他进程清理，按未命中处理
+            logger.warning(f"读取转换缓存失败: {output_path}: {str(e)}")
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return [os.path.join(output_dir, name) for name in names]
+
+    def store(self, key, output_path, outputs=None):
+        """将转换结果写入缓存，失败时只记录日志，不影响转换结果
+
+        Args:
+            key: make_key 计算的缓存键
+            output_path: 输出路径
+            outputs (list): 实际写出的输出路径，为None时只有 output_path
+
+        Returns:
+            bool: 是否写入
+        """
+        if key is None:
+            return False
+
+        outputs = outputs or [output_path]
+        output_dir = os.path.dirname(os.path.abspath(output_path))
+        names = [os.path.basename(path) for path in outputs]
+        for path in outputs:
+            # 恢复时按文件名写回输出目录，不在该目录中的输出无法缓存
+            if not os.path.exists(path) or os.path.dirname(os.path.abspath(path)) != output_dir:
+                logger.info(f"输出文件不存在或不在输出目录中，不写入转换缓存: {path}")
+                return False
+
+        entry_dir = self._entry_dir(key)
+        temp_dir = self.cache_dir / f"tmp-{uuid.uuid4().hex}"
+        try:
+            (temp_dir / FILES_DIR).mkdir(parents=True)
+            for name in self._with_sidecars(names):
+                source = os.path.join(output_dir, name)
+                # 附属目录只在存在时缓存
+                if name in names or os.path.isdir(source):
+                    self._copy_into_cache(source, temp_dir / FILES_DIR / name)
+            with open(temp_dir / OUTPUTS_NAME, "w", encoding="utf-8") as f:
+                json.dump(names, f, ensure_ascii=False)
+
+            size = self._tree_size(temp_dir)
+            entry_dir.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                os.replace(temp_dir, entry_dir)
+            except OSError:
+                # 其他进程已写入相同的条目
+                shutil.rmtree(temp_dir, ignore_errors=True)
+                return False
+        except OSError as e:
+            logger.warning(f"写入转换缓存失败: {output_path}: {str(e)}")
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            return False
+
+        with self._lock:
+            self.stores += 1
+            if self._total_size is not None:
+                self._total_size += size
+        self._evict_if_needed()
+        return True
+
+    def _copy(self, source, target):
+        """将缓存中的文件或目录复制到输出位置"""
+        copy_function = self._link_or_copy if self.hardlink else shutil.copy2
+        if os.path.isdir(source):
+            if os.path.isdir(target):
+                shutil.rmtree(target)
+            shutil.copytree(source, target, copy_function=copy_function)
+        else:
+            os.makedirs(os.path.dirname(os.path.abspath(target)), exist_ok=True)
+            if os.path.exists(target):
+                os.remove(target)
+            copy_function(source, target)
+
+    def _copy_into_cache(self, source, target):
+        """将输出复制到缓存，缓存中的数据不能与输出共用，始终复制"""
+        if os.path.isdir(source):
+            shutil.copytree(source, target)
+        else:
+            shutil.copy2(source, target)
+
+    @staticmethod
+    def _link_or_copy(source, target):
+        try:
+            os.link(source, target)
+        except OSError:
+            # 跨文件系统等情况无法创建硬链接
+            shutil.copy2(source, target)
+
+    @staticmethod
+    def _tree_size(path):
+        total = 0
+        for root, _, files in os.walk(path):
+            for name in files:
+                try:
+                    total += os.path.getsize(os.path.join(root, name))
+                except OSError:
+                    pass
+        return total
+
+    def _list_entries(self):
+        """返回 (使用时间, 大小, 目录) 列表"""
+        entries = []
+        if not self.cache_dir.exists():
+            return entries
+        for bucket in self.cache_dir.iterdir():
+            if not bucket.is_dir() or bucket.name.startswith("tmp-"):
+                continue
+            for entry_dir in bucket.iterdir():
+                try:
+                    entries.append((entry_dir.stat().st_mtime, self._tree_size(entry_dir), entry_dir))
+                except OSError:
+                    pass
+        return entries
+
+    def _evict_if_needed(self):
+        """总大小超过上限时按最近使用时间清理最旧的条目"""
+        with self._lock:
+            if self._total_size is not None and self._total_size <= self.max_size:
+                return
+
+            entries = self._list_entries()
+            total = sum(size for _, size, _ in entries)
+            if total > self.max_size:
+                target = self.max_size * EVICT_TARGET_RATIO
+                for _, size, entry_dir in sorted(entries, key=lambda entry: entry[0]):
+                    if total <= target:
+                        break
+                    shutil.rmtree(entry_dir, ignore_errors=True)
+                    total -= size
+                    self.evictions += 1
+            self._total_size = total
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            shutil.rmtree(self.cache_dir, ignore_errors=True)
+            self._total_size = 0
+
+    def get_stats(self):
+        """获取统计信息"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "stores": self.stores,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def log_stats(self):
+        """将统计信息写入日志"""
+        stats = self.get_stats()
+        logger.info(
+            f"转换缓存: 命中{stats['hits']}次，未命中{stats['misses']}次，"
+            f"命中率{stats['hit_rate']:.0%}，写入{stats['stores']}个，清理{stats['evictions']}个"
+        )
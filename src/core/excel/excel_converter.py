@@ -6,25 +6,49 @@ Junly文件转换工具 - Excel转换核心模块
 """
 
 import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import openpyxl
 from openpyxl.utils import get_column_letter
+from openpyxl.worksheet._read_only import ReadOnlyWorksheet
 import pandas as pd
 import logging
+from .tabular_workbook import TabularSheet, TabularWorkbook
+
+# 多工作表并行导出Markdown的最小文件大小，较小的文件启动进程的开销大于收益
+PARALLEL_MIN_FILE_SIZE = 1024 * 1024
+
+
+def _export_sheet_markdown(file_path, sheet_name, output_path):
+    """在工作进程中以只读模式打开工作簿，将指定工作表导出为Markdown
+    
+    openpyxl工作簿不能跨进程共享，每个工作进程独立打开文件
+    """
+    workbook = openpyxl.load_workbook(file_path, data_only=True, read_only=True, keep_links=False)
+    try:
+        ExcelConverter()._save_sheet_markdown(workbook, sheet_name, output_path)
+    finally:
+        workbook.close()
+    return sheet_name
+
 
 class ExcelConverter:
     """Excel文档转换类"""
     
+    CACHE_VERSION = 1  # 转换结果缓存版本
+    
     def __init__(self):
         """初始化Excel转换器"""
         self.logger = logging.getLogger(__name__)
     
-    def read_excel(self, file_path):
+    def read_excel(self, file_path, read_only=True):
         """读取Excel文档
         
-        尝试多种方法读取Excel文件，增强兼容性
+        尝试多种方法读取Excel文件，增强兼容性。默认以只读模式打开，
+        工作表按行流式读取，内存占用与表格大小无关；使用完毕后应调用 close() 关闭工作簿
         
         Args:
             file_path: Excel文件路径
+            read_only: 是否优先使用只读流式模式，失败时会尝试另一种模式
             
         Returns:
             openpyxl.Workbook: Excel工作簿对象
@@ -34,89 +58,32 @@ class ExcelConverter:
         """
         error_messages = []
         
-        # 方法1: 使用openpyxl直接读取
-        try:
-            self.logger.info(f"尝试使用openpyxl直接读取: {file_path}")
-            return openpyxl.load_workbook(file_path, data_only=True)
-        except Exception as e:
-            error_msg = f"openpyxl直接读取失败: {str(e)}"
-            self.logger.warning(error_msg)
-            error_messages.append(error_msg)
-            
-            # 特殊处理：如果错误消息包含"wildcard"，可能是文件格式问题
-            if "wildcard" in str(e).lower():
-                self.logger.warning("检测到wildcard错误，可能是Excel文件中有通配符或特殊字符")
-        
-        # 方法2: 使用openpyxl的read_only模式并设置use_iterators=True读取
-        try:
-            self.logger.info(f"尝试使用openpyxl read_only模式读取: {file_path}")
-            # 增加ignore_workbook_corruption=True参数尝试修复损坏的文件
-            return openpyxl.load_workbook(
-                file_path, 
-                data_only=True, 
-                read_only=True,
-                keep_links=False  # 禁用链接以避免某些错误
-            )
-        except Exception as e:
-            error_msg = f"openpyxl read_only模式读取失败: {str(e)}"
-            self.logger.warning(error_msg)
-            error_messages.append(error_msg)
+        # 方法1和方法2: 使用openpyxl读取，先尝试指定的模式，再尝试另一种模式
+        for use_read_only in (read_only, not read_only):
+            mode_name = " read_only模式" if use_read_only else "直接"
+            try:
+                self.logger.info(f"尝试使用openpyxl{mode_name}读取: {file_path}")
+                if use_read_only:
+                    return openpyxl.load_workbook(
+                        file_path,
+                        data_only=True,
+                        read_only=True,
+                        keep_links=False  # 禁用链接以避免某些错误
+                    )
+                return openpyxl.load_workbook(file_path, data_only=True)
+            except Exception as e:
+                error_msg = f"openpyxl{mode_name}读取失败: {str(e)}"
+                self.logger.warning(error_msg)
+                error_messages.append(error_msg)
+                
+                # 特殊处理：如果错误消息包含"wildcard"，可能是文件格式问题
+                if "wildcard" in str(e).lower():
+                    self.logger.warning("检测到wildcard错误，可能是Excel文件中有通配符或特殊字符")
         
-        # 方法3: 使用pandas读取，然后转换为openpyxl格式
+        # 方法3: 使用pandas读取，数据直接以DataFrame保存
         try:
             self.logger.info(f"尝试使用pandas读取: {file_path}")
-            # 添加引擎参数，尝试不同的引擎
-            try:
-                # 先尝试默认引擎
-                excel_file = pd.ExcelFile(file_path)
-            except Exception as pd_e:
-                self.logger.warning(f"pandas默认引擎失败: {str(pd_e)}，尝试openpyxl引擎")
-                # 如果默认引擎失败，尝试openpyxl引擎
-                excel_file = pd.ExcelFile(file_path, engine='openpyxl')
-            
-            sheet_names = excel_file.sheet_names
-            
-            # 创建新的openpyxl工作簿
-            workbook = openpyxl.Workbook()
-            # 删除默认创建的工作表
-            if "Sheet" in workbook.sheetnames:
-                del workbook["Sheet"]
-            
-            # 处理每个工作表
-            for sheet_name in sheet_names:
-                # 读取工作表，添加错误处理
-                try:
-                    df = excel_file.parse(sheet_name)
-                    
-                    # 创建新工作表
-                    sheet = workbook.create_sheet(title=sheet_name)
-                    
-                    # 写入表头
-                    for col_idx, column in enumerate(df.columns, start=1):
-                        try:
-                            sheet.cell(row=1, column=col_idx, value=str(column))
-                        except Exception as col_e:
-                            self.logger.warning(f"写入列名时出错: {str(col_e)}")
-                            sheet.cell(row=1, column=col_idx, value="[列名错误]")
-                    
-                    # 写入数据
-                    for row_idx, row in df.iterrows():
-                        for col_idx, value in enumerate(row, start=1):
-                            try:
-                                if pd.isna(value):  # 使用pandas的NA检查
-                                    sheet.cell(row=row_idx+2, column=col_idx, value="")
-                                else:
-                                    sheet.cell(row=row_idx+2, column=col_idx, value=str(value))
-                            except Exception as val_e:
-                                self.logger.warning(f"写入单元格值时出错: {str(val_e)}")
-                                sheet.cell(row=row_idx+2, column=col_idx, value="[值错误]")
-                except Exception as sheet_e:
-                    self.logger.warning(f"处理工作表 {sheet_name} 失败: {str(sheet_e)}")
-                    # 创建一个错误信息工作表
-                    sheet = workbook.create_sheet(title=f"{sheet_name}(错误)")
-                    sheet.cell(row=1, column=1, value=f"无法读取此工作表: {str(sheet_e)}")
-            
-            return workbook
+            return self._read_with_pandas(file_path)
         except Exception as e:
             error_msg = f"pandas读取失败: {str(e)}"
             self.logger.warning(error_msg)
@@ -124,36 +91,8 @@ class ExcelConverter:
         
         # 方法4: 尝试使用xlrd库读取(对旧版Excel文件更友好)
         try:
-            import xlrd
             self.logger.info(f"尝试使用xlrd读取: {file_path}")
-            
-            # 使用xlrd打开Excel文件
-            xls_book = xlrd.open_workbook(file_path)
-            
-            # 创建新的openpyxl工作簿
-            workbook = openpyxl.Workbook()
-            if "Sheet" in workbook.sheetnames:
-                del workbook["Sheet"]
-            
-            # 处理每个工作表
-            for sheet_name in xls_book.sheet_names():
-                xls_sheet = xls_book.sheet_by_name(sheet_name)
-                sheet = workbook.create_sheet(title=sheet_name)
-                
-                # 复制数据
-                for row_idx in range(xls_sheet.nrows):
-                    for col_idx in range(xls_sheet.ncols):
-                        try:
-                            value = xls_sheet.cell_value(row_idx, col_idx)
-                            if value is None or value == '':
-                                sheet.cell(row=row_idx+1, column=col_idx+1, value='')
-                            else:
-                                sheet.cell(row=row_idx+1, column=col_idx+1, value=str(value))
-                        except Exception as cell_e:
-                            self.logger.warning(f"处理xlrd单元格值时出错: {str(cell_e)}")
-                            sheet.cell(row=row_idx+1, column=col_idx+1, value='[转换错误]')
-            
-            return workbook
+            return self._read_with_xlrd(file_path)
         except ImportError:
             error_msg = "xlrd库未安装，跳过此方法"
             self.logger.warning(error_msg)
@@ -166,8 +105,75 @@ class ExcelConverter:
         # 所有读取方法都失败
         raise Exception(f"读取Excel文档失败: 尝试了多种方法但均失败:\n" + "\n".join(error_messages))
     
+    def _read_with_pandas(self, file_path):
+        """使用pandas读取Excel文档
+        
+        Returns:
+            TabularWorkbook: 以DataFrame保存数据的工作簿
+        """
+        # 添加引擎参数，尝试不同的引擎
+        try:
+            # 先尝试默认引擎
+            excel_file = pd.ExcelFile(file_path)
+        except Exception as pd_e:
+            self.logger.warning(f"pandas默认引擎失败: {str(pd_e)}，尝试openpyxl引擎")
+            # 如果默认引擎失败，尝试openpyxl引擎
+            excel_file = pd.ExcelFile(file_path, engine='openpyxl')
+        
+        workbook = TabularWorkbook()
+        with excel_file:
+            # 处理每个工作表
+            for sheet_name in excel_file.sheet_names:
+                # 读取工作表，添加错误处理
+                try:
+                    workbook.add_sheet(TabularSheet(sheet_name, excel_file.parse(sheet_name)))
+                except Exception as sheet_e:
+                    self.logger.warning(f"处理工作表 {sheet_name} 失败: {str(sheet_e)}")
+                    # 创建一个错误信息工作表
+                    workbook.add_sheet(TabularSheet.from_message(
+                        f"{sheet_name}(错误)", f"无法读取此工作表: {str(sheet_e)}"
+                    ))
+        
+        return workbook
+    
+    def _read_with_xlrd(self, file_path):
+        """使用xlrd读取Excel文档
+        
+        单元格值转换为文本后按行保存到DataFrame，不再逐个单元格创建openpyxl工作簿
+        
+        Returns:
+            TabularWorkbook: 以DataFrame保存数据的工作簿
+        """
+        import xlrd
+        
+        # 使用xlrd打开Excel文件
+        xls_book = xlrd.open_workbook(file_path)
+        
+        workbook = TabularWorkbook()
+        for sheet_name in xls_book.sheet_names():
+            xls_sheet = xls_book.sheet_by_name(sheet_name)
+            rows = [
+                [self._xlrd_cell_text(xls_sheet, row_idx, col_idx) for col_idx in range(xls_sheet.ncols)]
+                for row_idx in range(xls_sheet.nrows)
+            ]
+            workbook.add_sheet(TabularSheet.from_rows(sheet_name, rows))
+        
+        return workbook
+    
+    def _xlrd_cell_text(self, xls_sheet, row_idx, col_idx):
+        """读取xlrd单元格值并转换为文本，空单元格为空字符串"""
+        try:
+            value = xls_sheet.cell_value(row_idx, col_idx)
+            return '' if value is None or value == '' else str(value)
+        except Exception as cell_e:
+            self.logger.warning(f"处理xlrd单元格值时出错: {str(cell_e)}")
+            return '[转换错误]'
+    
     def save_as_txt(self, workbook, output_path, delimiter='\t', progress_callback=None):
-        """将Excel文档保存为TXT格式"""
+        """将Excel文档保存为TXT格式
+        
+        逐行读取并写入，不在内存中保留整个工作表
+        """
         try:
             sheet_count = len(workbook.sheetnames)
             processed_sheets = 0
@@ -180,33 +186,16 @@ class ExcelConverter:
                         # 写入工作表名称作为标题
                         f.write(f"# {sheet_name}\n\n")
                         
-                        # 处理特殊情况:如果这是一个只读工作表(read_only=True)
-                        if getattr(sheet, '_read_only', False):
-                            self.logger.info(f"工作表 {sheet_name} 是只读模式，使用特殊处理")
-                            # 获取只读工作表数据
-                            rows = self._get_read_only_sheet_data(sheet)
-                            for row_data in rows:
-                                f.write(delimiter.join(row_data) + '\n')
-                        else:
-                            # 处理所有行
-                            try:
-                                for row in sheet.iter_rows():
-                                    # 安全地获取并处理单元格值
-                                    row_data = []
-                                    for cell in row:
-                                        try:
-                                            if cell.value is None:
-                                                row_data.append('')
-                                            else:
-                                                row_data.append(str(cell.value))
-                                        except Exception as e:
-                                            self.logger.warning(f"转换单元格值时出错: {str(e)}")
-                                            row_data.append('[转换错误]')
-                                    
+                        # 处理所有行
+                        try:
+                            if isinstance(sheet, TabularSheet):
+                                self._write_tabular_txt(sheet, f, delimiter)
+                            else:
+                                for row_data in self.iter_sheet_rows(sheet):
                                     f.write(delimiter.join(row_data) + '\n')
-                            except Exception as e:
-                                self.logger.warning(f"处理工作表 {sheet_name} 行时出错: {str(e)}")
-                                f.write("数据处理错误：无法读取此工作表内容\n")
+                        except Exception as e:
+                            self.logger.warning(f"处理工作表 {sheet_name} 行时出错: {str(e)}")
+                            f.write("数据处理错误：无法读取此工作表内容\n")
                         
                         # 工作表之间添加空行
                         f.write('\n\n')
@@ -226,265 +215,260 @@ class ExcelConverter:
             self.logger.error(f"保存为TXT失败: {str(e)}", exc_info=True)
             raise Exception(f"保存为TXT失败: {str(e)}")
     
-    def save_as_markdown(self, workbook, output_path, progress_callback=None):
+    def save_as_markdown(self, workbook, output_path, progress_callback=None, max_workers=None):
         """将Excel文档保存为Markdown格式
         
-        如果工作簿有多个工作表，将为每个工作表生成单独的MD文件，文件名格式为"原文件名-Sheet名称.md"
+        如果工作簿有多个工作表，将为每个工作表生成单独的MD文件，文件名格式为"原文件名-Sheet名称.md"。
+        只读模式打开的较大工作簿会将各工作表分配到多个进程并行导出，输出与单进程一致
+        
+        Args:
+            workbook: Excel工作簿对象
+            output_path: 输出文件路径
+            progress_callback: 进度回调函数
+            max_workers: 最大工作进程数，None表示使用CPU核心数，1表示单进程处理
         """
         try:
-            sheet_count = len(workbook.sheetnames)
-            processed_sheets = 0
+            sheet_names = workbook.sheetnames
+            sheet_count = len(sheet_names)
             
-            # 检查是否有多个工作表
-            if sheet_count > 1:
-                # 将为每个工作表生成单独的文件
-                base_name, ext = os.path.splitext(output_path)
-                
-                for sheet_name in workbook.sheetnames:
-                    # 为每个Sheet创建单独的文件名
-                    sheet_output_path = f"{base_name}-{sheet_name}.md"
-                    
-                    try:
-                        sheet = workbook[sheet_name]
-                        
-                        with open(sheet_output_path, 'w', encoding='utf-8') as f:
-                            # 处理特殊情况:如果这是一个只读工作表(read_only=True)
-                            if getattr(sheet, '_read_only', False):
-                                self.logger.info(f"工作表 {sheet_name} 是只读模式，使用特殊处理")
-                                # 创建一个简单表格
-                                rows = self._get_read_only_sheet_data(sheet)
-                            else:
-                                # 获取所有行的数据，同时安全地处理所有单元格值
-                                rows = []
-                                try:
-                                    for row in sheet.iter_rows():
-                                        row_values = []
-                                        for cell in row:
-                                            # 安全地获取单元格值，处理所有可能的类型
-                                            try:
-                                                if cell.value is None:
-                                                    row_values.append('')
-                                                else:
-                                                    row_values.append(str(cell.value))
-                                            except Exception as e:
-                                                self.logger.warning(f"转换单元格值时出错: {str(e)}")
-                                                row_values.append('[转换错误]')
-                                        rows.append(row_values)
-                                except Exception as e:
-                                    self.logger.warning(f"处理工作表 {sheet_name} 行时出错: {str(e)}")
-                                    rows = [["数据处理错误：无法读取此工作表内容"]]
-                            
-                            if not rows:
-                                f.write("*空工作表*\n\n")
-                                continue
-                            
-                            # 确定每列的最大宽度（用于对齐）
-                            col_widths = []
-                            max_cols = max(len(row) for row in rows) if rows else 0
-                            
-                            for col_idx in range(max_cols):
-                                max_width = 0
-                                for row in rows:
-                                    if col_idx < len(row):
-                                        cell_str = row[col_idx]
-                                        max_width = max(max_width, len(cell_str))
-                                col_widths.append(max_width)
-                            
-                            # 如果没有列，继续下一个工作表
-                            if not col_widths:
-                                f.write("*空工作表*\n\n")
-                                continue
-                            
-                            # 第一行作为表头
-                            header = rows[0] if rows else []
-                            header_row = "| "
-                            for col_idx, cell in enumerate(header):
-                                if col_idx < len(col_widths):
-                                    header_row += cell.ljust(col_widths[col_idx]) + " | "
-                            f.write(header_row + "\n")
-                            
-                            # 分隔行
-                            separator = "| "
-                            for width in col_widths:
-                                separator += "-" * width + " | "
-                            f.write(separator + "\n")
-                            
-                            # 数据行
-                            for row_idx, row in enumerate(rows[1:], 1):
-                                row_str = "| "
-                                for col_idx, cell in enumerate(row):
-                                    if col_idx < len(col_widths):
-                                        row_str += cell.ljust(col_widths[col_idx]) + " | "
-                                f.write(row_str + "\n")
-                    
-                    except Exception as sheet_e:
-                        self.logger.error(f"处理工作表 {sheet_name} 时出错: {str(sheet_e)}")
-                        with open(sheet_output_path, 'w', encoding='utf-8') as f:
-                            f.write(f"*处理此工作表时出错: {str(sheet_e)}*\n\n")
-                    
-                    # 更新进度
-                    processed_sheets += 1
-                    if progress_callback:
-                        progress_callback(int(processed_sheets / sheet_count * 100))
-                
+            sheet_outputs = self.get_markdown_outputs(workbook, output_path)
+            
+            source_path = self._get_source_path(workbook)
+            workers = self._get_markdown_workers(source_path, sheet_count, max_workers)
+            if workers > 1:
+                self._save_sheets_parallel(source_path, sheet_outputs, workers, progress_callback)
                 return True
             
-            else:
-                # 单个工作表，使用原始方法处理
-                with open(output_path, 'w', encoding='utf-8') as f:
-                    sheet_name = workbook.sheetnames[0]
-                    try:
-                        sheet = workbook[sheet_name]
-                        
-                        # 处理特殊情况:如果这是一个只读工作表(read_only=True)
-                        if getattr(sheet, '_read_only', False):
-                            self.logger.info(f"工作表 {sheet_name} 是只读模式，使用特殊处理")
-                            # 创建一个简单表格
-                            rows = self._get_read_only_sheet_data(sheet)
-                        else:
-                            # 获取所有行的数据，同时安全地处理所有单元格值
-                            rows = []
-                            try:
-                                for row in sheet.iter_rows():
-                                    row_values = []
-                                    for cell in row:
-                                        # 安全地获取单元格值，处理所有可能的类型
-                                        try:
-                                            if cell.value is None:
-                                                row_values.append('')
-                                            else:
-                                                row_values.append(str(cell.value))
-                                        except Exception as e:
-                                            self.logger.warning(f"转换单元格值时出错: {str(e)}")
-                                            row_values.append('[转换错误]')
-                                    rows.append(row_values)
-                            except Exception as e:
-                                self.logger.warning(f"处理工作表 {sheet_name} 行时出错: {str(e)}")
-                                rows = [["数据处理错误：无法读取此工作表内容"]]
-                        
-                        if not rows:
-                            f.write("*空工作表*\n\n")
-                            return True
-                        
-                        # 确定每列的最大宽度（用于对齐）
-                        col_widths = []
-                        max_cols = max(len(row) for row in rows) if rows else 0
-                        
-                        for col_idx in range(max_cols):
-                            max_width = 0
-                            for row in rows:
-                                if col_idx < len(row):
-                                    cell_str = row[col_idx]
-                                    max_width = max(max_width, len(cell_str))
-                            col_widths.append(max_width)
-                        
-                        # 如果没有列，继续下一个工作表
-                        if not col_widths:
-                            f.write("*空工作表*\n\n")
-                            return True
-                        
-                        # 第一行作为表头
-                        header = rows[0] if rows else []
-                        header_row = "| "
-                        for col_idx, cell in enumerate(header):
-                            if col_idx < len(col_widths):
-                                header_row += cell.ljust(col_widths[col_idx]) + " | "
-                        f.write(header_row + "\n")
-                        
-                        # 分隔行
-                        separator = "| "
-                        for width in col_widths:
-                            separator += "-" * width + " | "
-                        f.write(separator + "\n")
-                        
-                        # 数据行
-                        for row_idx, row in enumerate(rows[1:], 1):
-                            row_str = "| "
-                            for col_idx, cell in enumerate(row):
-                                if col_idx < len(col_widths):
-                                    row_str += cell.ljust(col_widths[col_idx]) + " | "
-                            f.write(row_str + "\n")
-                        
-                    except Exception as sheet_e:
-                        self.logger.error(f"处理工作表 {sheet_name} 时出错: {str(sheet_e)}")
-                        f.write(f"*处理此工作表时出错: {str(sheet_e)}*\n\n")
-                        
-                    # 更新进度
-                    if progress_callback:
-                        progress_callback(100)
+            for processed_sheets, (sheet_name, sheet_output_path) in enumerate(sheet_outputs, 1):
+                self._save_sheet_markdown(workbook, sheet_name, sheet_output_path)
                 
-                return True
+                # 更新进度
+                if progress_callback:
+                    progress_callback(int(processed_sheets / sheet_count * 100))
+            
+            return True
             
         except Exception as e:
             self.logger.error(f"保存为Markdown失败: {str(e)}", exc_info=True)
             raise Exception(f"保存为Markdown失败: {str(e)}")
     
-    def _get_read_only_sheet_data(self, sheet):
-        """专门处理只读工作表的数据"""
-        rows = []
+    def get_markdown_outputs(self, workbook, output_path):
+        """save_as_markdown 为各工作表写出的文件
+        
+        只有一个工作表时写入 output_path；多个工作表时不写出 output_path，
+        而是为每个工作表生成"原文件名-Sheet名称.md"
+        
+        Returns:
+            list: (工作表名称, 输出路径) 列表
+        """
+        sheet_names = workbook.sheetnames
+        if len(sheet_names) > 1:
+            base_name, ext = os.path.splitext(output_path)
+            return [(name, f"{base_name}-{name}.md") for name in sheet_names]
+        return [(sheet_names[0], output_path)]
+    
+    def _get_source_path(self, workbook):
+        """返回只读模式工作簿对应的文件路径，其他工作簿返回None"""
+        if not getattr(workbook, "read_only", False):
+            return None
+        archive = getattr(workbook, "_archive", None)
+        return getattr(archive, "filename", None)
+    
+    def _get_markdown_workers(self, source_path, sheet_count, max_workers):
+        """确定导出Markdown使用的进程数，不满足并行条件时返回1"""
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        if max_workers <= 1 or sheet_count < 2:
+            return 1
+        
+        # 工作进程需要从磁盘重新打开工作簿，只有只读模式打开的文件可以并行
+        if not isinstance(source_path, str) or not os.path.isfile(source_path):
+            return 1
+        if os.path.getsize(source_path) < PARALLEL_MIN_FILE_SIZE:
+            return 1
+        
+        return min(max_workers, sheet_count)
+    
+    def _save_sheets_parallel(self, file_path, sheet_outputs, workers, progress_callback=None):
+        """多进程导出各工作表，每个进程独立读取自己的工作表"""
+        sheet_count = len(sheet_outputs)
+        processed_sheets = 0
+        
+        executor = ProcessPoolExecutor(max_workers=workers)
+        futures = []
         try:
-            # 尝试使用.rows属性获取只读工作表数据
-            for row in sheet.rows:
-                row_values = []
-                for cell in row:
-                    try:
-                        if cell.value is None:
-                            row_values.append('')
-                        else:
-                            row_values.append(str(cell.value))
-                    except Exception as e:
-                        self.logger.warning(f"转换只读工作表单元格值时出错: {str(e)}")
-                        row_values.append('[转换错误]')
-                rows.append(row_values)
+            for sheet_name, sheet_output_path in sheet_outputs:
+                futures.append(executor.submit(_export_sheet_markdown, file_path, sheet_name, sheet_output_path))
+            for future in as_completed(futures):
+                future.result()
+                
+                # 更新进度
+                processed_sheets += 1
+                if progress_callback:
+                    progress_callback(int(processed_sheets / sheet_count * 100))
+        finally:
+            # 某个工作表出错时不再导出尚未开始的工作表
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=True)
+    
+    def _save_sheet_markdown(self, workbook, sheet_name, output_path):
+        """将单个工作表保存为Markdown表格文件，出错时在文件中写入错误信息"""
+        with open(output_path, 'w', encoding='utf-8') as f:
+            try:
+                self._write_sheet_markdown(workbook[sheet_name], f)
+            except Exception as sheet_e:
+                self.logger.error(f"处理工作表 {sheet_name} 时出错: {str(sheet_e)}")
+                f.write(f"*处理此工作表时出错: {str(sheet_e)}*\n\n")
+    
+    def _write_sheet_markdown(self, sheet, f):
+        """将工作表以Markdown表格写入文件
+        
+        分两遍读取工作表：第一遍只计算每列的最大宽度（用于对齐），
+        第二遍逐行写出，内存中只保留列宽
+        """
+        if isinstance(sheet, TabularSheet):
+            self._write_tabular_markdown(sheet, f)
+            return
+        
+        # 第一遍：确定每列的最大宽度
+        col_widths = []
+        row_count = 0
+        error_rows = None
+        try:
+            for row in self._iter_row_values(sheet):
+                row_count += 1
+                for col_idx, cell in enumerate(row):
+                    if col_idx < len(col_widths):
+                        if len(cell) > col_widths[col_idx]:
+                            col_widths[col_idx] = len(cell)
+                    else:
+                        col_widths.append(len(cell))
         except Exception as e:
-            self.logger.warning(f"获取只读工作表数据出错，尝试备选方法: {str(e)}")
-            # 如果上面的方法失败，使用values属性直接获取值
+            self.logger.warning(f"处理工作表 {sheet.title} 行时出错: {str(e)}")
+            error_rows = [["数据处理错误：无法读取此工作表内容"]]
+            col_widths = [len(error_rows[0][0])]
+            row_count = 1
+        
+        # 没有行或没有列时视为空工作表
+        if not row_count or not col_widths:
+            f.write("*空工作表*\n\n")
+            return
+        
+        # 第二遍：第一行作为表头，之后是分隔行和数据行
+        rows = error_rows if error_rows is not None else self.iter_sheet_rows(sheet, width=len(col_widths))
+        for row_idx, row in enumerate(rows):
+            f.write(self._format_markdown_row(row, col_widths) + "\n")
+            if row_idx == 0:
+                f.write("| " + "".join("-" * width + " | " for width in col_widths) + "\n")
+    
+    def _write_tabular_txt(self, sheet, f, delimiter):
+        """按列拼接DataFrame工作表的文本行并写入文件
+        
+        不使用 DataFrame.to_csv，因为它会给包含分隔符的值加引号，与逐行导出的结果不一致
+        """
+        if not sheet.header:
+            return
+        
+        f.write(delimiter.join(sheet.header) + '\n')
+        if sheet.text.empty:
+            return
+        
+        lines = self._join_columns(sheet.text, delimiter)
+        f.write('\n'.join(lines) + '\n')
+    
+    def _write_tabular_markdown(self, sheet, f):
+        """以列为单位计算宽度和填充，将DataFrame工作表写为Markdown表格"""
+        if not sheet.header:
+            f.write("*空工作表*\n\n")
+            return
+        
+        # 每列宽度取表头和数据中最长的文本
+        col_widths = [len(name) for name in sheet.header]
+        if not sheet.text.empty:
+            data_widths = sheet.text.apply(lambda column: column.str.len().max())
+            col_widths = [max(width, int(data_width)) for width, data_width in zip(col_widths, data_widths)]
+        
+        f.write(self._format_markdown_row(sheet.header, col_widths) + "\n")
+        f.write("| " + "".join("-" * width + " | " for width in col_widths) + "\n")
+        if sheet.text.empty:
+            return
+        
+        padded = sheet.text.copy()
+        for position, width in enumerate(col_widths):
+            padded.iloc[:, position] = padded.iloc[:, position].str.ljust(width)
+        lines = "| " + self._join_columns(padded, " | ") + " | "
+        f.write('\n'.join(lines) + '\n')
+    
+    def _join_columns(self, frame, separator):
+        """用分隔符按行拼接字符串DataFrame的所有列"""
+        first = frame.iloc[:, 0]
+        if frame.shape[1] == 1:
+            return first
+        return first.str.cat([frame.iloc[:, i] for i in range(1, frame.shape[1])], sep=separator)
+    
+    def _format_markdown_row(self, row, col_widths):
+        """按列宽格式化一行Markdown表格，超出列宽范围的单元格被忽略"""
+        return "| " + "".join(
+            cell.ljust(width) + " | " for cell, width in zip(row, col_widths)
+        )
+    
+    def iter_sheet_rows(self, sheet, width=None):
+        """逐行读取工作表
+        
+        只读模式下工作表按需从文件中解析，不会一次性加载全部单元格。
+        只读模式的各行只包含到该行最后一个单元格为止，长度可能不同，
+        所有行都补齐到相同列数，与直接模式读取的结果一致
+        
+        Args:
+            sheet: openpyxl工作表
+            width: 补齐到的列数，None表示只读模式下先扫描一遍工作表得到最大列数
+            
+        Yields:
+            list: 每行单元格值的字符串列表，空单元格为空字符串
+        """
+        if width is None:
+            width = 0
+            if isinstance(sheet, ReadOnlyWorksheet):
+                for row_data in self._iter_row_values(sheet):
+                    width = max(width, len(row_data))
+        
+        for row_data in self._iter_row_values(sheet):
+            if len(row_data) < width:
+                row_data.extend([''] * (width - len(row_data)))
+            yield row_data
+    
+    def _iter_row_values(self, sheet):
+        """逐行读取工作表单元格的字符串值，只读模式下各行长度可能不同
+        
+        只读模式默认按文件中记录的 <dimension> 确定读取范围，部分程序生成的文件中
+        该记录已过期（例如只有A1），会导致只读出第一个单元格，因此读取前先清除，按实际单元格读取
+        """
+        if isinstance(sheet, ReadOnlyWorksheet):
+            sheet.reset_dimensions()
+        
+        for row in sheet.values:
             try:
-                for row in sheet.values:
-                    row_values = []
-                    for value in row:
-                        try:
-                            if value is None:
-                                row_values.append('')
-                            else:
-                                row_values.append(str(value))
-                        except Exception as val_e:
-                            self.logger.warning(f"转换只读工作表值时出错: {str(val_e)}")
-                            row_values.append('[转换错误]')
-                    rows.append(row_values)
-            except Exception as val_err:
-                self.logger.error(f"无法获取只读工作表数据: {str(val_err)}")
-                rows = [["[无法读取工作表数据]"]]
-        
-        return rows
+                row_data = ['' if value is None else str(value) for value in row]
+            except Exception:
+                row_data = [self._cell_to_text(value) for value in row]
+            yield row_data
+    
+    def _cell_to_text(self, value):
+        """将单个单元格值转换为字符串，转换失败时返回占位文本"""
+        try:
+            return '' if value is None else str(value)
+        except Exception as e:
+            self.logger.warning(f"转换单元格值时出错: {str(e)}")
+            return '[转换错误]'
     
     def get_sheet_data(self, sheet):
         """获取工作表数据"""
-        # 处理特殊情况:如果这是一个只读工作表(read_only=True)
-        if getattr(sheet, '_read_only', False):
-            self.logger.info(f"工作表是只读模式，使用特殊处理")
-            return self._get_read_only_sheet_data(sheet)
-        
-        # 普通工作表处理
-        data = []
         try:
-            for row in sheet.iter_rows():
-                row_data = []
-                for cell in row:
-                    try:
-                        if cell.value is None:
-                            row_data.append('')
-                        else:
-                            row_data.append(str(cell.value))
-                    except Exception as e:
-                        self.logger.warning(f"获取单元格值时出错: {str(e)}")
-                        row_data.append('[转换错误]')
-                data.append(row_data)
+            return list(self.iter_sheet_rows(sheet))
         except Exception as e:
             self.logger.error(f"获取工作表数据时出错: {str(e)}")
-            data = [["[数据处理错误：无法读取此工作表内容]"]]
-        
-        return data
+            return [["[数据处理错误：无法读取此工作表内容]"]]
     
     def is_empty_row(self, row):
         """检查行是否为空"""
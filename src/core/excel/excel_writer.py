@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Junly文件转换工具 - Excel流式写入
+版权所有 (c) 2025 Junly
+"""
+
+import os
+import pickle
+import shutil
+import logging
+import tempfile
+import openpyxl
+from openpyxl.utils import get_column_letter
+
+
+class ExcelSheetWriter:
+    """ExcelWriter 中的一个工作表
+
+    追加的行依次序列化到写入器临时目录中的文件，不创建单元格对象
+    """
+
+    def __init__(self, title, path, column_widths=None):
+        self.title = title
+        self.path = path
+        self.column_widths = list(column_widths or [])
+        self._file = open(path, "wb")
+
+    def append(self, row):
+        """追加一行，row 为单元格值的列表或元组，None 表示空单元格"""
+        pickle.dump(list(row), self._file, pickle.HIGHEST_PROTOCOL)
+
+    def close(self):
+        """关闭行数据文件"""
+        if not self._file.closed:
+            self._file.close()
+
+    def iter_rows(self):
+        """按追加顺序读取各行"""
+        self.close()
+        with open(self.path, "rb") as f:
+            while True:
+                try:
+                    yield pickle.load(f)
+                except EOFError:
+                    return
+
+
+class ExcelWriter:
+    """基于只写模式工作簿的Excel写入器
+
+    各工作表按整行追加，行数据先写入写入器自己的临时目录；保存时逐行读出，
+    写入 openpyxl 只写模式的工作簿并打包为xlsx，不创建单元格对象，内存占用与行数无关。
+    close() 删除临时目录，未保存（例如转换出错）时也不会留下临时文件
+    """
+
+    def __init__(self, output_path):
+        """初始化写入器
+
+        Args:
+            output_path: 输出的xlsx文件路径
+        """
+        self.output_path = output_path
+        self.sheets = []
+        self.temp_dir = tempfile.mkdtemp(prefix="file-converter-excel-")
+        self.logger = logging.getLogger("file-converter")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def add_sheet(self, title, column_widths=None):
+        """添加工作表
+
+        Args:
+            title: 工作表名称
+            column_widths: 可选的列宽列表（以字符数计），为None的列使用默认宽度
+
+        Returns:
+            ExcelSheetWriter: 通过 append(row) 逐行写入的工作表
+        """
+        path = os.path.join(self.temp_dir, f"sheet{len(self.sheets) + 1}.rows")
+        sheet = ExcelSheetWriter(title, path, column_widths)
+        self.sheets.append(sheet)
+        return sheet
+
+    def save(self):
+        """按添加顺序将各工作表逐行写入输出文件"""
+        workbook = openpyxl.Workbook(write_only=True)
+        for sheet in self.sheets:
+            worksheet = workbook.create_sheet(title=sheet.title)
+            # 只写模式下列宽必须在写入第一行之前设置
+            for col_idx, width in enumerate(sheet.column_widths, 1):
+                if width:
+                    worksheet.column_dimensions[get_column_letter(col_idx)].width = width
+            for row in sheet.iter_rows():
+                worksheet.append(row)
+        workbook.save(self.output_path)
+
+    def close(self):
+        """删除临时目录"""
+        for sheet in self.sheets:
+            sheet.close()
+        if os.path.isdir(self.temp_dir):
+            shutil.rmtree(self.temp_dir, ignore_errors=True)
+            if os.path.isdir(self.temp_dir):
+                self.logger.warning(f"删除Excel写入临时目录失败: {self.temp_dir}")
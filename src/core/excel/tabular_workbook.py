@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Junly文件转换工具 - 表格数据工作簿
+版权所有 (c) 2025 Junly
+"""
+
+import pandas as pd
+
+
+class TabularSheet:
+    """以DataFrame保存的工作表
+
+    pandas读取的数据不再逐个单元格复制到openpyxl工作簿，
+    而是直接以字符串DataFrame保存，导出时按列批量处理
+    """
+
+    def __init__(self, title, dataframe):
+        """初始化工作表
+
+        Args:
+            title: 工作表名称
+            dataframe: pandas读取的原始数据，列名作为表头
+        """
+        self.title = title
+        self.header = [str(column) for column in dataframe.columns]
+        self.text = self._to_text_frame(dataframe)
+
+    @classmethod
+    def from_message(cls, title, message):
+        """创建只包含一行提示信息的工作表"""
+        return cls(title, pd.DataFrame(columns=[message]))
+
+    @classmethod
+    def from_rows(cls, title, rows):
+        """由文本行创建工作表，第一行作为表头
+
+        Args:
+            title: 工作表名称
+            rows: 每行单元格文本的列表，没有行时为空工作表
+        """
+        if not rows:
+            return cls(title, pd.DataFrame())
+        return cls(title, pd.DataFrame(rows[1:], columns=rows[0], dtype=object))
+
+    @staticmethod
+    def _to_text_frame(dataframe):
+        """将数据按列转换为字符串，空值转换为空字符串"""
+        columns = {}
+        for position in range(dataframe.shape[1]):
+            series = dataframe.iloc[:, position]
+            missing = series.isna()
+            if pd.api.types.is_numeric_dtype(series.dtype):
+                # 数值列可以整列转换，结果与 str() 一致
+                text = series.astype(str)
+            else:
+                # 日期等类型整列转换的格式与 str() 不同，逐个值转换
+                text = series.map(str)
+            columns[position] = text.where(~missing, "").astype(object)
+        return pd.DataFrame(columns, index=dataframe.index)
+
+    @property
+    def max_column(self):
+        """列数"""
+        return len(self.header)
+
+    @property
+    def values(self):
+        """逐行返回单元格文本，第一行为表头"""
+        yield tuple(self.header)
+        yield from self.text.itertuples(index=False, name=None)
+
+
+class TabularWorkbook:
+    """由TabularSheet组成的工作簿，提供与openpyxl工作簿相同的读取接口"""
+
+    def __init__(self, sheets=None):
+        self.sheets = list(sheets or [])
+
+    @property
+    def sheetnames(self):
+        """工作表名称列表"""
+        return [sheet.title for sheet in self.sheets]
+
+    @property
+    def worksheets(self):
+        """工作表列表"""
+        return list(self.sheets)
+
+    def __getitem__(self, name):
+        for sheet in self.sheets:
+            if sheet.title == name:
+                return sheet
+        raise KeyError(f"工作表 {name} 不存在")
+
+    def add_sheet(self, sheet):
+        """添加工作表"""
+        self.sheets.append(sheet)
+        return sheet
+
+    def close(self):
+        """数据已全部在内存中，无需释放文件"""
+        pass
@@ -7,12 +7,44 @@ Junly文件转换工具 - 图片处理核心模块
 
 import os
 import shutil
+from concurrent.futures import ProcessPoolExecutor
 from PIL import Image
 from pathlib import Path
 
+from .pipeline_presets import get_pipeline_extension
+
+# 批量处理的图片数达到该值时才使用多进程，图片较少时启动进程的开销大于收益
+PARALLEL_MIN_FILES = 8
+
+# 每个工作进程平均分到的任务批次数，批次越小各进程的负载越均衡
+CHUNKS_PER_WORKER = 4
+
+# JPEG缩小时按目标尺寸的该倍数进行降采样解码，保留足够的像素供LANCZOS插值
+DRAFT_SCALE = 2
+
+
+def _process_image_task(task):
+    """处理单张图片，可以在工作进程中执行
+    
+    Args:
+        task: (操作类型, 输入路径, 输出路径, 参数字典)
+        
+    Returns:
+        tuple: (输入路径, 输出路径, 是否成功, 消息)
+    """
+    operation, input_path, output_path, params = task
+    try:
+        message = ImageProcessor().process_image(operation, input_path, output_path, params)
+        return (input_path, output_path, True, message)
+    except Exception as e:
+        return (input_path, "", False, str(e))
+
+
 class ImageProcessor:
     """图片处理类"""
     
+    CACHE_VERSION = 1  # 转换结果缓存版本
+    
     def __init__(self):
         """初始化图片处理器"""
         # 支持的图片格式
@@ -57,34 +89,21 @@ class ImageProcessor:
         except Exception as e:
             raise Exception(f"格式转换失败: {str(e)}")
     
-    def batch_convert_format(self, input_files, output_dir, target_format, progress_callback=None):
+    def batch_convert_format(self, input_files, output_dir, target_format, progress_callback=None, max_workers=None):
         """批量转换图片格式"""
         try:
-            results = []
-            
             # 确保输出目录存在
             os.makedirs(output_dir, exist_ok=True)
             
-            # 处理所有图片
-            for i, input_path in enumerate(input_files):
-                try:
-                    # 生成输出文件路径
-                    filename = os.path.basename(input_path)
-                    name_without_ext = os.path.splitext(filename)[0]
-                    output_path = os.path.join(output_dir, f"{name_without_ext}.{target_format.lower()}")
-                    
-                    # 转换格式
-                    self.convert_format(input_path, output_path, target_format)
-                    
-                    results.append((input_path, output_path, True, ""))
-                except Exception as e:
-                    results.append((input_path, "", False, str(e)))
-                
-                # 更新进度
-                if progress_callback:
-                    progress_callback(int((i+1) / len(input_files) * 100))
+            tasks = []
+            for input_path in input_files:
+                # 生成输出文件路径
+                filename = os.path.basename(input_path)
+                name_without_ext = os.path.splitext(filename)[0]
+                output_path = os.path.join(output_dir, f"{name_without_ext}.{target_format.lower()}")
+                tasks.append(("convert", input_path, output_path, {"target_format": target_format}))
             
-            return results
+            return self._run_batch(tasks, progress_callback, max_workers)
             
         except Exception as e:
             raise Exception(f"批量格式转换失败: {str(e)}")
@@ -97,26 +116,10 @@ class ImageProcessor:
             
             # 打开图片
             with Image.open(input_path) as img:
-                # 如果保持纵横比，计算新尺寸
-                if keep_aspect_ratio:
-                    original_width, original_height = img.size
-                    aspect_ratio = original_width / original_height
-                    
-                    if width == 0:
-                        # 根据高度计算宽度
-                        width = int(height * aspect_ratio)
-                    elif height == 0:
-                        # 根据宽度计算高度
-                        height = int(width / aspect_ratio)
-                    else:
-                        # 按照宽高比较小的一边缩放
-                        width_ratio = width / original_width
-                        height_ratio = height / original_height
-                        
-                        if width_ratio < height_ratio:
-                            height = int(width / aspect_ratio)
-                        else:
-                            width = int(height * aspect_ratio)
+                width, height = self._calculate_size(img.size, width, height, keep_aspect_ratio)
+                
+                # JPEG大幅缩小时直接以较低分辨率解码，省去大部分解码计算
+                self._draft_for_size(img, width, height)
                 
                 # 调整尺寸
                 resized_img = img.resize((width, height), Image.Resampling.LANCZOS)
@@ -133,37 +136,62 @@ class ImageProcessor:
         except Exception as e:
             raise Exception(f"调整尺寸失败: {str(e)}")
     
-    def batch_resize_image(self, input_files, output_dir, width, height, keep_aspect_ratio=True, progress_callback=None):
+    def batch_resize_image(self, input_files, output_dir, width, height, keep_aspect_ratio=True,
+                           progress_callback=None, max_workers=None):
         """批量调整图片尺寸"""
         try:
-            results = []
-            
             # 确保输出目录存在
             os.makedirs(output_dir, exist_ok=True)
             
-            # 处理所有图片
-            for i, input_path in enumerate(input_files):
-                try:
-                    # 生成输出文件路径
-                    filename = os.path.basename(input_path)
-                    output_path = os.path.join(output_dir, filename)
-                    
-                    # 调整尺寸
-                    self.resize_image(input_path, output_path, width, height, keep_aspect_ratio)
-                    
-                    results.append((input_path, output_path, True, ""))
-                except Exception as e:
-                    results.append((input_path, "", False, str(e)))
-                
-                # 更新进度
-                if progress_callback:
-                    progress_callback(int((i+1) / len(input_files) * 100))
+            params = {"width": width, "height": height, "keep_aspect_ratio": keep_aspect_ratio}
+            tasks = [
+                ("resize", input_path, os.path.join(output_dir, os.path.basename(input_path)), params)
+                for input_path in input_files
+            ]
             
-            return results
+            return self._run_batch(tasks, progress_callback, max_workers)
             
         except Exception as e:
             raise Exception(f"批量调整尺寸失败: {str(e)}")
     
+    @staticmethod
+    def _calculate_size(original_size, width, height, keep_aspect_ratio=True):
+        """计算调整后的尺寸
+        
+        保持纵横比时宽或高为0表示按另一边计算，都不为0时按缩放比例较小的一边缩放
+        """
+        original_width, original_height = original_size
+        
+        # 如果保持纵横比，计算新尺寸
+        if keep_aspect_ratio:
+            aspect_ratio = original_width / original_height
+            
+            if width == 0:
+                # 根据高度计算宽度
+                width = int(height * aspect_ratio)
+            elif height == 0:
+                # 根据宽度计算高度
+                height = int(width / aspect_ratio)
+            else:
+                # 按照宽高比较小的一边缩放
+                width_ratio = width / original_width
+                height_ratio = height / original_height
+                
+                if width_ratio < height_ratio:
+                    height = int(width / aspect_ratio)
+                else:
+                    width = int(height * aspect_ratio)
+        
+        return max(1, width), max(1, height)
+    
+    @staticmethod
+    def _draft_for_size(img, width, height):
+        """JPEG缩小到一半以下时以较低分辨率解码，必须在读取像素之前调用"""
+        original_width, original_height = img.size
+        if (img.format == 'JPEG' and width * DRAFT_SCALE <= original_width
+                and height * DRAFT_SCALE <= original_height):
+            img.draft(img.mode, (width * DRAFT_SCALE, height * DRAFT_SCALE))
+    
     def compress_image(self, input_path, output_path, quality=85, progress_callback=None):
         """压缩图片"""
         try:
@@ -202,39 +230,213 @@ class ImageProcessor:
         except Exception as e:
             raise Exception(f"压缩图片失败: {str(e)}")
     
-    def batch_compress_image(self, input_files, output_dir, quality=85, progress_callback=None):
+    def batch_compress_image(self, input_files, output_dir, quality=85, progress_callback=None, max_workers=None):
         """批量压缩图片"""
         try:
-            results = []
+            # 确保输出目录存在
+            os.makedirs(output_dir, exist_ok=True)
+            
+            tasks = [
+                ("compress", input_path, os.path.join(output_dir, os.path.basename(input_path)), {"quality": quality})
+                for input_path in input_files
+            ]
+            
+            return self._run_batch(tasks, progress_callback, max_workers)
+            
+        except Exception as e:
+            raise Exception(f"批量压缩图片失败: {str(e)}")
+    
+    def process_pipeline(self, input_path, output_path, operations, progress_callback=None):
+        """对图片依次执行一组操作，只解码一次并在最后编码保存一次
+        
+        Args:
+            input_path: 输入路径
+            output_path: 输出路径
+            operations: 操作列表，见 pipeline_presets 中的说明
+            progress_callback: 进度回调函数
+            
+        Returns:
+            tuple: (原文件大小, 输出文件大小)
+        """
+        try:
+            # 确保输出目录存在
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            
+            with Image.open(input_path) as source:
+                pil_format = source.format
+                quality = None
+                strip_metadata = False
+                
+                # 先确定输出格式和保存参数，这些操作不涉及像素
+                for operation in operations:
+                    operation_type = operation.get("type")
+                    if operation_type == "format":
+                        target_format = operation["format"].lower()
+                        if target_format not in self.supported_formats:
+                            raise Exception(f"不支持的图片格式: {target_format}")
+                        pil_format = self.supported_formats[target_format]
+                    elif operation_type == "quality":
+                        quality = int(operation["quality"])
+                    elif operation_type == "strip_metadata":
+                        strip_metadata = True
+                    elif operation_type not in ("resize", "mode"):
+                        raise Exception(f"不支持的图片操作: {operation_type}")
+                
+                save_params = {}
+                if not strip_metadata:
+                    # 保留EXIF和颜色配置
+                    for key in ("exif", "icc_profile"):
+                        if source.info.get(key):
+                            save_params[key] = source.info[key]
+                
+                # 第一个像素操作是缩小时，JPEG可以直接以较低分辨率解码
+                pixel_operations = [op for op in operations if op.get("type") in ("resize", "mode")]
+                if pixel_operations and pixel_operations[0]["type"] == "resize":
+                    size = self._get_pipeline_size(source.size, pixel_operations[0])
+                    if size:
+                        self._draft_for_size(source, *size)
+                
+                img = source
+                for operation in pixel_operations:
+                    if operation["type"] == "resize":
+                        size = self._get_pipeline_size(img.size, operation)
+                        if size:
+                            img = img.resize(size, Image.Resampling.LANCZOS)
+                    else:
+                        img = img.convert(operation["mode"])
+                
+                # JPEG不支持透明通道和调色板，转换为RGB
+                if pil_format == 'JPEG' and img.mode not in ('RGB', 'L', 'CMYK'):
+                    img = img.convert('RGB')
+                
+                if quality is not None:
+                    if pil_format in ('JPEG', 'WEBP'):
+                        save_params.update(quality=quality, optimize=True)
+                    elif pil_format == 'PNG':
+                        # PNG为无损格式，使用最高压缩级别
+                        save_params.update(optimize=True, compress_level=9)
+                
+                img.save(output_path, format=pil_format, **save_params)
+            
+            # 更新进度
+            if progress_callback:
+                progress_callback(100)
+            
+            return os.path.getsize(input_path), os.path.getsize(output_path)
             
+        except Exception as e:
+            raise Exception(f"组合处理失败: {str(e)}")
+    
+    def _get_pipeline_size(self, original_size, operation):
+        """计算组合处理中调整尺寸操作的目标尺寸，无需调整时返回None"""
+        width, height = self._calculate_size(
+            original_size, operation.get("width", 0), operation.get("height", 0),
+            operation.get("keep_aspect_ratio", True)
+        )
+        if operation.get("only_shrink") and (width >= original_size[0] or height >= original_size[1]):
+            # 只缩小不放大
+            return None
+        if (width, height) == tuple(original_size):
+            return None
+        return width, height
+    
+    def batch_process_pipeline(self, input_files, output_dir, operations, progress_callback=None, max_workers=None):
+        """批量组合处理图片"""
+        try:
             # 确保输出目录存在
             os.makedirs(output_dir, exist_ok=True)
             
-            # 处理所有图片
-            for i, input_path in enumerate(input_files):
-                try:
-                    # 生成输出文件路径
-                    filename = os.path.basename(input_path)
-                    output_path = os.path.join(output_dir, filename)
-                    
-                    # 压缩图片
-                    original_size, compressed_size = self.compress_image(input_path, output_path, quality)
-                    
-                    # 计算压缩率
-                    compression_ratio = (1 - compressed_size / original_size) * 100 if original_size > 0 else 0
+            tasks = []
+            for input_path in input_files:
+                # 生成输出文件路径，格式操作决定扩展名
+                name_without_ext = os.path.splitext(os.path.basename(input_path))[0]
+                extension = get_pipeline_extension(operations, input_path)
+                output_path = os.path.join(output_dir, f"{name_without_ext}{extension}")
+                tasks.append(("pipeline", input_path, output_path, {"operations": operations}))
+            
+            return self._run_batch(tasks, progress_callback, max_workers)
+            
+        except Exception as e:
+            raise Exception(f"批量组合处理失败: {str(e)}")
+    
+    def process_image(self, operation, input_path, output_path, params):
+        """按操作类型处理单张图片
+        
+        Args:
+            operation: 操作类型，convert、resize、compress 或 pipeline
+            input_path: 输入路径
+            output_path: 输出路径
+            params: 操作参数
+            
+        Returns:
+            str: 处理结果说明
+        """
+        if operation == "convert":
+            self.convert_format(input_path, output_path, params["target_format"])
+            return ""
+        
+        if operation == "resize":
+            self.resize_image(
+                input_path, output_path, params["width"], params["height"], params["keep_aspect_ratio"]
+            )
+            return ""
+        
+        if operation == "compress":
+            original_size, compressed_size = self.compress_image(input_path, output_path, params["quality"])
+            
+            # 计算压缩率
+            compression_ratio = (1 - compressed_size / original_size) * 100 if original_size > 0 else 0
+            return f"压缩率: {compression_ratio:.2f}%"
+        
+        if operation == "pipeline":
+            original_size, output_size = self.process_pipeline(input_path, output_path, params["operations"])
+            return f"{original_size / 1024:.1f}KB -> {output_size / 1024:.1f}KB"
+        
+        raise Exception(f"不支持的图片操作: {operation}")
+    
+    def _get_batch_workers(self, task_count, max_workers):
+        """确定批量处理使用的进程数，不满足并行条件时返回1"""
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        if max_workers <= 1 or task_count < PARALLEL_MIN_FILES:
+            return 1
+        return min(max_workers, task_count)
+    
+    def _run_batch(self, tasks, progress_callback=None, max_workers=None):
+        """执行批量任务
+        
+        图片较多时分批提交到进程池并行处理，结果按输入顺序返回
+        
+        Returns:
+            list: (输入路径, 输出路径, 是否成功, 消息) 列表
+        """
+        results = []
+        workers = self._get_batch_workers(len(tasks), max_workers)
+        
+        if workers > 1:
+            chunksize = max(1, len(tasks) // (workers * CHUNKS_PER_WORKER))
+            executor = ProcessPoolExecutor(max_workers=workers)
+            result_iter = executor.map(_process_image_task, tasks, chunksize=chunksize)
+            try:
+                for result in result_iter:
+                    results.append(result)
                     
-                    results.append((input_path, output_path, True, f"压缩率: {compression_ratio:.2f}%"))
-                except Exception as e:
-                    results.append((input_path, "", False, str(e)))
+                    # 更新进度
+                    if progress_callback:
+                        progress_callback(int(len(results) / len(tasks) * 100))
+            finally:
+                # 关闭结果迭代器会取消尚未开始的分批任务
+                result_iter.close()
+                executor.shutdown(wait=True)
+        else:
+            for task in tasks:
+                results.append(_process_image_task(task))
                 
                 # 更新进度
                 if progress_callback:
-                    progress_callback(int((i+1) / len(input_files) * 100))
-            
-            return results
-            
-        except Exception as e:
-            raise Exception(f"批量压缩图片失败: {str(e)}")
+                    progress_callback(int(len(results) / len(tasks) * 100))
+        
+        return results
     
     def get_image_info(self, image_path):
         """获取图片信息"""
@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Junly文件转换工具 - 图片组合处理预设
+版权所有 (c) 2025 Junly
+"""
+
+import os
+
+# 组合处理预设：预设名称 -> (显示名称, 操作列表)
+# 操作按顺序作用于同一张解码后的图片，最后只编码保存一次，支持的操作：
+#   {"type": "resize", "width": 宽, "height": 高, "keep_aspect_ratio": True, "only_shrink": True}
+#   {"type": "mode", "mode": "RGB"}
+#   {"type": "format", "format": "webp"}
+#   {"type": "quality", "quality": 80}
+#   {"type": "strip_metadata"}
+PIPELINE_PRESETS = {
+    "web": ("网页图片 (最长边1600像素, WebP)", [
+        {"type": "resize", "width": 1600, "height": 1600, "keep_aspect_ratio": True, "only_shrink": True},
+        {"type": "format", "format": "webp"},
+        {"type": "quality", "quality": 80},
+        {"type": "strip_metadata"},
+    ]),
+    "thumbnail": ("缩略图 (最长边320像素, JPG)", [
+        {"type": "resize", "width": 320, "height": 320, "keep_aspect_ratio": True, "only_shrink": True},
+        {"type": "mode", "mode": "RGB"},
+        {"type": "format", "format": "jpg"},
+        {"type": "quality", "quality": 85},
+        {"type": "strip_metadata"},
+    ]),
+    "compress_jpg": ("压缩为JPG (质量75, 去除元数据)", [
+        {"type": "format", "format": "jpg"},
+        {"type": "quality", "quality": 75},
+        {"type": "strip_metadata"},
+    ]),
+}
+
+# 默认使用的预设
+DEFAULT_PIPELINE_PRESET = "web"
+
+
+def get_preset_operations(preset):
+    """获取预设的操作列表
+
+    Raises:
+        Exception: 预设不存在时抛出异常
+    """
+    if preset not in PIPELINE_PRESETS:
+        raise Exception(f"不支持的组合处理预设: {preset}")
+    return PIPELINE_PRESETS[preset][1]
+
+
+def get_pipeline_operations(options):
+    """从选项中获取操作列表，优先使用 operations，其次使用 preset"""
+    operations = options.get("operations")
+    if operations:
+        return operations
+    return get_preset_operations(options.get("preset", DEFAULT_PIPELINE_PRESET))
+
+
+def get_pipeline_extension(operations, input_path):
+    """根据操作列表确定输出文件扩展名，没有格式操作时保持原扩展名"""
+    for operation in reversed(operations):
+        if operation.get("type") == "format":
+            return "." + operation["format"].lower()
+    return os.path.splitext(input_path)[1]
@@ -5,21 +5,79 @@ Junly文件转换工具 - Markdown转换核心模块
 版权所有 (c) 2025 Junly
 """
 
+import io
 import os
 import re
+import html
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape as xml_escape
+
+import lxml.html
 import markdown
-import openpyxl
+from markdown.serializers import to_html_string
+from markdown.util import AMP_SUBSTITUTE, HTML_PLACEHOLDER
 from docx import Document
 from docx.shared import Pt, Inches, RGBColor
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.oxml.ns import qn, nsdecls
 from docx.oxml import parse_xml
-from bs4 import BeautifulSoup
+
+from ..excel.excel_writer import ExcelWriter
+from .table_scanner import iter_markdown_tables
+
+# Markdown扩展。不使用codehilite：其语法高亮在转换为Word时用不到，还会把代码块包进div
+MARKDOWN_EXTENSIONS = [
+    "markdown.extensions.tables",
+    "markdown.extensions.fenced_code",
+    "markdown.extensions.toc",
+]
+
+# 解析树中原始HTML的占位符
+PLACEHOLDER_RE = re.compile(re.escape(HTML_PLACEHOLDER).replace(re.escape("%s"), r"(\d+)"))
+
+# 表格的最小列宽（英寸）
+TABLE_MIN_COL_WIDTH = 0.5
+
+# 表格单元格的开始标签，宽度为auto
+TABLE_CELL_START = '<w:tc><w:tcPr><w:tcW w:type="auto" w:w="0"/></w:tcPr>'
+
+# 单元格文本中转换为制表符、换行元素的字符
+RUN_SPECIAL_RE = re.compile(r"([\t\r\n])")
+
+
+def text_width(text):
+    """文本的显示宽度，中文等非ASCII字符按1.5个字符计
+
+    用编码时丢弃非ASCII字符的方式统计其数量，不必逐个字符比较
+    """
+    if text.isascii():
+        return len(text)
+    return len(text) + 0.5 * (len(text) - len(text.encode("ascii", "ignore")))
+
+
+def run_content_xml(text):
+    """w:r 中文本内容的XML，与python-docx的 run.text 赋值结果相同：
+    制表符转换为 w:tab，换行符转换为 w:br，首尾有空白的文本保留空白
+    """
+    parts = []
+    for piece in RUN_SPECIAL_RE.split(text):
+        if not piece:
+            continue
+        if piece == "\t":
+            parts.append("<w:tab/>")
+        elif piece in "\r\n":
+            parts.append("<w:br/>")
+        else:
+            space = ' xml:space="preserve"' if piece.strip() != piece else ""
+            parts.append(f"<w:t{space}>{xml_escape(piece)}</w:t>")
+    return "".join(parts)
 
 
 class MarkdownConverter:
     """Markdown文档转换类"""
 
+    CACHE_VERSION = 3  # 转换结果缓存版本
+
     def __init__(self):
         """初始化Markdown转换器"""
         pass
@@ -34,21 +92,13 @@ class MarkdownConverter:
             raise Exception(f"读取Markdown文档失败: {str(e)}")
 
     def to_word(self, md_content, output_path, progress_callback=None):
-        """将Markdown转换为Word文档"""
+        """将Markdown转换为Word文档
+        
+        直接遍历Markdown解析得到的ElementTree生成Word内容，不再序列化为HTML后重新解析
+        """
         try:
-            # 将Markdown转换为HTML
-            html = markdown.markdown(
-                md_content,
-                extensions=[
-                    "markdown.extensions.tables",
-                    "markdown.extensions.fenced_code",
-                    "markdown.extensions.codehilite",
-                    "markdown.extensions.toc",
-                ],
-            )
-
-            # 使用BeautifulSoup解析HTML
-            soup = BeautifulSoup(html, "html.parser")
+            # 解析Markdown
+            blocks = self._parse_markdown(md_content)
 
             # 创建Word文档
             doc = Document()
@@ -58,33 +108,16 @@ class MarkdownConverter:
             style.font.name = "宋体"
             style.font.size = Pt(11)
 
-            # 总元素数，用于计算进度
-            total_elements = len(
-                soup.find_all(
-                    [
-                        "h1",
-                        "h2",
-                        "h3",
-                        "h4",
-                        "h5",
-                        "h6",
-                        "p",
-                        "ul",
-                        "ol",
-                        "table",
-                        "pre",
-                    ]
-                )
-            )
-            processed = 0
-
             # 处理所有元素
-            self._process_html_elements(soup, doc)
+            for i, element in enumerate(blocks):
+                self._process_element(element, doc)
+
+                # 更新进度
+                if progress_callback:
+                    progress_callback(int((i + 1) / len(blocks) * 100))
 
-            # 更新进度
-            if progress_callback:
-                processed += 1
-                progress_callback(int(processed / total_elements * 100))
+            if progress_callback and not blocks:
+                progress_callback(100)
 
             # 保存文档
             doc.save(output_path)
@@ -94,72 +127,174 @@ class MarkdownConverter:
         except Exception as e:
             raise Exception(f"转换为Word失败: {str(e)}")
 
-    def _process_html_elements(self, soup, doc):
-        """处理HTML元素转换为Word元素"""
-        for element in soup.children:
-            if element.name is None:
-                continue
+    def _parse_markdown(self, md_content):
+        """将Markdown解析为ElementTree，返回顶层块元素列表
+
+        与 Markdown.convert 的前三步相同：预处理、块解析、树处理（含行内解析），
+        省去序列化和后处理。原始HTML在树中以占位符表示：独占一段的原始HTML块
+        （包括围栏代码块）用lxml解析为元素；含行内原始HTML的少数元素单独序列化，
+        还原原始HTML后再用lxml解析
+        """
+        if not md_content.strip():
+            return []
+
+        md = markdown.Markdown(extensions=MARKDOWN_EXTENSIONS)
+        lines = md_content.split("\n")
+        for preprocessor in md.preprocessors:
+            lines = preprocessor.run(lines)
+        root = md.parser.parseDocument(lines).getroot()
+        for treeprocessor in md.treeprocessors:
+            new_root = treeprocessor.run(root)
+            if new_root is not None:
+                root = new_root
+
+        stash = [self._stash_html(item) for item in md.htmlStash.rawHtmlBlocks]
+        blocks = []
+        for element in root:
+            match = None
+            if element.tag == "p" and len(element) == 0 and element.text:
+                match = PLACEHOLDER_RE.fullmatch(element.text.strip())
+            if match:
+                raw_html = stash[int(match.group(1))]
+                if raw_html.strip():
+                    blocks.extend(
+                        fragment for fragment in lxml.html.fragments_fromstring(raw_html)
+                        if not isinstance(fragment, str)
+                    )
+            elif any(PLACEHOLDER_RE.search(text) for text in element.itertext()):
+                blocks.append(self._reparse_with_raw_html(element, stash))
+            else:
+                self._unescape_text(element)
+                blocks.append(element)
+        return blocks
+
+    @staticmethod
+    def _stash_html(item):
+        """扩展也可能将元素存入原始HTML列表"""
+        if isinstance(item, str):
+            return item
+        return ElementTree.tostring(item, encoding="unicode")
+
+    @staticmethod
+    def _reparse_with_raw_html(element, stash):
+        """与 Markdown.convert 相同地序列化元素并还原原始HTML，再解析为lxml元素
+
+        段落中的块级HTML（如 <div>、<table>）会使HTML解析器提前结束段落并拆成多个片段，
+        将拆开的片段放回同一个元素，与原始HTML按嵌套解析时一样作为一个段落处理
+        """
+        text = to_html_string(element)
+        text = PLACEHOLDER_RE.sub(lambda m: stash[int(m.group(1))], text)
+        fragments = lxml.html.fragments_fromstring(text.replace(AMP_SUBSTITUTE, "&"))
+
+        first = fragments[0] if fragments else None
+        if first is not None and not isinstance(first, str) and first.tag == element.tag:
+            merged = first
+            fragments = fragments[1:]
+        else:
+            merged = lxml.html.Element(element.tag)
+
+        for fragment in fragments:
+            if isinstance(fragment, str):
+                # 片段之间的文本接在前一个片段之后
+                if len(merged):
+                    merged[-1].tail = (merged[-1].tail or "") + fragment
+                else:
+                    merged.text = (merged.text or "") + fragment
+            else:
+                merged.append(fragment)
+        return merged
+
+    @staticmethod
+    def _unescape_text(element):
+        """还原元素树中已转义的文本，使各节点的文本与浏览器显示的文本一致"""
+        for node in element.iter():
+            # 代码的文本在解析时已按HTML转义
+            if node.tag == "code" and node.text:
+                node.text = html.unescape(node.text)
+            # 邮件地址等自动链接中的字符实体
+            if node.text and AMP_SUBSTITUTE in node.text:
+                node.text = html.unescape(node.text.replace(AMP_SUBSTITUTE, "&"))
+            if node.tail and AMP_SUBSTITUTE in node.tail:
+                node.tail = html.unescape(node.tail.replace(AMP_SUBSTITUTE, "&"))
+
+    @staticmethod
+    def _element_text(element):
+        """元素及其子元素的全部文本"""
+        return "".join(element.itertext())
+
+    def _process_element(self, element, doc):
+        """处理顶层元素转换为Word元素"""
+        tag = element.tag
+        if tag in ["h1", "h2", "h3", "h4", "h5", "h6"]:
+            level = int(tag[1])
+            p = doc.add_heading("", level=level)
+            # 使用内联元素处理，保留粗体/斜体等格式
+            self._process_inline_elements(element, p)
 
-            if element.name in ["h1", "h2", "h3", "h4", "h5", "h6"]:
-                level = int(element.name[1])
-                p = doc.add_heading("", level=level)
-                # 使用内联元素处理，保留粗体/斜体等格式
-                self._process_inline_elements(element, p)
+        elif tag == "p":
+            p = doc.add_paragraph()
+            # 使用内联元素处理，保留粗体/斜体等格式
+            self._process_inline_elements(element, p)
 
-            elif element.name == "p":
-                p = doc.add_paragraph()
-                # 使用内联元素处理，保留粗体/斜体等格式
-                self._process_inline_elements(element, p)
+        elif tag == "ul" or tag == "ol":
+            self._process_list(element, doc)
 
-            elif element.name == "ul" or element.name == "ol":
-                self._process_list(element, doc)
+        elif tag == "table":
+            self._process_table(element, doc)
 
-            elif element.name == "table":
-                self._process_table(element, doc)
+        elif tag == "pre":
+            p = doc.add_paragraph()
+            p.add_run(self._element_text(element)).font.name = "Courier New"
 
-            elif element.name == "pre":
-                p = doc.add_paragraph()
-                p.add_run(element.get_text()).font.name = "Courier New"
+    def _add_text(self, paragraph, text):
+        """添加纯文本，去掉首尾换行，只有空白时忽略"""
+        if text:
+            text = text.strip("\n\r")
+            if text.strip():
+                paragraph.add_run(text)
 
     def _process_inline_elements(self, element, paragraph):
         """处理内联元素（粗体、斜体、代码等），保留格式信息"""
-        from bs4 import NavigableString
-
-        for child in element.children:
-            if isinstance(child, NavigableString):
-                # 纯文本节点，去掉首尾换行后添加
-                text = str(child).strip("\n\r")
-                if text.strip():
-                    paragraph.add_run(text)
-            elif child.name in ["strong", "b"]:
+        self._add_text(paragraph, element.text)
+
+        for child in element:
+            tag = child.tag
+            if not isinstance(tag, str):
+                # HTML注释等非元素节点
+                pass
+            elif tag in ["strong", "b"]:
                 # 粗体文本
-                run = paragraph.add_run(child.get_text())
+                run = paragraph.add_run(self._element_text(child))
                 run.bold = True
-            elif child.name in ["em", "i"]:
+            elif tag in ["em", "i"]:
                 # 斜体文本
-                run = paragraph.add_run(child.get_text())
+                run = paragraph.add_run(self._element_text(child))
                 run.italic = True
-            elif child.name == "code":
+            elif tag == "code":
                 # 行内代码
-                run = paragraph.add_run(child.get_text())
+                run = paragraph.add_run(self._element_text(child))
                 run.font.name = "Courier New"
-            elif child.name == "a":
+            elif tag == "a":
                 # 链接，显示链接文本
-                run = paragraph.add_run(child.get_text())
+                run = paragraph.add_run(self._element_text(child))
                 run.font.color.rgb = RGBColor(0x05, 0x63, 0xC1)
                 run.underline = True
-            elif child.name == "p":
+            elif tag == "p":
                 # 段落子元素（如 li 内嵌的 p），递归处理其内联内容
                 self._process_inline_elements(child, paragraph)
             else:
                 # 其他内联元素，提取文本
-                paragraph.add_run(child.get_text())
+                paragraph.add_run(self._element_text(child))
+
+            self._add_text(paragraph, child.tail)
 
     def _process_list(self, list_elem, doc):
         """处理列表元素"""
-        is_ordered = list_elem.name == "ol"
+        is_ordered = list_elem.tag == "ol"
 
-        for i, item in enumerate(list_elem.find_all("li", recursive=False)):
+        for item in list_elem:
+            if item.tag != "li":
+                continue
             if is_ordered:
                 p = doc.add_paragraph(style="List Number")
             else:
@@ -168,192 +303,119 @@ class MarkdownConverter:
             self._process_inline_elements(item, p)
 
     def _process_table(self, table_elem, doc):
-        """处理表格元素"""
-        rows = table_elem.find_all("tr")
+        """处理表格元素
+
+        一次生成整个 w:tbl 的XML后插入文档，不再逐个单元格通过python-docx的代理对象设置内容和宽度。
+        单元格宽度为auto、表格布局为自动调整，与逐个单元格设置时的最终结果相同；
+        按内容计算的列宽写入表格网格（w:tblGrid），作为各列的初始宽度
+        """
+        rows = list(table_elem.iter("tr"))
         if not rows:
             return
 
-        # 创建表格
+        # 各行单元格的文本，以及是否为表头
+        row_cells = [
+            [(self._element_text(cell).strip(), cell.tag == "th")
+             for cell in row.iter() if cell.tag in ("th", "td")]
+            for row in rows
+        ]
         num_rows = len(rows)
-        max_cols = max(len(row.find_all(["th", "td"])) for row in rows)
+        max_cols = max(len(cells) for cells in row_cells)
 
         if num_rows == 0 or max_cols == 0:
             return
 
-        table = doc.add_table(rows=num_rows, cols=max_cols)
-        table.style = "Table Grid"
-
-        # 设置表格自动调整宽度
-        table.autofit = True
-        table.allow_autofit = True
-
-        # 填充表格数据并计算最大文本长度（考虑中英文字符宽度差异）
+        # 计算各列的最大文本宽度（中文等非ASCII字符按1.5个字符计）
         col_content_widths = [0] * max_cols
-
-        for i, row in enumerate(rows):
-            cells = row.find_all(["th", "td"])
-            for j, cell in enumerate(cells):
-                if j < max_cols:  # 防止越界
-                    text = cell.get_text().strip()
-                    table.cell(i, j).text = text
-
-                    # 计算文本宽度（中文字符占用更大宽度）
-                    char_width = 0
-                    for char in text:
-                        # 判断是否是中文或其他宽字符
-                        if ord(char) > 127:
-                            char_width += 1.5  # 中文字符宽度
-                        else:
-                            char_width += 1.0  # 英文字符宽度
-
-                    # 更新此列的最大文本宽度
-                    col_content_widths[j] = max(col_content_widths[j], char_width)
-
-                    # 如果是表头，应用粗体样式
-                    if cell.name == "th" or i == 0:
-                        for paragraph in table.cell(i, j).paragraphs:
-                            for run in paragraph.runs:
-                                run.bold = True
-
-        # 设置表格不自动调整，以便我们手动设置列宽
-        table.autofit = False
-        table.allow_autofit = False
-
-        # 计算总宽度和每列占比
+        for cells in row_cells:
+            for j, (text, _) in enumerate(cells):
+                width = text_width(text)
+                if width > col_content_widths[j]:
+                    col_content_widths[j] = width
+
+        # 根据内容占总内容的比例分配页面正文宽度，但至少保持最小宽度
+        page_width = doc._block_width.inches
         total_content_width = sum(col_content_widths)
-
-        # 页面最大宽度（单位：英寸）- 考虑页面边距
-        page_width = 6.5
-
-        # 根据内容长度设置列宽
-        for j, char_width in enumerate(col_content_widths):
-            # 设置最小和最大宽度限制
-            min_width = 0.5  # 英寸
-
-            # 根据内容占总内容的比例计算列宽
+        grid = []
+        for char_width in col_content_widths:
             if total_content_width > 0:
-                # 根据内容比例分配宽度，但至少保持最小宽度
-                width_ratio = char_width / total_content_width
-                width = max(width_ratio * page_width, min_width)
+                width = max(char_width / total_content_width * page_width, TABLE_MIN_COL_WIDTH)
             else:
-                width = min_width
-
-            # 为表格中每个单元格设置宽度
-            for cell in table.columns[j].cells:
-                cell.width = Inches(width)
-
-        # 为了确保表格自适应，我们设置表格属性
-        # 首先设置每个单元格的宽度类型为auto
-        for row in table.rows:
-            for cell in row.cells:
-                # 使用低级API直接设置宽度类型为auto
-                cell._tc.tcPr.tcW.type = "auto"
-                cell._tc.tcPr.tcW.w = 0
+                width = TABLE_MIN_COL_WIDTH
+            grid.append(f'<w:gridCol w:w="{Inches(width).twips}"/>')
+
+        # 生成表格XML，第一行和th单元格为粗体
+        parts = [
+            f"<w:tbl {nsdecls('w')}><w:tblPr>"
+            f'<w:tblStyle w:val="{doc.styles["Table Grid"].style_id}"/>'
+            '<w:tblW w:type="auto" w:w="0"/><w:tblLayout w:type="autofit"/>'
+            '<w:tblLook w:firstColumn="1" w:firstRow="1" w:lastColumn="0" w:lastRow="0" '
+            'w:noHBand="0" w:noVBand="1" w:val="04A0"/>'
+            f"</w:tblPr><w:tblGrid>{''.join(grid)}</w:tblGrid>"
+        ]
+        for i, cells in enumerate(row_cells):
+            parts.append("<w:tr>")
+            for text, is_header in cells:
+                run_properties = "<w:rPr><w:b/></w:rPr>" if is_header or i == 0 else ""
+                parts.append(
+                    f"{TABLE_CELL_START}<w:p><w:r>{run_properties}{run_content_xml(text)}</w:r></w:p></w:tc>"
+                )
+            # 单元格数不足的行补齐空单元格
+            parts.append(f"{TABLE_CELL_START}<w:p/></w:tc>" * (max_cols - len(cells)))
+            parts.append("</w:tr>")
+        parts.append("</w:tbl>")
 
-        # 然后设置表格布局为自动调整
-        table.autofit = True
+        doc.element.body._insert_tbl(parse_xml("".join(parts)))
 
     def extract_tables_to_excel(self, md_content, output_path, progress_callback=None):
-        """提取Markdown表格数据，保存为Excel"""
+        """提取Markdown表格数据，保存为Excel
+
+        逐行扫描表格并立即按整行写入Excel，不保留已处理的表格，
+        内存占用与表格数量无关
+        """
         try:
-            # 使用正则表达式匹配Markdown表格
-            # 表格模式: |列1|列2|...| + 分隔行 + 数据行
-            table_pattern = r"(\|[^\n]+\|\n\|[-:| ]+\|\n(?:\|[^\n]+\|\n)+)"
-            tables = re.findall(table_pattern, md_content)
-
-            if not tables:
-                raise Exception("未找到表格数据")
-
-            # 创建Excel工作簿
-            workbook = openpyxl.Workbook()
-            # 删除默认工作表
-            if "Sheet" in workbook.sheetnames:
-                std_sheet = workbook["Sheet"]
-                workbook.remove(std_sheet)
-
-            # 处理找到的表格
-            same_header_tables = []
-            diff_header_tables = []
-
-            for i, table_text in enumerate(tables):
-                # 解析表格
-                lines = table_text.strip().split("\n")
-                header_line = lines[0]
-
-                # 提取表头
-                headers = [cell.strip() for cell in header_line.strip("|").split("|")]
-
-                # 创建表格数据
-                table_data = []
-                table_data.append(headers)  # 添加表头
-
-                # 添加数据行 (跳过分隔行)
-                for line in lines[2:]:
-                    if line.strip():
-                        cells = [cell.strip() for cell in line.strip("|").split("|")]
-                        table_data.append(cells)
-
-                # 根据表头判断归类
-                if i == 0:
-                    same_header_tables.append(table_data)
-                else:
-                    # 与第一个表格比较表头
-                    if headers == same_header_tables[0][0]:
-                        same_header_tables.append(table_data)
+            with ExcelWriter(output_path) as writer:
+                same_sheet = None
+                diff_sheet = None
+                headers = None
+
+                # 逐行扫描表格
+                stream = io.StringIO(md_content)
+                for table in iter_markdown_tables(stream):
+                    if headers is None:
+                        # 第一个表格的表头作为相同表头工作表的表头
+                        headers = table[0]
+                        same_sheet = writer.add_sheet("相同表头表格")
+                        same_sheet.append(headers)
+
+                    if table[0] == headers:
+                        # 与第一个表格表头相同，只写入数据行
+                        for data_row in table[1:]:
+                            same_sheet.append(data_row[:len(headers)])
                     else:
-                        diff_header_tables.append(table_data)
+                        if diff_sheet is None:
+                            diff_sheet = writer.add_sheet("不同表头表格")
+                        else:
+                            # 表格之间空行分隔
+                            diff_sheet.append([])
+                            diff_sheet.append([])
+
+                        # 写入表格内容
+                        for data_row in table:
+                            diff_sheet.append(data_row)
+
+                    # 更新进度
+                    if progress_callback:
+                        progress_callback(int(stream.tell() / max(len(md_content), 1) * 100))
+
+                if headers is None:
+                    raise Exception("未找到表格数据")
+
+                # 保存Excel文件
+                writer.save()
 
-                # 更新进度
                 if progress_callback:
-                    progress_callback(int((i + 1) / len(tables) * 100))
-
-            # 创建包含相同表头的工作表
-            if same_header_tables:
-                same_sheet = workbook.create_sheet(title="相同表头表格")
-                row_idx = 1
-
-                # 写入表头
-                headers = same_header_tables[0][0]
-                for col_idx, header in enumerate(headers, 1):
-                    same_sheet.cell(row=row_idx, column=col_idx, value=header)
-
-                row_idx += 1
-
-                # 写入所有表格数据
-                for table in same_header_tables:
-                    for data_row in table[1:]:  # 跳过表头
-                        for col_idx, cell_value in enumerate(data_row, 1):
-                            if col_idx <= len(headers):
-                                same_sheet.cell(
-                                    row=row_idx, column=col_idx, value=cell_value
-                                )
-                        row_idx += 1
-
-            # 创建包含不同表头的工作表
-            if diff_header_tables:
-                diff_sheet = workbook.create_sheet(title="不同表头表格")
-                row_idx = 1
-
-                # 依次写入每个表格
-                for table_idx, table in enumerate(diff_header_tables):
-                    # 表格之间空行分隔
-                    if table_idx > 0:
-                        row_idx += 2
-
-                    # 写入表格内容
-                    for data_row in table:
-                        for col_idx, cell_value in enumerate(data_row, 1):
-                            diff_sheet.cell(
-                                row=row_idx, column=col_idx, value=cell_value
-                            )
-                        row_idx += 1
-
-            # 如果没有不同表头的表格，创建空白工作表
-            if not diff_header_tables and not same_header_tables:
-                workbook.create_sheet(title="无表格数据")
-
-            # 保存Excel文件
-            workbook.save(output_path)
+                    progress_callback(100)
 
             return True
 
@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Junly文件转换工具 - Markdown表格扫描
+版权所有 (c) 2025 Junly
+"""
+
+import re
+
+# 表格的对齐行，例如 | --- | :---: | ---: |
+ALIGNMENT_ROW_RE = re.compile(r"^\|?\s*:?-+:?\s*(\|\s*:?-+:?\s*)*\|?$")
+
+# 围栏代码块的开始或结束行
+FENCE_RE = re.compile(r"^\s{0,3}(`{3,}|~{3,})")
+
+
+def split_table_row(line):
+    """将表格行拆分为单元格文本
+
+    转义的竖线（\\|）是单元格内容中的竖线；行内代码中的竖线不分隔单元格，
+    与Markdown转Word时使用的tables扩展一致。首尾的竖线可以省略
+    """
+    text = line.strip()
+    if text.startswith("|"):
+        text = text[1:]
+    if text.endswith("|") and not text.endswith("\\|"):
+        text = text[:-1]
+
+    # 大部分行没有转义和行内代码，直接按竖线拆分
+    if "\\" not in text and "`" not in text:
+        return [cell.strip() for cell in text.split("|")]
+
+    cells = []
+    current = []
+    i = 0
+    length = len(text)
+    while i < length:
+        char = text[i]
+        if char == "\\" and i + 1 < length and text[i + 1] == "|":
+            current.append("|")
+            i += 2
+        elif char == "`":
+            # 行内代码：到下一个相同长度的反引号串为止，中间的内容原样保留
+            end = i
+            while end < length and text[end] == "`":
+                end += 1
+            marker = text[i:end]
+            close = _find_closing_backticks(text, marker, end)
+            if close < 0:
+                current.append(marker)
+                i = end
+            else:
+                current.append(text[i:close + len(marker)])
+                i = close + len(marker)
+        elif char == "|":
+            cells.append("".join(current).strip())
+            current = []
+            i += 1
+        else:
+            current.append(char)
+            i += 1
+    cells.append("".join(current).strip())
+    return cells
+
+
+def _find_closing_backticks(text, marker, start):
+    """查找与开始反引号串长度相同的结束反引号串，没有时返回-1"""
+    while True:
+        close = text.find(marker, start)
+        if close < 0:
+            return -1
+        end = close + len(marker)
+        if end >= len(text) or text[end] != "`":
+            return close
+        # 更长的反引号串不能作为结束
+        while end < len(text) and text[end] == "`":
+            end += 1
+        start = end
+
+
+def iter_markdown_tables(lines):
+    """逐行扫描Markdown，依次返回其中的表格
+
+    表格由表头行、对齐行和至少一行数据行组成，遇到空行或不含竖线的行结束。
+    围栏代码块中的内容不作为表格。每次只在内存中保留当前表格
+
+    Args:
+        lines: 可迭代的文本行，例如打开的文件或 io.StringIO
+
+    Yields:
+        list: 表格各行的单元格文本，第一行为表头
+    """
+    previous = None  # 上一行，可能是表头
+    table = None     # 当前表格，对齐行之后才开始
+    fence = None     # 当前围栏代码块的开始标记
+
+    for line in lines:
+        stripped = line.strip()
+
+        # 跳过围栏代码块
+        match = FENCE_RE.match(line)
+        if fence is not None:
+            if match and match.group(1)[0] == fence[0] and len(match.group(1)) >= len(fence):
+                fence = None
+            continue
+        if match:
+            if table is not None and len(table) > 1:
+                yield table
+            table = None
+            previous = None
+            fence = match.group(1)
+            continue
+
+        if table is not None:
+            if stripped and "|" in stripped:
+                table.append(split_table_row(stripped))
+                continue
+            # 表格结束
+            if len(table) > 1:
+                yield table
+            table = None
+
+        # 对齐行必须包含竖线，单独的 --- 是分隔线或标题下划线
+        if previous is not None and "|" in stripped and ALIGNMENT_ROW_RE.match(stripped):
+            table = [split_table_row(previous)]
+            previous = None
+            continue
+
+        previous = stripped if stripped and "|" in stripped else None
+
+    if table is not None and len(table) > 1:
+        yield table
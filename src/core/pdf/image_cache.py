@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Junly文件转换工具 - PDF图片去重缓存
+版权所有 (c) 2025 Junly
+"""
+
+import os
+import shutil
+import hashlib
+
+
+class PDFImageCache:
+    """PDF图片去重缓存
+
+    同一文档内按xref缓存已提取图片的摘要，跨文档按内容哈希索引已写出的文件。
+    每张不同的图片只解码、写盘一次，重复出现时以硬链接代替。
+    批量处理时多个文档共用同一个缓存对象即可实现跨文档去重。
+    """
+
+    def __init__(self):
+        """初始化图片缓存"""
+        # 内容哈希 -> 已写出的图片文件路径
+        self.hash_index = {}
+        # 当前文档的 xref -> (内容哈希, 扩展名, 字节数)
+        self._xref_entries = {}
+
+        # 统计信息
+        self.unique_images = 0
+        self.duplicate_images = 0
+        self.bytes_saved = 0
+
+    def start_document(self):
+        """开始处理新文档，xref编号只在单个文档内有效"""
+        self._xref_entries = {}
+
+    def save_image(self, pdf, xref, path_stem, base_image=None):
+        """保存xref对应的图片
+
+        Args:
+            pdf: fitz文档对象
+            xref: 图片的xref编号
+            path_stem: 不含扩展名的输出路径，扩展名由图片类型决定
+            base_image: 调用方已提取的图片数据，传入时不再重复提取
+
+        Returns:
+            str: 写出的图片文件路径
+        """
+        entry = self._xref_entries.get(xref)
+        image_bytes = None
+
+        if entry is None:
+            if base_image is None:
+                base_image = pdf.extract_image(xref)
+            image_bytes = base_image["image"]
+            entry = (hashlib.sha1(image_bytes).hexdigest(), base_image["ext"], len(image_bytes))
+            self._xref_entries[xref] = entry
+
+        digest, ext, size = entry
+        img_path = f"{path_stem}.{ext}"
+
+        # 相同内容的图片已经写出过，使用硬链接代替重新写入
+        existing = self.hash_index.get(digest)
+        if existing and existing != img_path and os.path.exists(existing):
+            if self._link_or_copy(existing, img_path):
+                self.bytes_saved += size
+            self.duplicate_images += 1
+            return img_path
+
+        if image_bytes is None:
+            image_bytes = base_image["image"] if base_image else pdf.extract_image(xref)["image"]
+
+        self._write_new_file(img_path, image_bytes)
+
+        self.hash_index[digest] = img_path
+        self.unique_images += 1
+        return img_path
+
+    def _write_new_file(self, path, data):
+        """写出图片文件
+
+        目标可能是上次运行留下的硬链接，先删除再写入，
+        避免同时改写与它共用数据的其他文件
+        """
+        if os.path.exists(path):
+            os.remove(path)
+
+        with open(path, "wb") as f:
+            f.write(data)
+
+    def _link_or_copy(self, source, target):
+        """为重复图片创建硬链接，文件系统不支持时退回复制
+
+        Returns:
+            bool: 是否成功创建硬链接
+        """
+        if os.path.exists(target):
+            os.remove(target)
+
+        try:
+            os.link(source, target)
+            return True
+        except OSError:
+            shutil.copyfile(source, target)
+            return False
+
+    def summary(self):
+        """获取本次运行的去重统计文本"""
+        return (
+            f"图片去重: 唯一图片{self.unique_images}张，重复图片{self.duplicate_images}张，"
+            f"节省写入{self._format_size(self.bytes_saved)}"
+        )
+
+    def _format_size(self, size):
+        """格式化字节数"""
+        for unit in ("B", "KB", "MB"):
+            if size < 1024:
+                return f"{size:.0f}{unit}" if unit == "B" else f"{size:.1f}{unit}"
+            size /= 1024
+        return f"{size:.1f}GB"
@@ -7,15 +7,44 @@ Junly文件转换工具 - PDF转换核心模块
 
 import os
 import io
+import math
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import fitz  # PyMuPDF
 from docx import Document
 from docx.shared import Pt, Inches
+from docx.oxml.shape import CT_Inline
 from PIL import Image
 import re
 
+from .image_cache import PDFImageCache
+
+# 页面之间的分隔线
+PAGE_SEPARATOR = "\n\n" + "-" * 80 + "\n\n"
+
+# 启用多进程提取文本的最小页数，页数较少时进程启动开销大于收益
+PARALLEL_MIN_PAGES = 64
+
+# 每个工作进程平均分到的页段数，页段切得更细可以平衡各页耗时不均的情况
+CHUNKS_PER_WORKER = 4
+
+# 转换为Word时每处理多少页释放一次MuPDF的资源缓存
+STORE_FLUSH_PAGES = 50
+
+
+def _extract_page_texts(file_path, start, end):
+    """在工作进程中提取[start, end)范围内各页的文本
+    
+    fitz.Document不能跨进程共享，每个工作进程独立打开文档
+    """
+    with fitz.open(file_path) as pdf:
+        return [pdf[i].get_text() for i in range(start, end)]
+
+
 class PDFConverter:
     """PDF文档转换类"""
     
+    CACHE_VERSION = 1  # 转换结果缓存版本
+    
     def __init__(self):
         """初始化PDF转换器"""
         pass
@@ -27,9 +56,30 @@ class PDFConverter:
         except Exception as e:
             raise Exception(f"读取PDF文档失败: {str(e)}")
     
-    def to_word(self, pdf, output_path, include_images=True, progress_callback=None):
-        """将PDF转换为Word文档"""
+    def to_word(self, pdf, output_path, include_images=True, progress_callback=None,
+                save_image_files=True, image_cache=None):
+        """将PDF转换为Word文档
+        
+        图片数据以内存流直接写入Word文档，不经过磁盘中转；每处理一批页面释放一次
+        MuPDF的资源缓存，避免大文件转换时内存持续增长。同一图片在多页重复出现时
+        只提取一次，文档中引用同一个图片部件
+        
+        Args:
+            pdf: fitz文档对象
+            output_path: 输出文件路径
+            include_images: 是否包含图片
+            progress_callback: 进度回调函数
+            save_image_files: 是否同时将图片另存到"_images"目录
+            image_cache: 图片去重缓存，批量处理时传入同一个对象可跨文档去重
+        """
         try:
+            if image_cache is None:
+                image_cache = PDFImageCache()
+            image_cache.start_document()
+            
+            # xref -> (rId, image)，重复出现的图片直接引用已添加的图片部件
+            doc_images = {}
+            
             # 创建Word文档
             doc = Document()
             
@@ -39,11 +89,12 @@ class PDFConverter:
             style.font.size = Pt(11)
             
             # 创建图片目录
-            if include_images:
+            if include_images and save_image_files:
                 img_dir = os.path.splitext(output_path)[0] + "_images"
                 os.makedirs(img_dir, exist_ok=True)
             
             # 处理所有页面
+            page_count = len(pdf)
             for i, page in enumerate(pdf):
                 # 提取文本
                 text = page.get_text()
@@ -57,27 +108,41 @@ class PDFConverter:
                     for j, img in enumerate(image_list):
                         xref = img[0]
                         try:
-                            # 获取图像数据
-                            base_image = pdf.extract_image(xref)
-                            image_bytes = base_image["image"]
+                            cached = doc_images.get(xref)
+                            if cached is None:
+                                # 获取图像数据
+                                base_image = pdf.extract_image(xref)
+                                image_bytes = base_image["image"]
+                                
+                                # 按需保存图像到文件
+                                if save_image_files:
+                                    image_cache.save_image(
+                                        pdf, xref, os.path.join(img_dir, f"page{i+1}_img{j+1}"),
+                                        base_image
+                                    )
+                                
+                                # 直接从内存将图像添加到Word文档
+                                cached = doc.part.get_or_add_image(io.BytesIO(image_bytes))
+                                doc_images[xref] = cached
+                            elif save_image_files:
+                                image_cache.save_image(
+                                    pdf, xref, os.path.join(img_dir, f"page{i+1}_img{j+1}")
+                                )
                             
-                            # 确定图像类型
-                            ext = base_image["ext"]
-                            
-                            # 保存图像到文件
-                            img_path = os.path.join(img_dir, f"page{i+1}_img{j+1}.{ext}")
-                            with open(img_path, "wb") as f:
-                                f.write(image_bytes)
-                            
-                            # 将图像添加到Word文档
-                            doc.add_picture(img_path, width=Inches(4))
+                            self._add_picture_reference(doc, *cached, Inches(4))
                         except Exception as e:
                             # 图像提取失败，继续处理其他图像
                             print(f"图像提取失败: {str(e)}")
                 
+                # 分批释放MuPDF缓存的已解码资源，控制峰值内存
+                if (i + 1) % STORE_FLUSH_PAGES == 0:
+                    fitz.TOOLS.store_shrink(100)
+                
                 # 更新进度
                 if progress_callback:
-                    progress_callback(int((i+1) / len(pdf) * 100))
+                    progress_callback(int((i+1) / page_count * 100))
+            
+            fitz.TOOLS.store_shrink(100)
             
             # 保存文档
             doc.save(output_path)
@@ -87,34 +152,121 @@ class PDFConverter:
         except Exception as e:
             raise Exception(f"转换为Word失败: {str(e)}")
     
-    def to_text(self, pdf, output_path, progress_callback=None):
-        """将PDF转换为文本文件"""
+    def _add_picture_reference(self, doc, rId, image, width):
+        """在新段落中插入引用已有图片部件的图片，效果与doc.add_picture相同"""
+        cx, cy = image.scaled_dimensions(width, None)
+        inline = CT_Inline.new_pic_inline(doc.part.next_id, rId, image.filename, cx, cy)
+        doc.add_paragraph().add_run()._r.add_drawing(inline)
+    
+    def to_text(self, pdf, output_path, progress_callback=None, max_workers=None):
+        """将PDF转换为文本文件
+        
+        页数较多时按页段拆分到多个进程并行提取，结果按页序拼接，与单进程输出一致
+        
+        Args:
+            pdf: fitz文档对象
+            output_path: 输出文件路径
+            progress_callback: 进度回调函数
+            max_workers: 最大工作进程数，None表示使用CPU核心数，1表示单进程处理
+        """
         try:
+            workers = self._get_text_workers(pdf, max_workers)
+            
             with open(output_path, 'w', encoding='utf-8') as f:
-                for i, page in enumerate(pdf):
-                    # 提取文本
-                    text = page.get_text()
-                    f.write(text)
-                    
-                    # 不同页面之间添加分隔线
-                    if i < len(pdf) - 1:
-                        f.write("\n\n" + "-" * 80 + "\n\n")
-                    
-                    # 更新进度
-                    if progress_callback:
-                        progress_callback(int((i+1) / len(pdf) * 100))
+                if workers > 1:
+                    self._write_text_parallel(pdf.name, len(pdf), f, workers, progress_callback)
+                else:
+                    for i, page in enumerate(pdf):
+                        # 提取文本
+                        text = page.get_text()
+                        f.write(text)
+                        
+                        # 不同页面之间添加分隔线
+                        if i < len(pdf) - 1:
+                            f.write(PAGE_SEPARATOR)
+                        
+                        # 更新进度
+                        if progress_callback:
+                            progress_callback(int((i+1) / len(pdf) * 100))
             
             return True
             
         except Exception as e:
             raise Exception(f"转换为文本失败: {str(e)}")
     
-    def extract_images(self, pdf, output_dir, progress_callback=None):
-        """提取PDF中的图片"""
+    def _get_text_workers(self, pdf, max_workers):
+        """确定提取文本使用的进程数，不满足并行条件时返回1"""
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        if max_workers <= 1 or len(pdf) < PARALLEL_MIN_PAGES:
+            return 1
+        
+        # 工作进程需要从磁盘重新打开文档，内存文档、加密文档和已修改的文档只能单进程处理
+        if not pdf.name or not os.path.isfile(pdf.name):
+            return 1
+        if pdf.needs_pass or pdf.is_dirty:
+            return 1
+        
+        return max_workers
+    
+    def _write_text_parallel(self, file_path, page_count, f, workers, progress_callback=None):
+        """多进程提取文本，并按页序写入文件"""
+        chunk_size = max(1, math.ceil(page_count / (workers * CHUNKS_PER_WORKER)))
+        ranges = [(start, min(start + chunk_size, page_count))
+                  for start in range(0, page_count, chunk_size)]
+        
+        # 已完成但还不能写出的页段，键为起始页
+        pending = {}
+        next_start = 0
+        done_pages = 0
+        
+        executor = ProcessPoolExecutor(max_workers=min(workers, len(ranges)))
+        futures = {}
+        try:
+            for start, end in ranges:
+                futures[executor.submit(_extract_page_texts, file_path, start, end)] = start
+            for future in as_completed(futures):
+                texts = future.result()
+                pending[futures[future]] = texts
+                done_pages += len(texts)
+                
+                # 写出所有按页序已就绪的页段
+                while next_start in pending:
+                    texts = pending.pop(next_start)
+                    for offset, text in enumerate(texts):
+                        f.write(text)
+                        if next_start + offset < page_count - 1:
+                            f.write(PAGE_SEPARATOR)
+                    next_start += len(texts)
+                
+                # 更新进度
+                if progress_callback:
+                    progress_callback(int(done_pages / page_count * 100))
+        finally:
+            # 出错时取消尚未开始的页段；Python 3.8 的 shutdown 不支持 cancel_futures 参数
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=True)
+    
+    def extract_images(self, pdf, output_dir, progress_callback=None, image_cache=None):
+        """提取PDF中的图片
+        
+        同一图片在多页重复出现时只提取、写入一次，其余位置以硬链接代替
+        
+        Args:
+            pdf: fitz文档对象
+            output_dir: 图片输出目录
+            progress_callback: 进度回调函数
+            image_cache: 图片去重缓存，批量处理时传入同一个对象可跨文档去重
+        """
         try:
             # 确保输出目录存在
             os.makedirs(output_dir, exist_ok=True)
             
+            if image_cache is None:
+                image_cache = PDFImageCache()
+            image_cache.start_document()
+            
             image_count = 0
             
             # 处理所有页面
@@ -125,17 +277,10 @@ class PDFConverter:
                 for j, img in enumerate(image_list):
                     xref = img[0]
                     try:
-                        # 获取图像数据
-                        base_image = pdf.extract_image(xref)
-                        image_bytes = base_image["image"]
-                        
-                        # 确定图像类型
-                        ext = base_image["ext"]
-                        
-                        # 保存图像到文件
-                        img_path = os.path.join(output_dir, f"page{i+1}_img{j+1}.{ext}")
-                        with open(img_path, "wb") as f:
-                            f.write(image_bytes)
+                        # 保存图像到文件，扩展名由图像类型决定
+                        image_cache.save_image(
+                            pdf, xref, os.path.join(output_dir, f"page{i+1}_img{j+1}")
+                        )
                             
                         image_count += 1
                     except Exception as e:
@@ -149,4 +294,4 @@ class PDFConverter:
             return image_count
             
         except Exception as e:
-            raise Exception(f"提取图片失败: {str(e)}") 
\ No newline at end of file
+            raise Exception(f"提取图片失败: {str(e)}")
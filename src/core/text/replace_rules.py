@@ -0,0 +1,330 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Junly文件转换工具 - 批量替换规则
+版权所有 (c) 2025 Junly
+"""
+
+import re
+import threading
+from collections import namedtuple
+from functools import lru_cache
+
+# 正则表达式规则的前缀，例如 re:(\d+)元->\1 CNY
+REGEX_RULE_PREFIX = "re:"
+
+# 缓存的规则集数量
+RULE_SET_CACHE_SIZE = 32
+
+# 文本中的各行，行尾的换行符属于该行
+LINE_RE = re.compile(r"[^\n]*\n|[^\n]+")
+
+# 一条替换规则，regex为True时source是正则表达式，target可以引用分组
+ReplaceRule = namedtuple("ReplaceRule", ["source", "target", "regex"])
+
+
+def parse_rules(rules_text):
+    """解析替换规则文本
+
+    每行一条规则，格式为 原文本->替换文本；以 re: 开头的规则按正则表达式匹配，
+    替换文本中可以使用 \\1、\\g<name> 引用分组。
+
+    替换分两步执行：先一次完成全部普通规则的替换，再对结果按列出的顺序逐条执行
+    正则规则；普通规则和正则规则交错列出时，不改变这两步的先后。正则规则只在
+    单行（包括行尾的换行符）内匹配，不能跨行
+
+    Args:
+        rules_text (str): 替换规则文本
+
+    Returns:
+        tuple: ReplaceRule 元组
+    """
+    rules = []
+    for line in rules_text.split('\n'):
+        line = line.strip()
+        if not line or '->' not in line:
+            continue
+
+        source, target = line.split('->', 1)
+        source, target = source.strip(), target.strip()
+        regex = source.startswith(REGEX_RULE_PREFIX)
+        if regex:
+            source = source[len(REGEX_RULE_PREFIX):]
+        if source:
+            rules.append(ReplaceRule(source, target, regex))
+
+    return tuple(rules)
+
+
+@lru_cache(maxsize=RULE_SET_CACHE_SIZE)
+def compile_rules(rules_text):
+    """解析并编译替换规则文本，相同的规则文本直接返回缓存的规则集"""
+    return get_rule_set(parse_rules(rules_text))
+
+
+@lru_cache(maxsize=RULE_SET_CACHE_SIZE)
+def get_rule_set(rules):
+    """编译规则元组，相同的规则直接返回缓存的规则集
+
+    Args:
+        rules (tuple): ReplaceRule 或 (原文本, 替换文本) 元组
+    """
+    return ReplaceRuleSet(rules)
+
+
+def _build_trie_pattern(sources):
+    """将所有原文本构造成按字符前缀分支的正则表达式
+
+    前缀相同的规则共用一个分支，正则引擎在每个位置只需沿字符逐级匹配，
+    不必逐条尝试全部规则。可以继续匹配更长规则时优先匹配更长的规则
+    """
+    trie = {}
+    for source in sources:
+        node = trie
+        for char in source:
+            node = node.setdefault(char, {})
+        node[""] = True
+
+    def to_pattern(node):
+        terminal = "" in node
+        branches = []
+        for char in sorted(key for key in node if key):
+            child = node[char]
+            # 只有一个后续字符且不是规则结尾的节点合并为连续的字符
+            text = char
+            while len(child) == 1 and "" not in child:
+                next_char = next(iter(child))
+                text += next_char
+                child = child[next_char]
+            branches.append(re.escape(text) + to_pattern(child))
+
+        if not branches:
+            return ""
+        if len(branches) == 1 and not terminal:
+            return branches[0]
+        pattern = "(?:" + "|".join(branches) + ")"
+        return pattern + "?" if terminal else pattern
+
+    return to_pattern(trie)
+
+
+class ReplaceRuleSet:
+    """编译后的批量替换规则
+
+    所有普通规则合并为一个正则表达式，一次扫描完成全部替换。同一位置有多条规则
+    可以匹配时使用最长的规则（最左最长匹配），替换结果不会再被其他规则替换。
+    正则规则在普通规则之后按顺序逐条执行，每条只在单行内匹配。
+
+    规则集按规则内容比较和计算哈希，可以作为缓存的键；命中次数不参与比较
+    """
+
+    def __init__(self, rules):
+        """编译替换规则
+
+        Args:
+            rules: ReplaceRule 或 (原文本, 替换文本) 列表，原文本相同的普通规则以第一条为准
+
+        Raises:
+            Exception: 正则表达式或其替换文本无效时抛出异常
+        """
+        self.rules = tuple(
+            rule if isinstance(rule, ReplaceRule) else ReplaceRule(rule[0], rule[1], False)
+            for rule in rules if rule[0]
+        )
+
+        self.replacements = {}
+        for rule in self.rules:
+            if not rule.regex:
+                self.replacements.setdefault(rule.source, rule.target)
+
+        self.regex_rules = []
+        for rule in self.rules:
+            if rule.regex:
+                try:
+                    pattern = re.compile(rule.source, re.MULTILINE)
+                    # 替换文本中的无效分组引用在编译时报错，而不是在每个文件转换时
+                    pattern.sub(rule.target, "")
+                    self.regex_rules.append((rule, pattern))
+                except re.error as e:
+                    raise Exception(f"替换规则中的正则表达式无效: {rule.source}: {str(e)}")
+
+        self.max_length = max((len(source) for source in self.replacements), default=0)
+        self.pattern = self._compile(self.replacements)
+
+        # 各规则的命中次数，键为规则
+        self.hits = dict.fromkeys(self.rules, 0)
+        self._literal_rules = {}
+        for rule in self.rules:
+            if not rule.regex:
+                self._literal_rules.setdefault(rule.source, rule)
+        self._hits_lock = threading.Lock()
+
+    @staticmethod
+    def _compile(replacements):
+        """编译普通规则对应的正则表达式"""
+        if not replacements:
+            return None
+        try:
+            return re.compile(_build_trie_pattern(replacements))
+        except RecursionError:
+            # 规则过长导致嵌套过深时，改用按长度降序排列的多选结构
+            sources = sorted(replacements, key=len, reverse=True)
+            return re.compile("|".join(re.escape(source) for source in sources))
+
+    def __bool__(self):
+        return bool(self.rules)
+
+    def __len__(self):
+        return len(self.rules)
+
+    def __eq__(self, other):
+        return isinstance(other, ReplaceRuleSet) and self.rules == other.rules
+
+    def __hash__(self):
+        return hash(self.rules)
+
+    def __getstate__(self):
+        # 锁不能序列化，传给工作进程时重新创建
+        state = self.__dict__.copy()
+        del state["_hits_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._hits_lock = threading.Lock()
+
+    def _add_hits(self, counts):
+        """累加命中次数，批量处理时多个线程共用同一个规则集"""
+        with self._hits_lock:
+            for rule, count in counts.items():
+                self.hits[rule] += count
+
+    def _replace_literals(self, text, counts):
+        """执行普通规则的替换"""
+        def replace_match(match):
+            source = match.group()
+            counts[source] = counts.get(source, 0) + 1
+            return self.replacements[source]
+
+        return self.pattern.sub(replace_match, text)
+
+    def _replace_regex(self, text, counts):
+        """按顺序执行正则规则的替换
+
+        规则逐行执行，匹配结果与文本在哪里切分为块无关
+        """
+        if "\n" not in text[:-1]:
+            return self._replace_regex_line(text, counts)
+        return "".join(self._replace_regex_line(line, counts) for line in LINE_RE.findall(text))
+
+    def _replace_regex_line(self, text, counts):
+        """对一行文本按顺序执行正则规则的替换"""
+        for rule, pattern in self.regex_rules:
+            text, count = pattern.subn(rule.target, text)
+            if count:
+                counts[rule] = counts.get(rule, 0) + count
+        return text
+
+    def _record(self, literal_counts, regex_counts):
+        counts = {self._literal_rules[source]: count for source, count in literal_counts.items()}
+        counts.update(regex_counts)
+        self._add_hits(counts)
+
+    def replace(self, text):
+        """替换一段完整的文本"""
+        literal_counts = {}
+        regex_counts = {}
+        if self.pattern is not None:
+            text = self._replace_literals(text, literal_counts)
+        if self.regex_rules:
+            text = self._replace_regex(text, regex_counts)
+        self._record(literal_counts, regex_counts)
+        return text
+
+    def replace_chunks(self, chunks):
+        """对连续的文本块执行替换，正确处理跨越块边界的匹配
+
+        全部文本块处理完后才累加命中次数，读取中途出错（例如解码失败后换编码重新处理）时
+        已替换部分的命中不计入，重新处理时不会重复统计
+
+        Args:
+            chunks: 文本块迭代器
+
+        Yields:
+            str: 替换后的文本块
+        """
+        literal_counts = {}
+        regex_counts = {}
+
+        if self.pattern is not None:
+            chunks = self._replace_literal_chunks(chunks, literal_counts)
+        if self.regex_rules:
+            chunks = (self._replace_regex(chunk, regex_counts) for chunk in self._iter_line_chunks(chunks))
+
+        yield from chunks
+        self._record(literal_counts, regex_counts)
+
+    def _replace_literal_chunks(self, chunks, counts):
+        """对文本块执行普通规则的替换
+
+        每个块末尾不足最长规则长度的部分可能是某条规则的开头，
+        保留到与下一个块拼接后再处理
+        """
+        carry = ""
+        for chunk in chunks:
+            buffer = carry + chunk
+            # 从该位置之前开始的匹配，其可能匹配的全部文本都已在缓冲区中
+            safe_end = len(buffer) - self.max_length + 1
+
+            parts = []
+            position = 0
+            for match in self.pattern.finditer(buffer):
+                if match.start() >= safe_end:
+                    break
+                source = match.group()
+                counts[source] = counts.get(source, 0) + 1
+                parts.append(buffer[position:match.start()])
+                parts.append(self.replacements[source])
+                position = match.end()
+
+            cut = max(position, safe_end)
+            parts.append(buffer[position:cut])
+            carry = buffer[cut:]
+
+            text = "".join(parts)
+            if text:
+                yield text
+
+        if carry:
+            yield self._replace_literals(carry, counts)
+
+    @staticmethod
+    def _iter_line_chunks(chunks):
+        """将文本块调整为以换行结尾的块，保证每行完整地出现在同一个块中"""
+        remainder = ""
+        for chunk in chunks:
+            chunk = remainder + chunk
+            end = chunk.rfind('\n') + 1
+            if end:
+                yield chunk[:end]
+                remainder = chunk[end:]
+            else:
+                remainder = chunk
+        if remainder:
+            yield remainder
+
+    def top_rules(self, count=10):
+        """返回命中次数最多的规则
+
+        Returns:
+            list: (规则, 命中次数) 列表，按命中次数降序排列
+        """
+        with self._hits_lock:
+            ranked = [(rule, hits) for rule, hits in self.hits.items() if hits]
+        ranked.sort(key=lambda item: item[1], reverse=True)
+        return ranked[:count]
+
+    def reset_hits(self):
+        """清零命中次数"""
+        with self._hits_lock:
+            self.hits = dict.fromkeys(self.rules, 0)
@@ -8,34 +8,146 @@ Junly文件转换工具 - 文本处理模块
 import os
 import codecs
 import re
+import logging
 from bs4 import BeautifulSoup
+from .replace_rules import ReplaceRule, compile_rules, get_rule_set
+
+# 依次尝试的输入文件编码，选用第一个能解码整个文件的编码
+ENCODINGS_TO_TRY = ['utf-8', 'gbk', 'utf-16', 'ascii', 'latin-1']
+
+# 检测编码时读取的样本大小
+DETECT_SAMPLE_SIZE = 64 * 1024
+
+# 流式处理时每次读取的字节数
+CHUNK_SIZE = 1024 * 1024
+
+logger = logging.getLogger("file-converter")
 
 class TextProcessor:
     """文本处理类，提供编码转换、格式转换和批量替换功能"""
     
+    CACHE_VERSION = 1  # 转换结果缓存版本
+    
     def __init__(self):
         """初始化文本处理器"""
         self.replace_rules = []
     
+    @property
+    def replace_rules(self):
+        """替换规则列表，元素为 ReplaceRule(原文本, 替换文本, 是否正则)"""
+        return list(self.rule_set.rules)
+    
+    @replace_rules.setter
+    def replace_rules(self, rules):
+        # 规则编译后缓存，批量处理的各个文件以及相同规则的多次批量处理共用编译结果
+        self.rule_set = get_rule_set(tuple(
+            rule if isinstance(rule, ReplaceRule) else ReplaceRule(rule[0], rule[1], False)
+            for rule in rules
+        ))
+    
     def set_replace_rules(self, rules_text):
         """设置替换规则
         
+        相同的规则文本只解析和编译一次
+        
         Args:
-            rules_text (str): 替换规则文本，每行一条规则，格式: 原文本->替换文本
+            rules_text (str): 替换规则文本，每行一条规则，格式: 原文本->替换文本，
+                以 re: 开头的原文本按正则表达式匹配，替换文本中可以用 \\1 引用分组
         """
-        self.replace_rules = []
-        lines = rules_text.split('\n')
+        self.rule_set = compile_rules(rules_text)
+    
+    def get_cache_state(self):
+        """转换结果缓存的附加状态，替换结果取决于当前的替换规则"""
+        return [tuple(rule) for rule in self.rule_set.rules]
+    
+    def detect_encoding(self, input_file, start_index=0):
+        """根据文件开头的样本检测编码
+        
+        Args:
+            input_file (str): 输入文件路径
+            start_index (int): 从编码列表的第几个开始尝试
+            
+        Returns:
+            int: 编码在 ENCODINGS_TO_TRY 中的索引，没有可用的编码时返回 None
+        """
+        with open(input_file, 'rb') as f:
+            sample = f.read(DETECT_SAMPLE_SIZE)
+            # 样本就是整个文件时按完整内容解码，否则允许末尾有不完整的多字节字符
+            is_whole_file = not f.read(1)
         
-        for line in lines:
-            line = line.strip()
-            if not line or '->' not in line:
+        for index in range(start_index, len(ENCODINGS_TO_TRY)):
+            decoder = codecs.getincrementaldecoder(ENCODINGS_TO_TRY[index])()
+            try:
+                decoder.decode(sample, final=is_whole_file)
+                return index
+            except UnicodeError:
                 continue
+        
+        return None
+    
+    def _read_chunks(self, input_file, encoding, progress_callback=None):
+        """以增量解码器逐块读取文件，返回解码后的文本块"""
+        file_size = os.path.getsize(input_file)
+        decoder = codecs.getincrementaldecoder(encoding)()
+        read_size = 0
+        
+        with open(input_file, 'rb') as f:
+            while True:
+                data = f.read(CHUNK_SIZE)
+                if not data:
+                    break
+                read_size += len(data)
+                text = decoder.decode(data)
+                if text:
+                    yield text
                 
-            parts = line.split('->', 1)
-            if len(parts) == 2:
-                source, target = parts[0].strip(), parts[1].strip()
-                if source:
-                    self.replace_rules.append((source, target))
+                # 更新进度
+                if progress_callback and file_size:
+                    progress_callback(min(99, int(read_size / file_size * 100)))
+        
+        text = decoder.decode(b'', final=True)
+        if text:
+            yield text
+    
+    def _process_stream(self, input_file, output_file, output_encoding, write_content, progress_callback=None):
+        """流式读取输入文件并写入输出文件
+        
+        编码只根据样本检测一次，之后整个文件按块解码、处理、写出，内存占用与文件大小无关。
+        如果样本之后的内容不能用检测到的编码解码，则改用下一个编码重新处理
+        
+        Args:
+            input_file (str): 输入文件路径
+            output_file (str): 输出文件路径
+            output_encoding (str): 输出文件编码
+            write_content (function): 接收文本块迭代器和输出文件对象，负责写出内容
+            progress_callback (function): 进度回调函数
+            
+        Returns:
+            str: 输入文件使用的编码
+        """
+        start_index = 0
+        while True:
+            index = self.detect_encoding(input_file, start_index)
+            if index is None:
+                raise Exception("无法检测输入文件的编码")
+            
+            encoding = ENCODINGS_TO_TRY[index]
+            try:
+                # newline='' 保持原文件的换行符不变
+                with open(output_file, 'w', encoding=output_encoding, newline='') as f:
+                    write_content(self._read_chunks(input_file, encoding, progress_callback), f)
+                break
+            except UnicodeError as e:
+                # 写出时的编码错误与输入编码无关，直接抛出
+                if isinstance(e, UnicodeEncodeError):
+                    raise
+                logger.warning(f"文件 {input_file} 使用 {encoding} 编码解码失败，尝试下一个编码: {str(e)}")
+                start_index = index + 1
+        
+        if progress_callback:
+            progress_callback(100)
+        
+        return encoding
     
     def convert_encoding(self, input_file, output_file, target_encoding, progress_callback=None):
         """转换文件编码
@@ -50,31 +162,13 @@ class TextProcessor:
             bool: 是否成功
         """
         try:
-            # 尝试检测源文件编码
-            encodings_to_try = ['utf-8', 'gbk', 'utf-16', 'ascii', 'latin-1']
-            content = None
-            
-            for encoding in encodings_to_try:
-                try:
-                    with codecs.open(input_file, 'r', encoding=encoding) as f:
-                        content = f.read()
-                    break
-                except UnicodeDecodeError:
-                    continue
-            
-            if content is None:
-                raise Exception("无法检测输入文件的编码")
+            def write_content(chunks, f):
+                for chunk in chunks:
+                    f.write(chunk)
             
-            if progress_callback:
-                progress_callback(50)
-                
             # 以目标编码写入文件
-            with codecs.open(output_file, 'w', encoding=target_encoding) as f:
-                f.write(content)
-                
-            if progress_callback:
-                progress_callback(100)
-                
+            self._process_stream(input_file, output_file, target_encoding, write_content, progress_callback)
+            
             return True
             
         except Exception as e:
@@ -92,48 +186,26 @@ class TextProcessor:
             bool: 是否成功
         """
         try:
-            # 读取文本文件内容
-            encodings_to_try = ['utf-8', 'gbk', 'utf-16', 'ascii', 'latin-1']
-            content = None
-            
-            for encoding in encodings_to_try:
-                try:
-                    with codecs.open(input_file, 'r', encoding=encoding) as f:
-                        content = f.read()
-                    break
-                except UnicodeDecodeError:
-                    continue
-            
-            if content is None:
-                raise Exception("无法检测输入文件的编码")
+            def write_content(chunks, f):
+                f.write("<!DOCTYPE html>\n<html>\n<head>\n")
+                f.write("<meta charset=\"UTF-8\">\n")
+                f.write("<title>转换自文本文件</title>\n")
+                f.write("<style>\n")
+                f.write("body { font-family: Arial, sans-serif; line-height: 1.6; margin: 20px; }\n")
+                f.write("pre { background-color: #f5f5f5; padding: 10px; border-radius: 5px; white-space: pre-wrap; }\n")
+                f.write("</style>\n")
+                f.write("</head>\n<body>\n")
                 
-            if progress_callback:
-                progress_callback(30)
-            
-            # 转换为HTML
-            html_content = "<!DOCTYPE html>\n<html>\n<head>\n"
-            html_content += "<meta charset=\"UTF-8\">\n"
-            html_content += "<title>转换自文本文件</title>\n"
-            html_content += "<style>\n"
-            html_content += "body { font-family: Arial, sans-serif; line-height: 1.6; margin: 20px; }\n"
-            html_content += "pre { background-color: #f5f5f5; padding: 10px; border-radius: 5px; white-space: pre-wrap; }\n"
-            html_content += "</style>\n"
-            html_content += "</head>\n<body>\n"
-            
-            # 处理内容
-            html_content += "<pre>" + self._escape_html(content) + "</pre>\n"
-            
-            html_content += "</body>\n</html>"
-            
-            if progress_callback:
-                progress_callback(70)
+                # 处理内容，转义只涉及单个字符，可以逐块进行
+                f.write("<pre>")
+                for chunk in chunks:
+                    f.write(self._escape_html(chunk))
+                f.write("</pre>\n")
                 
+                f.write("</body>\n</html>")
+            
             # 写入HTML文件
-            with codecs.open(output_file, 'w', encoding='utf-8') as f:
-                f.write(html_content)
-                
-            if progress_callback:
-                progress_callback(100)
+            self._process_stream(input_file, output_file, 'utf-8', write_content, progress_callback)
                 
             return True
             
@@ -152,37 +224,16 @@ class TextProcessor:
             bool: 是否成功
         """
         try:
-            # 读取文本文件内容
-            encodings_to_try = ['utf-8', 'gbk', 'utf-16', 'ascii', 'latin-1']
-            content = None
-            
-            for encoding in encodings_to_try:
-                try:
-                    with codecs.open(input_file, 'r', encoding=encoding) as f:
-                        content = f.read()
-                    break
-                except UnicodeDecodeError:
-                    continue
-            
-            if content is None:
-                raise Exception("无法检测输入文件的编码")
-                
-            if progress_callback:
-                progress_callback(30)
-            
             # 转换为Markdown (简单添加代码块)
-            md_content = "# 转换自文本文件\n\n"
-            md_content += "```\n" + content + "\n```\n"
+            def write_content(chunks, f):
+                f.write("# 转换自文本文件\n\n")
+                f.write("```\n")
+                for chunk in chunks:
+                    f.write(chunk)
+                f.write("\n```\n")
             
-            if progress_callback:
-                progress_callback(70)
-                
             # 写入Markdown文件
-            with codecs.open(output_file, 'w', encoding='utf-8') as f:
-                f.write(md_content)
-                
-            if progress_callback:
-                progress_callback(100)
+            self._process_stream(input_file, output_file, 'utf-8', write_content, progress_callback)
                 
             return True
             
@@ -192,6 +243,9 @@ class TextProcessor:
     def batch_replace(self, input_file, output_file, progress_callback=None):
         """批量替换文本内容
         
+        所有普通规则在一次扫描中完成替换，同一位置有多条规则匹配时使用最长的规则，
+        替换后的文本不会再被其他规则替换；正则规则随后按顺序在每行内执行
+        
         Args:
             input_file (str): 输入文件路径
             output_file (str): 输出文件路径
@@ -201,40 +255,21 @@ class TextProcessor:
             bool: 是否成功
         """
         try:
-            if not self.replace_rules:
+            if not self.rule_set:
                 raise Exception("未设置替换规则")
-                
-            # 读取文本文件内容
-            encodings_to_try = ['utf-8', 'gbk', 'utf-16', 'ascii', 'latin-1']
-            content = None
-            
-            for encoding in encodings_to_try:
-                try:
-                    with codecs.open(input_file, 'r', encoding=encoding) as f:
-                        content = f.read()
-                    break
-                except UnicodeDecodeError:
-                    continue
             
-            if content is None:
-                raise Exception("无法检测输入文件的编码")
-                
-            if progress_callback:
-                progress_callback(30)
+            # 所有规则一次扫描完成替换，跨越块边界的匹配由规则集处理
+            def write_content(chunks, f):
+                for chunk in self.rule_set.replace_chunks(chunks):
+                    f.write(chunk)
             
-            # 执行替换
-            for source, target in self.replace_rules:
-                content = content.replace(source, target)
-                
-            if progress_callback:
-                progress_callback(70)
-                
             # 写入输出文件
-            with codecs.open(output_file, 'w', encoding='utf-8') as f:
-                f.write(content)
-                
-            if progress_callback:
-                progress_callback(100)
+            self._process_stream(input_file, output_file, 'utf-8', write_content, progress_callback)
+            
+            top_rules = self.rule_set.top_rules(5)
+            if top_rules:
+                summary = "，".join(f"{rule.source}: {hits}" for rule, hits in top_rules)
+                logger.debug(f"替换规则累计命中次数最多的规则: {summary}")
                 
             return True
             
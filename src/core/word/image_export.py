@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Junly文件转换工具 - Word图片导出
+版权所有 (c) 2025 Junly
+"""
+
+import os
+import posixpath
+from urllib.parse import quote
+from concurrent.futures import ThreadPoolExecutor
+
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+
+from .word_xml_reader import WordXmlDocument
+
+# 启用多线程写出图片的最少图片数
+PARALLEL_MIN_IMAGES = 4
+
+
+def _image_sources(doc):
+    """文档的图片关系ID -> (部件名, 读取部件内容的函数)"""
+    if isinstance(doc, WordXmlDocument):
+        return {
+            rel_id: (part_name, lambda part_name=part_name: doc.read_part(part_name))
+            for rel_id, part_name in doc.image_parts.items()
+        }
+
+    sources = {}
+    for rel_id, rel in doc.part.rels.items():
+        if rel.reltype == RT.IMAGE and not rel.is_external:
+            part = rel.target_part
+            sources[rel_id] = (part.partname.lstrip("/"), lambda part=part: part.blob)
+    return sources
+
+
+class WordImageExporter:
+    """将Word文档中引用的图片导出到"_images"目录
+
+    遍历段落时按关系ID登记图片并立即得到链接，同一图片部件无论被引用多少次只写出一次；
+    遍历结束后再统一写出，图片较多时多线程并行读取和写入
+    """
+
+    def __init__(self, doc, output_path):
+        """初始化图片导出
+
+        Args:
+            doc: read_word 返回的 WordXmlDocument 或 python-docx 的 Document
+            output_path: 转换结果的输出路径，图片保存到同名的"_images"目录
+        """
+        self.images_dir = os.path.splitext(output_path)[0] + "_images"
+        self._link_prefix = quote(os.path.basename(self.images_dir))
+        self._sources = _image_sources(doc)
+
+        # 图片部件名 -> 输出文件名
+        self._file_names = {}
+        self._used_names = set()
+
+    def link(self, rel_id):
+        """图片的相对链接，关系ID不是文档中的图片时返回None"""
+        source = self._sources.get(rel_id)
+        if source is None:
+            return None
+
+        part_name = source[0]
+        file_name = self._file_names.get(part_name)
+        if file_name is None:
+            file_name = self._unique_name(posixpath.basename(part_name))
+            self._file_names[part_name] = file_name
+        return f"{self._link_prefix}/{quote(file_name)}"
+
+    def _unique_name(self, file_name):
+        """不同目录下的图片部件可能同名，加序号区分"""
+        stem, ext = os.path.splitext(file_name)
+        candidate = file_name
+        index = 1
+        while candidate.lower() in self._used_names:
+            candidate = f"{stem}_{index}{ext}"
+            index += 1
+        self._used_names.add(candidate.lower())
+        return candidate
+
+    def write(self, max_workers=None):
+        """写出已登记的图片
+
+        Args:
+            max_workers (int): 最大线程数，默认为CPU核数，为1时在当前线程写出
+
+        Returns:
+            int: 写出的图片数
+        """
+        if not self._file_names:
+            return 0
+
+        os.makedirs(self.images_dir, exist_ok=True)
+        readers = {part_name: reader for part_name, reader in self._sources.values()}
+        jobs = [(readers[part_name], os.path.join(self.images_dir, file_name))
+                for part_name, file_name in self._file_names.items()]
+
+        workers = self._get_write_workers(len(jobs), max_workers)
+        if workers == 1:
+            for reader, path in jobs:
+                self._write_image(reader, path)
+        else:
+            # 解压和写文件时会释放GIL，线程即可并行
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(lambda job: self._write_image(*job), jobs))
+        return len(jobs)
+
+    @staticmethod
+    def _get_write_workers(count, max_workers):
+        """确定写出图片使用的线程数，不满足并行条件时返回1"""
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        if max_workers <= 1 or count < PARALLEL_MIN_IMAGES:
+            return 1
+        return min(max_workers, count)
+
+    @staticmethod
+    def _write_image(reader, path):
+        with open(path, "wb") as f:
+            f.write(reader())
@@ -0,0 +1,180 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Junly文件转换工具 - Word文档压缩包级图片移除
+版权所有 (c) 2025 Junly
+"""
+
+import copy
+import struct
+import zipfile
+import posixpath
+
+from lxml import etree
+
+from .word_xml_reader import (
+    R_NS, V_NS, PKG_REL, OFFICE_DOCUMENT_REL, IMAGE_REL,
+    _w, read_rels, rels_part_name, resolve_target,
+)
+
+W_DRAWING = _w("drawing")
+W_PICT = _w("pict")
+V_IMAGEDATA = f"{{{V_NS}}}imagedata"
+O_RELID = "{urn:schemas-microsoft-com:office:office}relid"
+
+CONTENT_TYPES_PART = "[Content_Types].xml"
+CT_OVERRIDE = "{http://schemas.openxmlformats.org/package/2006/content-types}Override"
+
+# 与正文一起移除图片的页眉、页脚关系类型
+HEADER_FOOTER_RELS = ("/header", "/footer")
+
+# 图片部件所在目录
+MEDIA_PREFIX = "word/media/"
+
+# 数据描述符标志位：设置时本地文件头中不含CRC和大小
+DATA_DESCRIPTOR_FLAG = 0x08
+
+
+def _remove_images(root):
+    """移除XML中的图片元素，返回移除的数量
+
+    与 python-docx 实现一致移除全部 w:drawing，另外移除包含 v:imagedata 的旧版VML图片 w:pict
+    """
+    targets = list(root.iter(W_DRAWING))
+    targets.extend(pict for pict in root.iter(W_PICT)
+                   if any(True for _ in pict.iter(V_IMAGEDATA)))
+    for element in targets:
+        parent = element.getparent()
+        if parent is not None:
+            parent.remove(element)
+    return len(targets)
+
+
+def _referenced_ids(root):
+    """XML中仍然引用的关系ID"""
+    ids = set()
+    for element in root.iter(etree.Element):
+        for name, value in element.attrib.items():
+            if name.startswith(f"{{{R_NS}}}") or name == O_RELID:
+                ids.add(value)
+    return ids
+
+
+def _serialize(root):
+    return etree.tostring(root, xml_declaration=True, encoding="UTF-8", standalone=True)
+
+
+def _copy_raw(source, target, info):
+    """按原压缩数据复制部件，不解压也不重新压缩
+
+    zipfile没有复制压缩数据的接口，这里直接读取源文件中的数据，
+    以 ZipInfo.FileHeader 写出本地文件头后追加到目标压缩包
+    """
+    source.fp.seek(info.header_offset)
+    header = source.fp.read(zipfile.sizeFileHeader)
+    name_length, extra_length = struct.unpack("<HH", header[26:30])
+    source.fp.seek(info.header_offset + zipfile.sizeFileHeader + name_length + extra_length)
+    data = source.fp.read(info.compress_size)
+
+    entry = copy.copy(info)
+    # CRC和大小已知，直接写在本地文件头中；原有扩展字段可能包含已失效的zip64信息
+    entry.flag_bits &= ~DATA_DESCRIPTOR_FLAG
+    entry.extra = b""
+    target.fp.seek(target.start_dir)
+    entry.header_offset = target.fp.tell()
+    target.fp.write(entry.FileHeader())
+    target.fp.write(data)
+    target.start_dir = target.fp.tell()
+    target.filelist.append(entry)
+    target.NameToInfo[entry.filename] = entry
+    target._didModify = True
+
+
+def strip_images(input_path, output_path, progress_callback=None):
+    """直接在压缩包层面移除Word文档中的图片
+
+    只解析和重写正文、页眉、页脚的XML及其关系，删除不再被引用的 word/media 图片部件，
+    其余部件按原压缩数据复制
+
+    Args:
+        input_path: 输入docx路径
+        output_path: 输出docx路径
+        progress_callback: 进度回调函数
+
+    Returns:
+        int: 移除的图片元素数
+    """
+    with zipfile.ZipFile(input_path) as source:
+        # 需要移除图片的部件：正文及其页眉、页脚
+        filtered_parts = []
+        for _, rel_type, document_part in read_rels(source, ""):
+            if rel_type.endswith(OFFICE_DOCUMENT_REL):
+                filtered_parts.append(document_part)
+                filtered_parts.extend(
+                    part for _, part_type, part in read_rels(source, document_part)
+                    if part_type.endswith(HEADER_FOOTER_RELS)
+                )
+
+        # 部件名 -> 重写后的内容
+        rewritten = {}
+        removed = 0
+        for part_name in filtered_parts:
+            if part_name not in source.NameToInfo:
+                continue
+            root = etree.fromstring(source.read(part_name))
+            count = _remove_images(root)
+            if not count:
+                continue
+            removed += count
+            rewritten[part_name] = _serialize(root)
+
+            # 删除不再引用的图片关系
+            rels_name = rels_part_name(part_name)
+            if rels_name in source.NameToInfo:
+                referenced = _referenced_ids(root)
+                rels_root = etree.fromstring(source.read(rels_name))
+                for rel in list(rels_root.iterchildren(PKG_REL)):
+                    if rel.get("Type", "").endswith(IMAGE_REL) and rel.get("Id") not in referenced:
+                        rels_root.remove(rel)
+                rewritten[rels_name] = _serialize(rels_root)
+
+        # 仍被任一关系引用的部件
+        used_parts = set()
+        for info in source.infolist():
+            if not info.filename.endswith(".rels"):
+                continue
+            data = rewritten.get(info.filename) or source.read(info.filename)
+            part_name = posixpath.join(
+                posixpath.dirname(posixpath.dirname(info.filename)),
+                posixpath.basename(info.filename)[:-len(".rels")]
+            )
+            for rel in etree.fromstring(data).iterchildren(PKG_REL):
+                if rel.get("TargetMode") != "External":
+                    used_parts.add(resolve_target(part_name, rel.get("Target", "")))
+        dropped = {
+            info.filename for info in source.infolist()
+            if info.filename.startswith(MEDIA_PREFIX) and info.filename not in used_parts
+        }
+
+        # 删除已移除部件的内容类型
+        if dropped and CONTENT_TYPES_PART in source.NameToInfo:
+            types_root = etree.fromstring(source.read(CONTENT_TYPES_PART))
+            overrides = [element for element in types_root.iterchildren(CT_OVERRIDE)
+                         if element.get("PartName", "").lstrip("/") in dropped]
+            for element in overrides:
+                types_root.remove(element)
+            if overrides:
+                rewritten[CONTENT_TYPES_PART] = _serialize(types_root)
+
+        infos = source.infolist()
+        with zipfile.ZipFile(output_path, "w", zipfile.ZIP_DEFLATED) as target:
+            for i, info in enumerate(infos):
+                if info.filename in rewritten:
+                    target.writestr(info.filename, rewritten[info.filename])
+                elif info.filename not in dropped:
+                    _copy_raw(source, target, info)
+
+                if progress_callback:
+                    progress_callback(int((i + 1) / len(infos) * 100))
+
+    return removed
@@ -9,182 +9,255 @@ import os
 import tempfile
 from docx import Document
 from docx.shared import Inches
+from docx.enum.style import WD_STYLE_TYPE
+from docx.table import Table
+from docx.text.paragraph import Paragraph
 import markdown
 import html
 from pathlib import Path
+from urllib.parse import unquote
+
+from .word_xml_reader import (
+    W_P, W_TBL, WordParagraph, WordTable, WordXmlDocument, heading_level, paragraph_images,
+)
+from .image_export import WordImageExporter
+from .image_stripper import strip_images
+
+# HTML输出的文件头
+HTML_HEAD = [
+    '<!DOCTYPE html>', '<html>', '<head>',
+    '<meta charset="utf-8">',
+    '<title>转换文档</title>',
+    '<style>',
+    'body { font-family: Arial, sans-serif; line-height: 1.6; }',
+    'table { border-collapse: collapse; width: 100%; }',
+    'table, th, td { border: 1px solid #ddd; }',
+    'th, td { padding: 8px; text-align: left; }',
+    'th { background-color: #f2f2f2; }',
+    '</style>',
+    '</head>', '<body>',
+]
 
 class WordConverter:
     """Word文档转换类"""
     
+    CACHE_VERSION = 4  # 转换结果缓存版本
+    
     def __init__(self):
         """初始化Word转换器"""
         pass
     
-    def read_word(self, file_path):
-        """读取Word文档"""
+    def read_word(self, file_path, fast=True):
+        """读取Word文档
+        
+        Args:
+            file_path: 文档路径
+            fast: 为True时返回直接解析XML的 WordXmlDocument，只能用于导出文本、Markdown和HTML；
+                为False时返回python-docx的 Document 对象
+        """
         try:
+            if fast:
+                return WordXmlDocument(file_path)
             return Document(file_path)
         except Exception as e:
             raise Exception(f"读取Word文档失败: {str(e)}")
     
-    def save_as_markdown(self, doc, output_path, include_images=True, progress_callback=None):
-        """将Word文档保存为Markdown格式"""
+    def iter_blocks(self, doc):
+        """按文档顺序遍历正文的段落和表格
+        
+        Args:
+            doc: read_word 返回的 WordXmlDocument 或 python-docx 的 Document
+            
+        Yields:
+            tuple: (WordParagraph 或 WordTable, 已处理的比例 0~1)
+        """
+        if isinstance(doc, WordXmlDocument):
+            yield from doc.iter_blocks()
+            return
+        
+        # python-docx文档：样式名称和标题级别每个文档只查一次，不再逐段通过 para.style 解析样式
+        style_names = {
+            style.style_id: style.name or ""
+            for style in doc.styles if style.type == WD_STYLE_TYPE.PARAGRAPH
+        }
+        default_style = doc.styles.default(WD_STYLE_TYPE.PARAGRAPH)
+        default_name = (default_style.name or "") if default_style is not None else ""
+        style_levels = {style_id: heading_level(name) for style_id, name in style_names.items()}
+        default_level = heading_level(default_name)
+        
+        # 遍历正文的顶层元素，段落和表格按实际顺序交替出现
+        body = doc.element.body
+        children = [child for child in body.iterchildren() if child.tag in (W_P, W_TBL)]
+        for i, child in enumerate(children):
+            if child.tag == W_P:
+                style_id = child.style
+                block = WordParagraph(
+                    style_names.get(style_id, default_name),
+                    Paragraph(child, doc._body).text,
+                    paragraph_images(child),
+                    style_levels.get(style_id, default_level)
+                )
+            else:
+                table = Table(child, doc._body)
+                block = WordTable([[cell.text for cell in row.cells] for row in table.rows])
+            yield block, (i + 1) / len(children)
+    
+    def _write_blocks(self, doc, f, render, separator, progress_callback=None, leading=""):
+        """按文档顺序逐块生成内容并写入文件，不在内存中累积整篇输出
+        
+        Args:
+            doc: read_word 返回的文档
+            f: 已打开的输出文件
+            render: 将段落或表格转换为输出文本的函数，返回None时跳过
+            separator: 相邻两块之间的分隔符
+            progress_callback: 进度回调函数
+            leading: 第一块之前的分隔符，文件中已有前导内容时使用
+        """
+        pending_separator = leading
+        for block, done in self.iter_blocks(doc):
+            chunk = render(block)
+            if chunk is not None:
+                f.write(pending_separator)
+                f.write(chunk)
+                pending_separator = separator
+            
+            # 更新进度
+            if progress_callback:
+                progress_callback(int(done * 100))
+    
+    def save_as_markdown(self, doc, output_path, include_images=True, progress_callback=None,
+                         max_workers=None):
+        """将Word文档保存为Markdown格式
+        
+        Args:
+            doc: read_word 返回的文档
+            output_path: 输出文件路径
+            include_images: 是否导出图片，图片保存到输出文件同名的"_images"目录并在文中链接
+            progress_callback: 进度回调函数
+            max_workers: 写出图片的最大线程数，批量转换时传入1
+        """
         try:
-            md_content = []
-            total_paragraphs = len(doc.paragraphs) + sum(1 for table in doc.tables)
-            processed = 0
-            
-            # 处理段落
-            for para in doc.paragraphs:
-                # 根据样式确定Markdown格式
-                if para.style.name.startswith('Heading 1'):
-                    md_content.append(f"# {para.text}")
-                elif para.style.name.startswith('Heading 2'):
-                    md_content.append(f"## {para.text}")
-                elif para.style.name.startswith('Heading 3'):
-                    md_content.append(f"### {para.text}")
-                elif para.style.name.startswith('Heading 4'):
-                    md_content.append(f"#### {para.text}")
-                elif para.style.name.startswith('Heading 5'):
-                    md_content.append(f"##### {para.text}")
-                elif para.style.name.startswith('Heading 6'):
-                    md_content.append(f"###### {para.text}")
-                else:
-                    # 处理段落中的图片
-                    if include_images and len(para._element.xpath('.//w:drawing')) > 0:
-                        # 这里需要提取图片并保存，然后在Markdown中引用
-                        # 由于图片处理复杂，这里仅添加图片标记
-                        md_content.append(f"{para.text}\n\n![图片描述](image_path)\n")
-                    else:
-                        md_content.append(f"{para.text}")
-                
-                # 更新进度
-                processed += 1
-                if progress_callback:
-                    progress_callback(int(processed / total_paragraphs * 100))
-            
-            # 处理表格
-            for table in doc.tables:
-                md_table = []
-                # 表头
-                header_row = []
-                for cell in table.rows[0].cells:
-                    header_row.append(cell.text.strip())
-                md_table.append('| ' + ' | '.join(header_row) + ' |')
-                
-                # 表头分隔行
-                md_table.append('| ' + ' | '.join(['---'] * len(header_row)) + ' |')
-                
-                # 表格内容
-                for row in table.rows[1:]:
-                    row_data = []
-                    for cell in row.cells:
-                        row_data.append(cell.text.strip())
-                    md_table.append('| ' + ' | '.join(row_data) + ' |')
-                
-                md_content.append('\n'.join(md_table))
-                
-                # 更新进度
-                processed += 1
-                if progress_callback:
-                    progress_callback(int(processed / total_paragraphs * 100))
+            images = WordImageExporter(doc, output_path) if include_images else None
+            
+            def render(block):
+                if isinstance(block, WordTable):
+                    return self._markdown_table(block.rows) if block.rows else None
+                # 标题级别对应的Markdown标题
+                if block.level:
+                    return f"{'#' * block.level} {block.text}"
+                # 段落中的图片链接到导出的图片文件
+                links = self._image_links(images, block)
+                if links:
+                    image_lines = [f"![{self._image_alt(link)}]({link})" for link in links]
+                    return '\n\n'.join([block.text] + image_lines) + '\n'
+                return block.text
             
-            # 将内容写入文件
             with open(output_path, 'w', encoding='utf-8') as f:
-                f.write('\n\n'.join(md_content))
+                self._write_blocks(doc, f, render, '\n\n', progress_callback)
+            
+            if images is not None:
+                images.write(max_workers)
             
             return True
             
         except Exception as e:
             raise Exception(f"保存为Markdown失败: {str(e)}")
     
-    def save_as_html(self, doc, output_path, include_images=True, progress_callback=None):
-        """将Word文档保存为HTML格式"""
+    def _image_links(self, images, block):
+        """段落中各图片的链接，不导出图片时为空"""
+        if images is None:
+            return []
+        return [link for link in map(images.link, block.images) if link]
+    
+    def _image_alt(self, link):
+        """以图片文件名作为替代文本"""
+        return os.path.splitext(unquote(link.rsplit('/', 1)[-1]))[0]
+    
+    def _markdown_table(self, rows):
+        """生成Markdown表格，第一行作为表头"""
+        md_table = []
+        # 表头
+        header_row = [text.strip() for text in rows[0]]
+        md_table.append('| ' + ' | '.join(header_row) + ' |')
+        
+        # 表头分隔行
+        md_table.append('| ' + ' | '.join(['---'] * len(header_row)) + ' |')
+        
+        # 表格内容
+        for row in rows[1:]:
+            md_table.append('| ' + ' | '.join(text.strip() for text in row) + ' |')
+        
+        return '\n'.join(md_table)
+    
+    def save_as_html(self, doc, output_path, include_images=True, progress_callback=None,
+                     max_workers=None):
+        """将Word文档保存为HTML格式，参数与 save_as_markdown 相同"""
         try:
-            html_content = ['<!DOCTYPE html>', '<html>', '<head>',
-                          '<meta charset="utf-8">',
-                          '<title>转换文档</title>',
-                          '<style>',
-                          'body { font-family: Arial, sans-serif; line-height: 1.6; }',
-                          'table { border-collapse: collapse; width: 100%; }',
-                          'table, th, td { border: 1px solid #ddd; }',
-                          'th, td { padding: 8px; text-align: left; }',
-                          'th { background-color: #f2f2f2; }',
-                          '</style>',
-                          '</head>', '<body>']
-            
-            total_paragraphs = len(doc.paragraphs) + sum(1 for table in doc.tables)
-            processed = 0
-            
-            # 处理段落
-            for para in doc.paragraphs:
-                # 根据样式确定HTML标签
-                if para.style.name.startswith('Heading 1'):
-                    html_content.append(f"<h1>{html.escape(para.text)}</h1>")
-                elif para.style.name.startswith('Heading 2'):
-                    html_content.append(f"<h2>{html.escape(para.text)}</h2>")
-                elif para.style.name.startswith('Heading 3'):
-                    html_content.append(f"<h3>{html.escape(para.text)}</h3>")
-                elif para.style.name.startswith('Heading 4'):
-                    html_content.append(f"<h4>{html.escape(para.text)}</h4>")
-                elif para.style.name.startswith('Heading 5'):
-                    html_content.append(f"<h5>{html.escape(para.text)}</h5>")
-                elif para.style.name.startswith('Heading 6'):
-                    html_content.append(f"<h6>{html.escape(para.text)}</h6>")
-                else:
-                    # 处理段落中的图片
-                    if include_images and len(para._element.xpath('.//w:drawing')) > 0:
-                        # 这里需要提取图片并保存，然后在HTML中引用
-                        # 由于图片处理复杂，这里仅添加图片标记
-                        html_content.append(f"<p>{html.escape(para.text)}</p>")
-                        html_content.append('<p><img src="image_path" alt="图片描述"></p>')
-                    else:
-                        html_content.append(f"<p>{html.escape(para.text)}</p>")
-                
-                # 更新进度
-                processed += 1
-                if progress_callback:
-                    progress_callback(int(processed / total_paragraphs * 100))
-            
-            # 处理表格
-            for table in doc.tables:
-                html_table = ['<table>']
-                # 表头
-                html_table.append('<tr>')
-                for cell in table.rows[0].cells:
-                    html_table.append(f'<th>{html.escape(cell.text.strip())}</th>')
-                html_table.append('</tr>')
-                
-                # 表格内容
-                for row in table.rows[1:]:
-                    html_table.append('<tr>')
-                    for cell in row.cells:
-                        html_table.append(f'<td>{html.escape(cell.text.strip())}</td>')
-                    html_table.append('</tr>')
-                
-                html_table.append('</table>')
-                html_content.append('\n'.join(html_table))
-                
-                # 更新进度
-                processed += 1
-                if progress_callback:
-                    progress_callback(int(processed / total_paragraphs * 100))
+            images = WordImageExporter(doc, output_path) if include_images else None
             
-            html_content.extend(['</body>', '</html>'])
+            def render(block):
+                if isinstance(block, WordTable):
+                    return self._html_table(block.rows) if block.rows else None
+                text = html.escape(block.text)
+                # 标题级别对应的HTML标题标签
+                if block.level:
+                    return f"<h{block.level}>{text}</h{block.level}>"
+                # 段落中的图片链接到导出的图片文件
+                lines = [f"<p>{text}</p>"]
+                for link in self._image_links(images, block):
+                    lines.append(
+                        f'<p><img src="{html.escape(link)}" alt="{html.escape(self._image_alt(link))}"></p>'
+                    )
+                return '\n'.join(lines)
             
-            # 将内容写入文件
             with open(output_path, 'w', encoding='utf-8') as f:
-                f.write('\n'.join(html_content))
+                f.write('\n'.join(HTML_HEAD))
+                self._write_blocks(doc, f, render, '\n', progress_callback, leading='\n')
+                f.write('\n</body>\n</html>')
+            
+            if images is not None:
+                images.write(max_workers)
             
             return True
             
         except Exception as e:
             raise Exception(f"保存为HTML失败: {str(e)}")
     
-    def remove_images(self, input_path, output_path, progress_callback=None):
-        """移除Word文档中的图片后保存为新文档"""
+    def _html_table(self, rows):
+        """生成HTML表格，第一行作为表头"""
+        html_table = ['<table>']
+        # 表头
+        html_table.append('<tr>')
+        for text in rows[0]:
+            html_table.append(f'<th>{html.escape(text.strip())}</th>')
+        html_table.append('</tr>')
+        
+        # 表格内容
+        for row in rows[1:]:
+            html_table.append('<tr>')
+            for text in row:
+                html_table.append(f'<td>{html.escape(text.strip())}</td>')
+            html_table.append('</tr>')
+        
+        html_table.append('</table>')
+        return '\n'.join(html_table)
+    
+    def remove_images(self, input_path, output_path, progress_callback=None, fast=True):
+        """移除Word文档中的图片后保存为新文档
+        
+        Args:
+            input_path: 输入文档路径
+            output_path: 输出文档路径
+            progress_callback: 进度回调函数
+            fast: 为True时直接在压缩包层面移除图片元素、图片关系和不再引用的图片部件，
+                其余部件原样复制；为False时用python-docx逐段处理并重新保存整个文档
+        """
         try:
-            doc = self.read_word(input_path)
+            if fast:
+                strip_images(input_path, output_path, progress_callback)
+                return True
+            
+            doc = self.read_word(input_path, fast=False)
             
             # 遍历所有段落，查找并移除图片
             total_paragraphs = len(doc.paragraphs)
@@ -218,33 +291,14 @@ class WordConverter:
     def save_as_text(self, doc, output_path, progress_callback=None):
         """将Word文档保存为纯文本格式"""
         try:
-            text_content = []
-            total_items = len(doc.paragraphs) + len(doc.tables)
-            processed = 0
-            
-            # 提取所有段落文本
-            for i, para in enumerate(doc.paragraphs):
-                text_content.append(para.text)
-                
-                # 更新进度
-                processed += 1
-                if progress_callback:
-                    progress_callback(int(processed / total_items * 100))
-            
-            # 处理表格
-            for table in doc.tables:
-                for row in table.rows:
-                    row_text = '\t'.join(cell.text for cell in row.cells)
-                    text_content.append(row_text)
-                
-                # 更新进度
-                processed += 1
-                if progress_callback:
-                    progress_callback(int(processed / total_items * 100))
+            def render(block):
+                # 表格每行一行，单元格之间以制表符分隔
+                if isinstance(block, WordTable):
+                    return '\n'.join('\t'.join(row) for row in block.rows) if block.rows else None
+                return block.text
             
-            # 将内容写入文件
             with open(output_path, 'w', encoding='utf-8') as f:
-                f.write('\n'.join(text_content))
+                self._write_blocks(doc, f, render, '\n', progress_callback)
             
             return True
             
@@ -0,0 +1,325 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Junly文件转换工具 - Word文档XML流式读取
+版权所有 (c) 2025 Junly
+"""
+
+import zipfile
+import posixpath
+from collections import namedtuple
+
+from lxml import etree
+from docx.styles import BabelFish
+
+# WordprocessingML 命名空间
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+R_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+A_NS = "http://schemas.openxmlformats.org/drawingml/2006/main"
+V_NS = "urn:schemas-microsoft-com:vml"
+PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+OFFICE_DOCUMENT_REL = "/officeDocument"
+STYLES_REL = "/styles"
+IMAGE_REL = "/image"
+
+
+def _w(tag):
+    return f"{{{W_NS}}}{tag}"
+
+
+PKG_REL = f"{{{PKG_REL_NS}}}Relationship"
+
+W_BODY = _w("body")
+W_P = _w("p")
+W_TBL = _w("tbl")
+W_TR = _w("tr")
+W_TC = _w("tc")
+W_R = _w("r")
+W_HYPERLINK = _w("hyperlink")
+W_T = _w("t")
+W_TAB = _w("tab")
+W_PTAB = _w("ptab")
+W_BR = _w("br")
+W_CR = _w("cr")
+W_NO_BREAK_HYPHEN = _w("noBreakHyphen")
+W_VAL = _w("val")
+W_TYPE = _w("type")
+
+# 与python-docx的 run.text 相同的文本转换规则，w:br 单独处理
+RUN_TEXT = {
+    W_TAB: "\t",
+    W_PTAB: "\t",
+    W_CR: "\n",
+    W_NO_BREAK_HYPHEN: "-",
+}
+
+# 一次从压缩包读取的字节数
+READ_BLOCK_SIZE = 256 * 1024
+
+# 输出时区分的标题级数
+MAX_HEADING_LEVEL = 6
+
+# 段落：样式名称、文本、引用的图片关系ID、标题级别（正文为0）
+WordParagraph = namedtuple("WordParagraph", ["style", "text", "images", "level"])
+
+# 表格：各行单元格文本，合并单元格按其跨越的列数重复，与python-docx的 row.cells 一致
+WordTable = namedtuple("WordTable", ["rows"])
+
+
+def run_text(run):
+    """单个 w:r 的文本"""
+    parts = []
+    for child in run:
+        tag = child.tag
+        if tag == W_T:
+            parts.append(child.text or "")
+        elif tag == W_BR:
+            # 只有换行符转换为换行，分页符和分栏符不产生文本
+            if child.get(W_TYPE, "textWrapping") == "textWrapping":
+                parts.append("\n")
+        else:
+            text = RUN_TEXT.get(tag)
+            if text:
+                parts.append(text)
+    return "".join(parts)
+
+
+def paragraph_text(p):
+    """段落文本，包括超链接中的文字"""
+    parts = []
+    for child in p:
+        if child.tag == W_R:
+            parts.append(run_text(child))
+        elif child.tag == W_HYPERLINK:
+            parts.extend(run_text(run) for run in child if run.tag == W_R)
+    return "".join(parts)
+
+
+# 段落中DrawingML图片（a:blip）和旧版VML图片（v:imagedata）的关系ID，编译一次后对所有段落复用
+_IMAGE_IDS = etree.XPath(
+    ".//a:blip/@r:embed | .//v:imagedata/@r:id",
+    namespaces={"a": A_NS, "v": V_NS, "r": R_NS}
+)
+
+
+def paragraph_images(p):
+    """段落引用的图片关系ID，按出现顺序去重，兼容内容中两种图片常同时出现"""
+    return tuple(dict.fromkeys(str(rel_id) for rel_id in _IMAGE_IDS(p)))
+
+
+def heading_level(style_name):
+    """样式名称对应的标题级别，与 style.name.startswith('Heading N') 的判断一致，非标题为0"""
+    if style_name:
+        for level in range(1, MAX_HEADING_LEVEL + 1):
+            if style_name.startswith(f"Heading {level}"):
+                return level
+    return 0
+
+
+def paragraph_style_id(p):
+    """段落的样式ID，未设置时返回None"""
+    ppr = p.find(_w("pPr"))
+    if ppr is None:
+        return None
+    pstyle = ppr.find(_w("pStyle"))
+    return None if pstyle is None else pstyle.get(W_VAL)
+
+
+def table_rows(tbl):
+    """表格各行的单元格文本
+
+    横向合并（gridSpan）的单元格按跨越的列数重复，纵向合并（vMerge）的后续单元格
+    使用合并起始单元格的文本，与python-docx的 row.cells 结果一致
+    """
+    rows = []
+    previous = {}  # 上一行：网格列位置 -> 单元格文本
+    for tr in tbl.iterchildren(W_TR):
+        current = {}
+        cells = []
+
+        grid_before = 0
+        trpr = tr.find(_w("trPr"))
+        if trpr is not None:
+            before = trpr.find(_w("gridBefore"))
+            if before is not None:
+                grid_before = int(before.get(W_VAL, 0))
+        offset = grid_before
+
+        for tc in tr.iterchildren(W_TC):
+            span = 1
+            merge = None
+            tcpr = tc.find(_w("tcPr"))
+            if tcpr is not None:
+                grid_span = tcpr.find(_w("gridSpan"))
+                if grid_span is not None:
+                    span = int(grid_span.get(W_VAL, 1))
+                v_merge = tcpr.find(_w("vMerge"))
+                if v_merge is not None:
+                    merge = v_merge.get(W_VAL, "continue")
+
+            if merge == "continue" and offset in previous:
+                text = previous[offset]
+            else:
+                text = "\n".join(paragraph_text(p) for p in tc.iterchildren(W_P))
+
+            current[offset] = text
+            cells.extend([text] * span)
+            offset += span
+
+        rows.append(cells)
+        previous = current
+    return rows
+
+
+def rels_part_name(part_name):
+    """部件的关系部件名，例如 word/document.xml -> word/_rels/document.xml.rels"""
+    folder, name = posixpath.split(part_name)
+    return posixpath.join(folder, "_rels", f"{name}.rels")
+
+
+def resolve_target(part_name, target):
+    """将关系中相对于部件的目标路径转换为压缩包中的部件名"""
+    if target.startswith("/"):
+        return target[1:]
+    return posixpath.normpath(posixpath.join(posixpath.dirname(part_name), target))
+
+
+def read_rels(package, part_name):
+    """读取部件的内部关系，返回 [(关系ID, 类型, 目标部件名)]"""
+    rels_name = rels_part_name(part_name)
+    if rels_name not in package.NameToInfo:
+        return []
+
+    rels = []
+    root = etree.fromstring(package.read(rels_name))
+    for rel in root.iterchildren(PKG_REL):
+        if rel.get("TargetMode") == "External":
+            continue
+        rels.append((rel.get("Id"), rel.get("Type", ""), resolve_target(part_name, rel.get("Target", ""))))
+    return rels
+
+
+class _CountingReader:
+    """记录已读取字节数的文件包装，用于计算流式解析的进度"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.position = 0
+
+    def read(self, size=READ_BLOCK_SIZE):
+        data = self.stream.read(size)
+        self.position += len(data)
+        return data
+
+
+class WordXmlDocument:
+    """直接解析 word/document.xml 的Word文档
+
+    不构建python-docx的对象模型：样式表只在打开时解析一次，正文用 iterparse 流式解析，
+    每处理完一个顶层段落或表格就释放其XML元素，内存占用与文档大小基本无关。
+    段落和表格按文档中的实际顺序返回，只包含正文的顶层段落和表格，与python-docx的
+    doc.paragraphs、doc.tables 范围一致
+    """
+
+    def __init__(self, file_path):
+        """打开文档并读取样式表
+
+        Args:
+            file_path: docx文件路径
+        """
+        self.file_path = file_path
+        with zipfile.ZipFile(file_path) as package:
+            self.document_part = self._find_document_part(package)
+            document_rels = read_rels(package, self.document_part)
+            self.styles, self.default_style = self._read_styles(package, document_rels)
+            # 样式ID -> 标题级别，每个文档只计算一次
+            self.heading_levels = {style_id: heading_level(name) for style_id, name in self.styles.items()}
+            self.default_level = heading_level(self.default_style)
+            # 图片关系ID -> 图片部件名
+            self.image_parts = {
+                rel_id: target for rel_id, rel_type, target in document_rels
+                if rel_type.endswith(IMAGE_REL) and target in package.NameToInfo
+            }
+
+    def _find_document_part(self, package):
+        for _, rel_type, target in read_rels(package, ""):
+            if rel_type.endswith(OFFICE_DOCUMENT_REL):
+                return target
+        return "word/document.xml"
+
+    def _read_styles(self, package, document_rels):
+        """读取样式ID到样式名称的映射，名称与python-docx的 style.name 一致"""
+        styles = {}
+        default_style = "Normal"
+
+        styles_part = None
+        for _, rel_type, target in document_rels:
+            if rel_type.endswith(STYLES_REL):
+                styles_part = target
+        if styles_part is None or styles_part not in package.NameToInfo:
+            return styles, default_style
+
+        root = etree.fromstring(package.read(styles_part))
+        for style in root.iterchildren(_w("style")):
+            # 未指定类型的样式为段落样式
+            if style.get(_w("type"), "paragraph") != "paragraph":
+                continue
+            name_element = style.find(_w("name"))
+            name = BabelFish.internal2ui(name_element.get(W_VAL)) if name_element is not None else ""
+            styles[style.get(_w("styleId"))] = name
+            if style.get(_w("default")) in ("1", "true", "on"):
+                default_style = name
+        return styles, default_style
+
+    def style_name(self, style_id):
+        """样式ID对应的样式名称，未设置或不存在时为默认段落样式"""
+        if style_id is None:
+            return self.default_style
+        return self.styles.get(style_id, self.default_style)
+
+    def style_level(self, style_id):
+        """样式ID对应的标题级别"""
+        if style_id is None:
+            return self.default_level
+        return self.heading_levels.get(style_id, self.default_level)
+
+    def read_part(self, part_name):
+        """读取压缩包中的部件内容，每次单独打开压缩包，可在多个线程中同时调用"""
+        with zipfile.ZipFile(self.file_path) as package:
+            return package.read(part_name)
+
+    def iter_blocks(self):
+        """按文档顺序返回正文的段落和表格
+
+        Yields:
+            tuple: (WordParagraph 或 WordTable, 已处理的比例 0~1)
+        """
+        with zipfile.ZipFile(self.file_path) as package:
+            info = package.getinfo(self.document_part)
+            total = info.file_size or 1
+            with package.open(info) as stream:
+                reader = _CountingReader(stream)
+                for _, element in etree.iterparse(reader, events=("end",), tag=(W_P, W_TBL)):
+                    parent = element.getparent()
+                    if parent is None or parent.tag != W_BODY:
+                        # 表格中的段落随表格一起处理
+                        continue
+
+                    if element.tag == W_P:
+                        style_id = paragraph_style_id(element)
+                        block = WordParagraph(
+                            self.style_name(style_id),
+                            paragraph_text(element),
+                            paragraph_images(element),
+                            self.style_level(style_id),
+                        )
+                    else:
+                        block = WordTable(table_rows(element))
+
+                    # 释放已处理的元素
+                    element.clear(keep_tail=True)
+                    while element.getprevious() is not None:
+                        del parent[0]
+
+                    yield block, min(reader.position / total, 1.0)
@@ -5,9 +5,15 @@ Junly文件转换工具 - 主程序入口
 版权所有 (c) 2025 Junly
 """
 
+import time
+
+# 启动计时从导入模块之前开始
+START_TIME = time.perf_counter()
+
 import sys
 import os
 import signal
+import multiprocessing
 from PyQt6.QtWidgets import QApplication
 from PyQt6.QtGui import QIcon
 from PyQt6.QtCore import QTimer
@@ -16,9 +22,13 @@ from utils.logger import setup_logger, get_logger
 from utils.config import Config
 from utils.theme_manager import ThemeManager
 from utils.app_info import AppInfo
+from utils.startup_timer import StartupTimer
 
 def main():
     """主程序入口函数"""
+    startup_timer = StartupTimer(START_TIME)
+    startup_timer.mark("导入模块")
+    
     # 设置日志
     setup_logger()
     logger = get_logger()
@@ -26,6 +36,7 @@ def main():
     # 加载配置
     config = Config()
     config.load()
+    startup_timer.mark("加载配置")
     
     # 创建Qt应用
     app = QApplication(sys.argv)
@@ -42,11 +53,20 @@ def main():
     icon_path = os.path.join(os.path.dirname(__file__), "resources", "icons", "app.png")
     if os.path.exists(icon_path):
         app.setWindowIcon(QIcon(icon_path))
+    startup_timer.mark("初始化应用")
     
     # 创建主窗口
     window = MainWindow(config)
+    startup_timer.mark("创建主窗口")
     window.show()
     
+    # 事件循环开始后窗口完成首次绘制，此时输出启动耗时
+    def report_startup():
+        startup_timer.mark("首次绘制")
+        startup_timer.report(logger)
+    
+    QTimer.singleShot(0, report_startup)
+    
     # 设置信号处理，确保应用程序可以被正常终止
     def signal_handler(sig, frame):
         logger.info(f"接收到信号 {sig}，准备退出")
@@ -73,4 +93,6 @@ def main():
     return exit_code
 
 if __name__ == "__main__":
+    # 打包后的程序需要支持多进程转换的子进程启动
+    multiprocessing.freeze_support()
     sys.exit(main()) 
\ No newline at end of file
@@ -16,6 +16,12 @@ from PyQt6.QtCore import Qt, QThread, pyqtSignal
 from PyQt6.QtGui import QIcon, QColor
 
 from utils.logger import get_logger
+from core.batch.batch_scheduler import (
+    BatchScheduler, get_output_extension, get_output_path, get_input_extensions, run_conversion
+)
+from core.image.pipeline_presets import PIPELINE_PRESETS, DEFAULT_PIPELINE_PRESET
+from core.cache.result_cache import ResultCache
+from core.batch.sync_manifest import SyncManifest
 
 logger = get_logger()
 
@@ -25,157 +31,55 @@ class BatchProcessThread(QThread):
     file_completed = pyqtSignal(int, bool, str)  # 参数：文件索引，成功标志，消息
     all_completed = pyqtSignal()
     
-    def __init__(self, converter, files, output_dir, conversion_type, options=None):
+    def __init__(self, converter, files, output_dir, conversion_type, options=None, max_workers=4, cache=None,
+                 manifest=None):
         super().__init__()
         self.converter = converter
         self.files = files
         self.output_dir = output_dir
         self.conversion_type = conversion_type
         self.options = options or {}
+        self.manifest = manifest
         self.running = True
+        
+        # 按并发数调度转换任务
+        self.scheduler = BatchScheduler(converter, conversion_type, self.options, max_workers, cache, manifest)
     
     def run(self):
         """执行批量转换"""
-        for i, file_path in enumerate(self.files):
-            if not self.running:
-                break
-                
-            try:
-                # 根据文件类型和转换类型，分发到不同的处理方法
-                result = self.process_file(file_path, i)
-                
-                # 发送完成信号
-                if result:
-                    self.file_completed.emit(i, True, "成功")
-                else:
-                    self.file_completed.emit(i, False, "处理失败")
-                    
-            except Exception as e:
-                logger.exception(f"处理文件失败: {file_path}")
-                self.file_completed.emit(i, False, str(e))
-            
-            # 更新进度
-            self.progress_updated.emit(i + 1, len(self.files))
+        jobs = [(file_path, self.get_output_path(file_path)) for file_path in self.files]
+        
+        self.scheduler.run(
+            jobs,
+            result_callback=lambda index, success, message: self.file_completed.emit(index, success, message),
+            progress_callback=lambda current, total: self.progress_updated.emit(current, total)
+        )
         
         self.all_completed.emit()
     
+    def get_output_path(self, file_path):
+        """构建单个文件的输出路径"""
+        return get_output_path(file_path, self.output_dir, self.conversion_type, self.options)
+    
     def process_file(self, file_path, index):
         """处理单个文件"""
-        # 获取文件基本信息
-        file_name = os.path.basename(file_path)
-        name_without_ext = os.path.splitext(file_name)[0]
-        
-        # 根据转换类型确定输出文件扩展名
-        output_ext = self.get_output_extension()
-        
-        # 构建输出文件路径
-        output_path = os.path.join(self.output_dir, f"{name_without_ext}{output_ext}")
-        
         # 调用对应的转换方法
-        return self.call_converter_method(file_path, output_path)
+        return self.call_converter_method(file_path, self.get_output_path(file_path))
     
     def get_output_extension(self):
         """根据转换类型获取输出文件扩展名"""
-        # 根据转换类型返回相应的扩展名
-        conversion_map = {
-            "word_to_markdown": ".md",
-            "word_to_html": ".html",
-            "word_remove_images": ".docx",
-            "word_to_text": ".txt",
-            "excel_to_txt": ".txt",
-            "excel_to_markdown": ".md",
-            "markdown_to_word": ".docx",
-            "markdown_tables_to_excel": ".xlsx",
-            "pdf_to_word": ".docx",
-            "pdf_to_text": ".txt",
-            "pdf_extract_images": "",  # 将创建一个图片目录
-            "image_format_convert": "",  # 根据目标格式确定
-            "image_resize": "",  # 保持原格式
-            "image_compress": "",  # 保持原格式
-            "text_encoding_convert": ".txt",
-            "text_to_html": ".html",
-            "text_to_markdown": ".md",
-            "text_batch_replace": ".txt"
-        }
-        
-        return conversion_map.get(self.conversion_type, "")
+        return get_output_extension(self.conversion_type)
     
     def call_converter_method(self, input_path, output_path):
         """调用转换器的对应方法"""
-        # 这里需要根据转换类型调用不同的转换方法
-        
-        # 文本处理功能
-        if self.conversion_type == "text_encoding_convert":
-            # 编码转换
-            target_encoding = self.options.get("target_encoding", "UTF-8")
-            result = self.converter.convert_encoding(input_path, output_path, target_encoding)
-            return result
-            
-        elif self.conversion_type == "text_to_html":
-            # 转换为HTML
-            result = self.converter.text_to_html(input_path, output_path)
-            return result
-            
-        elif self.conversion_type == "text_to_markdown":
-            # 转换为Markdown
-            result = self.converter.text_to_markdown(input_path, output_path)
-            return result
-            
-        elif self.conversion_type == "text_batch_replace":
-            # 批量替换
-            # 使用之前设置的替换规则
-            if not hasattr(self.converter, "replace_rules") or not self.converter.replace_rules:
-                # 如果没有设置替换规则，尝试从选项中获取并设置
-                rules_text = self.options.get("replace_rules", "")
-                if rules_text:
-                    self.converter.set_replace_rules(rules_text)
-                else:
-                    logger.error("未设置替换规则")
-                    return False
-                    
-            result = self.converter.batch_replace(input_path, output_path)
-            return result
-            
-        # Word转换功能
-        elif self.conversion_type == "word_to_markdown":
-            # 读取文档
-            doc = self.converter.read_word(input_path)
-            # 转换为Markdown
-            result = self.converter.save_as_markdown(
-                doc, output_path, 
-                self.options.get("include_images", True)
-            )
-            return result
-            
-        elif self.conversion_type == "word_to_html":
-            # 读取文档
-            doc = self.converter.read_word(input_path)
-            # 转换为HTML
-            result = self.converter.save_as_html(
-                doc, output_path,
-                self.options.get("include_images", True)
-            )
-            return result
-            
-        elif self.conversion_type == "word_remove_images":
-            # 移除图片
-            result = self.converter.remove_images(input_path, output_path)
-            return result
-            
-        elif self.conversion_type == "word_to_text":
-            # 读取文档
-            doc = self.converter.read_word(input_path)
-            # 转换为文本
-            result = self.converter.save_as_text(doc, output_path)
-            return result
-            
-        # 其他转换类型暂未实现
-        logger.warning(f"未实现的转换类型: {self.conversion_type}")
-        return False
+        return run_conversion(
+            self.converter, self.conversion_type, input_path, output_path, self.options
+        )
     
     def stop(self):
-        """停止处理"""
+        """停止处理，已在执行的文件处理完成后线程结束"""
         self.running = False
+        self.scheduler.stop()
 
 class BatchWindow(QDialog):
     """批量处理窗口"""
@@ -228,6 +132,7 @@ class BatchWindow(QDialog):
         
         # 输出目录区域
         output_group = QGroupBox("输出目录")
+        output_group_layout = QVBoxLayout()
         output_layout = QHBoxLayout()
         
         self.output_path = QLineEdit()
@@ -238,10 +143,31 @@ class BatchWindow(QDialog):
         browse_button = QPushButton("浏览...")
         browse_button.clicked.connect(self.browse_output_dir)
         output_layout.addWidget(browse_button)
+        output_group_layout.addLayout(output_layout)
         
-        output_group.setLayout(output_layout)
+        # 增量同步：只转换自上次同步后新增或修改的文件
+        self.sync_checkbox = QCheckBox("增量同步（跳过未变化的文件，删除已删除文件的输出）")
+        output_group_layout.addWidget(self.sync_checkbox)
+        
+        output_group.setLayout(output_group_layout)
         layout.addWidget(output_group)
         
+        # 图片组合处理的预设选择
+        if self.conversion_type == "image_pipeline":
+            preset_group = QGroupBox("处理预设")
+            preset_layout = QHBoxLayout()
+            
+            self.preset_combo = QComboBox()
+            for preset, (label, _) in PIPELINE_PRESETS.items():
+                self.preset_combo.addItem(label, preset)
+            self.preset_combo.setCurrentIndex(list(PIPELINE_PRESETS).index(DEFAULT_PIPELINE_PRESET))
+            self.preset_combo.currentIndexChanged.connect(self.on_preset_changed)
+            preset_layout.addWidget(self.preset_combo)
+            
+            preset_group.setLayout(preset_layout)
+            layout.addWidget(preset_group)
+            self.options["preset"] = DEFAULT_PIPELINE_PRESET
+        
         # 进度区域
         progress_group = QGroupBox("处理进度")
         progress_layout = QVBoxLayout()
@@ -288,6 +214,22 @@ class BatchWindow(QDialog):
             options (dict): 处理选项字典
         """
         self.options = options or {}
+        
+        # 同步预设选择，未指定预设时使用下拉框当前的预设
+        if self.conversion_type == "image_pipeline":
+            index = self.preset_combo.findData(self.options.get("preset"))
+            if index >= 0:
+                self.preset_combo.blockSignals(True)
+                self.preset_combo.setCurrentIndex(index)
+                self.preset_combo.blockSignals(False)
+            else:
+                self.options["preset"] = self.preset_combo.currentData()
+    
+    def on_preset_changed(self, index):
+        """切换组合处理预设"""
+        self.options["preset"] = self.preset_combo.itemData(index)
+        # 预设决定处理内容，不再使用之前设置的自定义操作
+        self.options.pop("operations", None)
 
     def add_files(self):
         """添加文件到处理列表"""
@@ -361,6 +303,12 @@ class BatchWindow(QDialog):
             # 更新开始按钮状态
             self.start_button.setEnabled(len(self.files) > 0)
     
+    def create_cache(self):
+        """根据配置创建转换结果缓存，未启用时返回None"""
+        if not self.config.get("cache_enabled"):
+            return None
+        return ResultCache(max_size=self.config.get("cache_max_size_mb") * 1024 * 1024)
+    
     def get_file_filter(self):
         """根据转换类型获取文件过滤器"""
         # 根据不同的转换类型返回相应的文件过滤器
@@ -379,6 +327,7 @@ class BatchWindow(QDialog):
             "image_format_convert": "图片文件 (*.jpg *.jpeg *.png *.bmp *.tiff)",
             "image_resize": "图片文件 (*.jpg *.jpeg *.png *.bmp *.tiff)",
             "image_compress": "图片文件 (*.jpg *.jpeg *.png *.bmp *.tiff)",
+            "image_pipeline": "图片文件 (*.jpg *.jpeg *.png *.bmp *.tiff *.webp)",
             "text_encoding_convert": "文本文件 (*.txt);;所有文件 (*)",
             "text_to_html": "文本文件 (*.txt);;所有文件 (*)",
             "text_to_markdown": "文本文件 (*.txt);;所有文件 (*)",
@@ -389,29 +338,7 @@ class BatchWindow(QDialog):
     
     def get_file_extensions(self):
         """根据转换类型获取支持的文件扩展名"""
-        # 根据不同的转换类型返回相应的文件扩展名列表
-        conversion_map = {
-            "word_to_markdown": [".docx", ".doc"],
-            "word_to_html": [".docx", ".doc"],
-            "word_remove_images": [".docx", ".doc"],
-            "word_to_text": [".docx", ".doc"],
-            "excel_to_txt": [".xlsx", ".xls"],
-            "excel_to_markdown": [".xlsx", ".xls"],
-            "markdown_to_word": [".md"],
-            "markdown_tables_to_excel": [".md"],
-            "pdf_to_word": [".pdf"],
-            "pdf_to_text": [".pdf"],
-            "pdf_extract_images": [".pdf"],
-            "image_format_convert": [".jpg", ".jpeg", ".png", ".bmp", ".tiff"],
-            "image_resize": [".jpg", ".jpeg", ".png", ".bmp", ".tiff"],
-            "image_compress": [".jpg", ".jpeg", ".png", ".bmp", ".tiff"],
-            "text_encoding_convert": [".txt"],
-            "text_to_html": [".txt"],
-            "text_to_markdown": [".txt"],
-            "text_batch_replace": [".txt"]
-        }
-        
-        return conversion_map.get(self.conversion_type, [])
+        return get_input_extensions(self.conversion_type)
     
     def start_processing(self):
         """开始批量处理"""
@@ -451,7 +378,10 @@ class BatchWindow(QDialog):
             self.files,
             output_dir,
             self.conversion_type,
-            self.options
+            self.options,
+            self.config.get("batch_threads"),
+            self.create_cache(),
+            SyncManifest(output_dir, self.conversion_type, self.options) if self.sync_checkbox.isChecked() else None
         )
         
         # 连接信号
@@ -468,16 +398,16 @@ class BatchWindow(QDialog):
     def stop_processing(self):
         """停止处理"""
         if hasattr(self, 'process_thread') and self.process_thread and self.process_thread.isRunning():
-            self.status_label.setText("正在停止...")
+            self.progress_label.setText("正在停止...")
             self.process_thread.stop()
             
             # 等待线程结束
             if not self.process_thread.wait(3000):  # 等待最多3秒
-                self.status_label.setText("线程无响应，强制停止")
+                self.progress_label.setText("正在等待执行中的文件完成...")
                 # 如果线程没有响应，则记录警告
-                logger.warning("批处理线程未响应停止请求，可能需要强制终止")
+                logger.warning("批处理线程仍在完成执行中的文件")
             else:
-                self.status_label.setText("已停止")
+                self.progress_label.setText("已停止")
             
             # 重置UI
             self.start_button.setEnabled(True)
@@ -510,7 +440,7 @@ class BatchWindow(QDialog):
         file_name = os.path.basename(file_path)
         
         # 创建状态项
-        item_text = f"{file_name}: {'成功' if success else '失败 - ' + message}"
+        item_text = f"{file_name}: {message if success else '失败 - ' + message}"
         item = QListWidgetItem(item_text)
         
         # 设置状态项颜色
@@ -537,7 +467,11 @@ class BatchWindow(QDialog):
         self.progress_label.setText("处理完成")
         
         # 弹出完成提示
-        QMessageBox.information(self, "完成", "批量处理已完成")
+        manifest = self.process_thread.manifest
+        if manifest:
+            QMessageBox.information(self, "完成", f"批量处理已完成\n{manifest.summary()}")
+        else:
+            QMessageBox.information(self, "完成", "批量处理已完成")
     
     def closeEvent(self, event):
         """关闭窗口前确认停止所有处理"""
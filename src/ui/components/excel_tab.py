@@ -14,7 +14,6 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import Qt, pyqtSignal, QThread
 from PyQt6.QtGui import QColor
-from core.excel.excel_converter import ExcelConverter
 
 class ExcelConversionThread(QThread):
     """Excel转换线程"""
@@ -39,6 +38,7 @@ class ExcelConversionThread(QThread):
                 if not self.running:
                     break
                     
+                workbook = None
                 try:
                     # 生成输出文件路径
                     filename = os.path.basename(input_file)
@@ -73,12 +73,10 @@ class ExcelConversionThread(QThread):
                         
                         # 检查是否有多个工作表
                         if len(workbook.sheetnames) > 1:
-                            # 如有多工作表，记录所有可能的输出文件路径
-                            multiple_outputs = []
-                            base_name, _ = os.path.splitext(output_path)
-                            for sheet_name in workbook.sheetnames:
-                                sheet_output_path = f"{base_name}-{sheet_name}.md"
-                                multiple_outputs.append(sheet_output_path)
+                            # 如有多工作表，记录各工作表的输出文件路径
+                            multiple_outputs = [
+                                path for _, path in self.converter.get_markdown_outputs(workbook, output_path)
+                            ]
                             
                             # 在结果中标记它有多个输出文件
                             results.append((input_file, multiple_outputs, True, "多Sheet文档，已为每个Sheet生成单独的MD文件"))
@@ -89,6 +87,10 @@ class ExcelConversionThread(QThread):
                         results.append((input_file, "", False, f"不支持的转换类型: {self.conversion_type}"))
                 except Exception as e:
                     results.append((input_file, "", False, str(e)))
+                finally:
+                    # 只读模式的工作簿需要关闭以释放文件
+                    if workbook is not None:
+                        workbook.close()
                 
                 # 更新进度
                 self.progress_updated.emit(int((i+1) / len(self.input_files) * 100))
@@ -111,10 +113,18 @@ class ExcelTab(QWidget):
         super().__init__()
         self.config = config
         self.input_file = ""
-        self.converter = ExcelConverter()
+        self._converter = None
         self.conversion_thread = None
         self.init_ui()
     
+    @property
+    def converter(self):
+        """转换器在首次使用时创建，避免启动时加载转换依赖库"""
+        if self._converter is None:
+            from core.excel.excel_converter import ExcelConverter
+            self._converter = ExcelConverter()
+        return self._converter
+    
     def init_ui(self):
         """初始化用户界面"""
         layout = QVBoxLayout()
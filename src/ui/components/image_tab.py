@@ -15,7 +15,8 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import Qt, pyqtSignal, QThread
 from PyQt6.QtGui import QColor
-from core.image.image_processor import ImageProcessor
+
+from core.image.pipeline_presets import PIPELINE_PRESETS, DEFAULT_PIPELINE_PRESET, get_preset_operations
 
 class ImageProcessingThread(QThread):
     """图片处理线程"""
@@ -55,6 +56,12 @@ class ImageProcessingThread(QThread):
                     self.input_files, self.output_dir, quality,
                     progress_callback=lambda value: self.progress_updated.emit(value)
                 )
+            elif self.operation_type == "pipeline":
+                operations = self.params.get('operations', [])
+                results = self.processor.batch_process_pipeline(
+                    self.input_files, self.output_dir, operations,
+                    progress_callback=lambda value: self.progress_updated.emit(value)
+                )
             else:
                 raise Exception(f"不支持的操作类型: {self.operation_type}")
             
@@ -70,9 +77,17 @@ class ImageTab(QWidget):
         super().__init__()
         self.config = config
         self.input_files = []
-        self.processor = ImageProcessor()
+        self._processor = None
         self.init_ui()
     
+    @property
+    def processor(self):
+        """处理器在首次使用时创建，避免启动时加载转换依赖库"""
+        if self._processor is None:
+            from core.image.image_processor import ImageProcessor
+            self._processor = ImageProcessor()
+        return self._processor
+    
     def init_ui(self):
         """初始化用户界面"""
         layout = QVBoxLayout()
@@ -84,11 +99,13 @@ class ImageTab(QWidget):
         self.format_tab = self.create_format_tab()
         self.resize_tab = self.create_resize_tab()
         self.compress_tab = self.create_compress_tab()
+        self.pipeline_tab = self.create_pipeline_tab()
         
         # 添加子标签页
         self.tabs.addTab(self.format_tab, "格式转换")
         self.tabs.addTab(self.resize_tab, "尺寸调整")
         self.tabs.addTab(self.compress_tab, "图片压缩")
+        self.tabs.addTab(self.pipeline_tab, "组合处理")
         
         layout.addWidget(self.tabs)
         
@@ -342,6 +359,88 @@ class ImageTab(QWidget):
         tab.setLayout(layout)
         return tab
     
+    def create_pipeline_tab(self):
+        """创建组合处理标签页"""
+        tab = QWidget()
+        layout = QVBoxLayout()
+        
+        # 文件选择区域
+        file_group = QGroupBox("图片选择")
+        file_layout = QVBoxLayout()
+        
+        # 文件列表
+        self.pipeline_file_list = QListWidget()
+        file_layout.addWidget(self.pipeline_file_list)
+        
+        # 按钮区域
+        button_layout = QHBoxLayout()
+        
+        add_files_button = QPushButton("添加图片")
+        add_files_button.clicked.connect(lambda: self.add_files(self.pipeline_file_list))
+        button_layout.addWidget(add_files_button)
+        
+        add_dir_button = QPushButton("添加目录")
+        add_dir_button.clicked.connect(lambda: self.add_directory(self.pipeline_file_list))
+        button_layout.addWidget(add_dir_button)
+        
+        clear_button = QPushButton("清空列表")
+        clear_button.clicked.connect(lambda: self.clear_files(self.pipeline_file_list))
+        button_layout.addWidget(clear_button)
+        
+        file_layout.addLayout(button_layout)
+        file_group.setLayout(file_layout)
+        layout.addWidget(file_group)
+        
+        # 组合处理选项区域
+        options_group = QGroupBox("处理选项")
+        options_layout = QVBoxLayout()
+        
+        # 预设选择
+        preset_layout = QHBoxLayout()
+        preset_layout.addWidget(QLabel("处理预设:"))
+        self.preset_combo = QComboBox()
+        for preset, (label, _) in PIPELINE_PRESETS.items():
+            self.preset_combo.addItem(label, preset)
+        self.preset_combo.setCurrentIndex(list(PIPELINE_PRESETS).index(DEFAULT_PIPELINE_PRESET))
+        preset_layout.addWidget(self.preset_combo)
+        options_layout.addLayout(preset_layout)
+        
+        options_layout.addWidget(QLabel("所有操作在一次解码后依次执行，最后只保存一次"))
+        
+        # 输出目录选择
+        output_layout = QHBoxLayout()
+        output_layout.addWidget(QLabel("输出目录:"))
+        self.pipeline_output_path = QLineEdit()
+        self.pipeline_output_path.setText(self.config.get("default_output_path"))
+        self.pipeline_output_path.setReadOnly(True)
+        output_layout.addWidget(self.pipeline_output_path)
+        
+        output_button = QPushButton("浏览...")
+        output_button.clicked.connect(lambda: self.select_output_dir(self.pipeline_output_path))
+        output_layout.addWidget(output_button)
+        options_layout.addLayout(output_layout)
+        
+        options_group.setLayout(options_layout)
+        layout.addWidget(options_group)
+        
+        # 进度条
+        progress_layout = QHBoxLayout()
+        progress_layout.addWidget(QLabel("处理进度:"))
+        self.pipeline_progress = QProgressBar()
+        progress_layout.addWidget(self.pipeline_progress)
+        layout.addLayout(progress_layout)
+        
+        # 开始处理按钮
+        start_layout = QHBoxLayout()
+        start_layout.addStretch()
+        self.pipeline_start_button = QPushButton("开始处理")
+        self.pipeline_start_button.clicked.connect(lambda: self.start_processing("pipeline"))
+        start_layout.addWidget(self.pipeline_start_button)
+        layout.addLayout(start_layout)
+        
+        tab.setLayout(layout)
+        return tab
+    
     def add_files(self, list_widget):
         """添加图片到处理列表"""
         file_paths, _ = QFileDialog.getOpenFileNames(
@@ -409,6 +508,9 @@ class ImageTab(QWidget):
         elif tab_index == 2:  # 图片压缩
             if not self.is_file_in_list(self.compress_file_list, file_path):
                 self.compress_file_list.addItem(file_path)
+        elif tab_index == 3:  # 组合处理
+            if not self.is_file_in_list(self.pipeline_file_list, file_path):
+                self.pipeline_file_list.addItem(file_path)
     
     def start_processing(self, operation_type):
         """开始处理图片"""
@@ -435,6 +537,12 @@ class ImageTab(QWidget):
             progress_bar = self.compress_progress
             start_button = self.compress_start_button
             params = {'quality': self.quality_spin.value()}
+        elif operation_type == "pipeline":
+            file_list = self.pipeline_file_list
+            output_path = self.pipeline_output_path.text()
+            progress_bar = self.pipeline_progress
+            start_button = self.pipeline_start_button
+            params = {'operations': get_preset_operations(self.preset_combo.currentData())}
         else:
             return
         
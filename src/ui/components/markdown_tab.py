@@ -14,7 +14,6 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import Qt, pyqtSignal, QThread
 from PyQt6.QtGui import QColor
-from core.markdown.markdown_converter import MarkdownConverter
 
 class MarkdownConversionThread(QThread):
     """Markdown转换线程"""
@@ -86,9 +85,17 @@ class MarkdownTab(QWidget):
         super().__init__()
         self.config = config
         self.input_file = ""
-        self.converter = MarkdownConverter()
+        self._converter = None
         self.init_ui()
     
+    @property
+    def converter(self):
+        """转换器在首次使用时创建，避免启动时加载转换依赖库"""
+        if self._converter is None:
+            from core.markdown.markdown_converter import MarkdownConverter
+            self._converter = MarkdownConverter()
+        return self._converter
+    
     def init_ui(self):
         """初始化用户界面"""
         layout = QVBoxLayout()
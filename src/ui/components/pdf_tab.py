@@ -14,25 +14,29 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import Qt, pyqtSignal, QThread
 from PyQt6.QtGui import QColor
-from core.pdf.pdf_converter import PDFConverter
+from core.pdf.image_cache import PDFImageCache
 
 class PDFConversionThread(QThread):
     """PDF转换线程"""
     progress_updated = pyqtSignal(int)
     conversion_completed = pyqtSignal(bool, str, object)  # 成功标志，消息，附加数据
     
-    def __init__(self, converter, input_files, output_dir, conversion_type):
+    def __init__(self, converter, input_files, output_dir, conversion_type, save_image_files=True):
         super().__init__()
         self.converter = converter
         self.input_files = input_files if isinstance(input_files, list) else [input_files]
         self.output_dir = output_dir
         self.conversion_type = conversion_type
+        self.save_image_files = save_image_files
     
     def run(self):
         """执行转换操作"""
         try:
             results = []
             
+            # 整批文件共用一个图片缓存，跨文档去重
+            image_cache = PDFImageCache()
+            
             # 处理所有文件
             for i, input_file in enumerate(self.input_files):
                 try:
@@ -60,7 +64,9 @@ class PDFConversionThread(QThread):
                     if self.conversion_type == "word":
                         result = self.converter.to_word(
                             pdf, output_path, True,
-                            progress_callback=lambda value: self.progress_updated.emit(value)
+                            progress_callback=lambda value: self.progress_updated.emit(value),
+                            save_image_files=self.save_image_files,
+                            image_cache=image_cache
                         )
                         results.append((input_file, output_path, True, ""))
                     elif self.conversion_type == "text":
@@ -72,7 +78,8 @@ class PDFConversionThread(QThread):
                     elif self.conversion_type == "images":
                         image_count = self.converter.extract_images(
                             pdf, output_path,
-                            progress_callback=lambda value: self.progress_updated.emit(value)
+                            progress_callback=lambda value: self.progress_updated.emit(value),
+                            image_cache=image_cache
                         )
                         results.append((input_file, output_path, True, f"已提取{image_count}张图片"))
                     else:
@@ -86,7 +93,12 @@ class PDFConversionThread(QThread):
                 # 更新进度
                 self.progress_updated.emit(int((i+1) / len(self.input_files) * 100))
             
-            self.conversion_completed.emit(True, "转换成功", results)
+            # 有重复图片时附带去重统计
+            message = "转换成功"
+            if image_cache.duplicate_images:
+                message = image_cache.summary()
+            
+            self.conversion_completed.emit(True, message, results)
             
         except Exception as e:
             self.conversion_completed.emit(False, str(e), None)
@@ -98,9 +110,17 @@ class PDFTab(QWidget):
         super().__init__()
         self.config = config
         self.input_file = ""
-        self.converter = PDFConverter()
+        self._converter = None
         self.init_ui()
     
+    @property
+    def converter(self):
+        """转换器在首次使用时创建，避免启动时加载转换依赖库"""
+        if self._converter is None:
+            from core.pdf.pdf_converter import PDFConverter
+            self._converter = PDFConverter()
+        return self._converter
+    
     def init_ui(self):
         """初始化用户界面"""
         layout = QVBoxLayout()
@@ -161,6 +181,11 @@ class PDFTab(QWidget):
         type_layout.addWidget(self.conversion_type)
         options_layout.addLayout(type_layout)
         
+        # 转Word时是否另存图片文件
+        self.save_image_files = QCheckBox("转Word时同时导出图片文件")
+        self.save_image_files.setChecked(True)
+        options_layout.addWidget(self.save_image_files)
+        
         options_group.setLayout(options_layout)
         layout.addWidget(options_group)
         
@@ -288,7 +313,8 @@ class PDFTab(QWidget):
         self.convert_button.setEnabled(False)
         
         self.conversion_thread = PDFConversionThread(
-            self.converter, input_files, output_dir, conversion_type
+            self.converter, input_files, output_dir, conversion_type,
+            self.save_image_files.isChecked()
         )
         self.conversion_thread.progress_updated.connect(self.update_progress)
         self.conversion_thread.conversion_completed.connect(self.conversion_finished)
@@ -306,11 +332,14 @@ class PDFTab(QWidget):
             # 显示详细的转换结果
             success_count = sum(1 for _, _, status, _ in results if status)
             
+            # 附加的统计信息（如图片去重结果）
+            extra_msg = f"\n\n{message}" if message != "转换成功" else ""
+            
             if success_count == len(results):
-                QMessageBox.information(self, "转换完成", f"成功转换 {success_count} 个文件！")
+                QMessageBox.information(self, "转换完成", f"成功转换 {success_count} 个文件！{extra_msg}")
             else:
                 fail_count = len(results) - success_count
-                detailed_msg = f"成功: {success_count} 个文件\n失败: {fail_count} 个文件\n\n"
+                detailed_msg = f"成功: {success_count} 个文件\n失败: {fail_count} 个文件{extra_msg}\n\n"
                 
                 # 添加失败文件的详细信息
                 for input_file, _, status, error in results:
@@ -14,7 +14,6 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import Qt, pyqtSignal, QThread
 from PyQt6.QtGui import QColor
-from core.text.text_processor import TextProcessor
 
 class TextProcessingThread(QThread):
     """文本处理线程"""
@@ -100,9 +99,17 @@ class TextTab(QWidget):
         super().__init__()
         self.config = config
         self.input_file = ""
-        self.processor = TextProcessor()
+        self._processor = None
         self.init_ui()
     
+    @property
+    def processor(self):
+        """处理器在首次使用时创建，避免启动时加载转换依赖库"""
+        if self._processor is None:
+            from core.text.text_processor import TextProcessor
+            self._processor = TextProcessor()
+        return self._processor
+    
     def init_ui(self):
         """初始化用户界面"""
         layout = QVBoxLayout()
@@ -184,7 +191,7 @@ class TextTab(QWidget):
         self.replace_group.setVisible(False)
         replace_layout = QVBoxLayout()
         
-        replace_layout.addWidget(QLabel("替换规则 (每行一条，格式: 原文本->替换文本)"))
+        replace_layout.addWidget(QLabel("替换规则 (每行一条，格式: 原文本->替换文本，以 re: 开头的原文本按正则表达式逐行匹配，在普通规则之后按顺序执行)"))
         self.replace_rules = QTextEdit()
         replace_layout.addWidget(self.replace_rules)
         
@@ -339,20 +346,17 @@ class TextTab(QWidget):
                 QMessageBox.warning(self, "警告", "请输入替换规则")
                 return
             
-            # 解析并设置替换规则
-            rules = []
-            for line in rules_text.split("\n"):
-                if "->" in line:
-                    old, new = line.split("->", 1)
-                    rules.append((old.strip(), new.strip()))
+            # 解析并设置替换规则，相同的规则文本直接使用缓存的编译结果
+            try:
+                self.processor.set_replace_rules(rules_text)
+            except Exception as e:
+                QMessageBox.warning(self, "警告", str(e))
+                return
             
-            if not rules:
+            if not self.processor.rule_set:
                 QMessageBox.warning(self, "警告", "没有有效的替换规则")
                 return
             
-            # 修复批量替换功能闪退问题，直接传递规则列表，而非规则文本
-            self.processor.replace_rules = rules
-            
         # 启动处理线程
         self.progress_bar.setValue(0)
         self.process_button.setEnabled(False)
@@ -14,7 +14,6 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import Qt, pyqtSignal, QThread
 from PyQt6.QtGui import QColor
-from core.word.word_converter import WordConverter
 
 class WordConversionThread(QThread):
     """Word转换线程"""
@@ -119,12 +118,20 @@ class WordTab(QWidget):
         super().__init__()
         self.config = config
         self.input_file = ""
-        self.converter = WordConverter()
+        self._converter = None
         self.conversion_thread = None
         self.step1_thread = None
         self.step2_thread = None
         self.init_ui()
     
+    @property
+    def converter(self):
+        """转换器在首次使用时创建，避免启动时加载转换依赖库"""
+        if self._converter is None:
+            from core.word.word_converter import WordConverter
+            self._converter = WordConverter()
+        return self._converter
+    
     def init_ui(self):
         """初始化用户界面"""
         layout = QVBoxLayout()
@@ -7,6 +7,8 @@ Junly文件转换工具 - 主窗口
 
 import os
 import sys
+import time
+import importlib
 
 # 将项目根目录添加到系统路径
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -23,16 +25,22 @@ from PyQt6.QtCore import Qt, QSize, QPoint, QRect, QRectF, QPropertyAnimation, Q
 from PyQt6.QtGui import QAction, QIcon, QPainter, QColor, QPainterPath, QRegion, QPen, QDesktopServices, QCursor
 from datetime import datetime
 
-from ui.components.word_tab import WordTab
-from ui.components.excel_tab import ExcelTab
-from ui.components.markdown_tab import MarkdownTab
-from ui.components.pdf_tab import PDFTab
-from ui.components.image_tab import ImageTab
-from ui.components.text_tab import TextTab
 from ui.settings_window import SettingsWindow
 from utils.theme_manager import ThemeManager
 from utils.animation_helper import AnimationHelper
 from utils.app_info import AppInfo
+from utils.logger import get_logger
+
+# 功能标签页：(属性名, 模块, 类名, 标题, 支持的文件扩展名)
+# 标签页在首次切换到时才导入和创建，以缩短启动时间
+TAB_SPECS = [
+    ("word_tab", "ui.components.word_tab", "WordTab", "Word转换", ['.doc', '.docx']),
+    ("excel_tab", "ui.components.excel_tab", "ExcelTab", "Excel转换", ['.xls', '.xlsx']),
+    ("markdown_tab", "ui.components.markdown_tab", "MarkdownTab", "Markdown转换", ['.md']),
+    ("pdf_tab", "ui.components.pdf_tab", "PDFTab", "PDF转换", ['.pdf']),
+    ("image_tab", "ui.components.image_tab", "ImageTab", "图片处理", ['.jpg', '.jpeg', '.png', '.bmp', '.tiff']),
+    ("text_tab", "ui.components.text_tab", "TextTab", "文本处理", ['.txt']),
+]
 
 class MainWindow(QMainWindow):
     """主窗口类"""
@@ -46,7 +54,7 @@ class MainWindow(QMainWindow):
         # 应用主题
         self.apply_theme()
         
-        # 为所有控件添加动画支持
+        # 为已创建的控件添加动画支持，标签页在创建时单独设置
         AnimationHelper.setup_animation_for_all(self)
         
     def init_ui(self):
@@ -108,20 +116,16 @@ class MainWindow(QMainWindow):
         self.tabs = QTabWidget()
         self.content_layout.addWidget(self.tabs)
         
-        # 添加各功能标签页
-        self.word_tab = WordTab(self.config)
-        self.excel_tab = ExcelTab(self.config)
-        self.markdown_tab = MarkdownTab(self.config)
-        self.pdf_tab = PDFTab(self.config)
-        self.image_tab = ImageTab(self.config)
-        self.text_tab = TextTab(self.config)
-        
-        self.tabs.addTab(self.word_tab, "Word转换")
-        self.tabs.addTab(self.excel_tab, "Excel转换")
-        self.tabs.addTab(self.markdown_tab, "Markdown转换")
-        self.tabs.addTab(self.pdf_tab, "PDF转换")
-        self.tabs.addTab(self.image_tab, "图片处理")
-        self.tabs.addTab(self.text_tab, "文本处理")
+        # 添加各功能标签页的占位页，实际内容在首次切换到时创建
+        for attr_name, _, _, title, _ in TAB_SPECS:
+            setattr(self, attr_name, None)
+            page = QWidget()
+            page_layout = QVBoxLayout(page)
+            page_layout.setContentsMargins(0, 0, 0, 0)
+            self.tabs.addTab(page, title)
+        
+        self.tabs.currentChanged.connect(self.ensure_tab)
+        self.ensure_tab(self.tabs.currentIndex())
         
         # 创建状态栏
         self.statusBar = QStatusBar()
@@ -164,6 +168,36 @@ class MainWindow(QMainWindow):
         # 设置拖放支持
         self.setAcceptDrops(True)
     
+    def ensure_tab(self, index):
+        """确保指定位置的标签页已经创建
+        
+        Args:
+            index: 标签页索引
+            
+        Returns:
+            标签页控件，索引无效时返回None
+        """
+        if index < 0 or index >= len(TAB_SPECS):
+            return None
+        
+        attr_name, module_name, class_name, title, _ = TAB_SPECS[index]
+        tab = getattr(self, attr_name)
+        if tab is not None:
+            return tab
+        
+        start_time = time.perf_counter()
+        
+        tab_class = getattr(importlib.import_module(module_name), class_name)
+        tab = tab_class(self.config)
+        self.tabs.widget(index).layout().addWidget(tab)
+        setattr(self, attr_name, tab)
+        
+        # 新创建的控件需要单独添加动画支持
+        AnimationHelper.setup_animation_for_all(tab)
+        
+        get_logger().debug(f"创建{title}标签页耗时 {(time.perf_counter() - start_time) * 1000:.1f} 毫秒")
+        return tab
+    
     def create_title_bar(self):
         """创建Windows 11风格的标题栏"""
         title_bar = QFrame()
@@ -314,24 +348,11 @@ class MainWindow(QMainWindow):
         file_ext = os.path.splitext(file_path)[1].lower()
         
         # 根据文件扩展名切换到相应的标签页
-        if file_ext in ['.doc', '.docx']:
-            self.tabs.setCurrentWidget(self.word_tab)
-            self.word_tab.set_input_file(file_path)
-        elif file_ext in ['.xls', '.xlsx']:
-            self.tabs.setCurrentWidget(self.excel_tab)
-            self.excel_tab.set_input_file(file_path)
-        elif file_ext == '.md':
-            self.tabs.setCurrentWidget(self.markdown_tab)
-            self.markdown_tab.set_input_file(file_path)
-        elif file_ext == '.pdf':
-            self.tabs.setCurrentWidget(self.pdf_tab)
-            self.pdf_tab.set_input_file(file_path)
-        elif file_ext in ['.jpg', '.jpeg', '.png', '.bmp', '.tiff']:
-            self.tabs.setCurrentWidget(self.image_tab)
-            self.image_tab.set_input_file(file_path)
-        elif file_ext == '.txt':
-            self.tabs.setCurrentWidget(self.text_tab)
-            self.text_tab.set_input_file(file_path)
+        for index, spec in enumerate(TAB_SPECS):
+            if file_ext in spec[4]:
+                self.tabs.setCurrentIndex(index)
+                self.ensure_tab(index).set_input_file(file_path)
+                break
     
     def open_settings(self):
         """打开设置窗口"""
@@ -23,7 +23,10 @@ class Config:
             "theme": "win11_light",
             "recent_files": [],
             "max_recent_files": 10,
-            "batch_threads": 4
+            "batch_threads": 4,
+            # 批量转换结果缓存，缓存目录为 ~/.file-converter/cache
+            "cache_enabled": True,
+            "cache_max_size_mb": 1024
         }
         
         # 当前配置，初始化为默认值
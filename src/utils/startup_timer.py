@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Junly文件转换工具 - 启动计时工具
+版权所有 (c) 2025 Junly
+"""
+
+import time
+
+
+class StartupTimer:
+    """记录程序启动各阶段的耗时"""
+    
+    # 首次绘制的目标耗时（毫秒）
+    TARGET_FIRST_PAINT_MS = 500
+    
+    def __init__(self, start_time=None):
+        """初始化计时器
+        
+        Args:
+            start_time: 启动时刻（time.perf_counter() 的值），默认为当前时刻
+        """
+        self.start_time = start_time if start_time is not None else time.perf_counter()
+        self.last_time = self.start_time
+        self.phases = []
+    
+    def mark(self, phase_name):
+        """记录一个阶段结束，耗时从上一个阶段结束时算起"""
+        now = time.perf_counter()
+        self.phases.append((phase_name, (now - self.last_time) * 1000))
+        self.last_time = now
+    
+    def total_ms(self):
+        """返回从启动到最后一个阶段结束的总耗时（毫秒）"""
+        return (self.last_time - self.start_time) * 1000
+    
+    def report(self, logger):
+        """将各阶段耗时写入日志，超过目标耗时时记录警告"""
+        total = self.total_ms()
+        details = "，".join(f"{name} {elapsed:.0f}ms" for name, elapsed in self.phases)
+        logger.info(f"启动耗时 {total:.0f} 毫秒（{details}）")
+        
+        if total > self.TARGET_FIRST_PAINT_MS:
+            logger.warning(f"启动耗时超过目标 {self.TARGET_FIRST_PAINT_MS} 毫秒")
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Markdown转Word性能基准：旧的HTML往返解析与直接使用解析树对比
+
+用法: python tests/bench_markdown_converter.py [--size-mb 5] [--skip-word] [--table-rows 20000]
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+# 将项目根目录加入 Python 路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import markdown
+from bs4 import BeautifulSoup
+from docx import Document
+from src.core.markdown.markdown_converter import MarkdownConverter
+
+
+SECTION = """## 第{n}节 操作说明
+
+本节介绍**批量转换**的使用方法，包括*输入目录*、`--option key=value` 参数以及[在线文档](https://example.com/{n})。
+
+- 选择输入文件或目录
+- 设置输出目录，**可选**
+- 点击开始转换
+
+| 参数 | 说明 | 默认值 |
+|---|---|---|
+| -j | 并发数 | CPU核数 |
+| --json | 以JSON格式输出 | 否 |
+
+```python
+for path in files:
+    convert(path, output_dir, options={{"quality": {n}}})
+```
+
+"""
+
+
+def create_handbook(size_mb):
+    """生成指定大小的手册"""
+    sections = []
+    size = 0
+    n = 0
+    while size < size_mb * 1024 * 1024:
+        section = SECTION.format(n=n)
+        sections.append(section)
+        size += len(section.encode("utf-8"))
+        n += 1
+    return "# 用户手册\n\n" + "".join(sections)
+
+
+def legacy_parse(md_content):
+    """旧实现的解析：生成HTML字符串（含codehilite高亮）后用html.parser重新解析"""
+    html = markdown.markdown(
+        md_content,
+        extensions=[
+            "markdown.extensions.tables",
+            "markdown.extensions.fenced_code",
+            "markdown.extensions.codehilite",
+            "markdown.extensions.toc",
+        ],
+    )
+    return BeautifulSoup(html, "html.parser")
+
+
+def bench_table(rows):
+    """单个大表格生成Word表格的耗时"""
+    md_content = "| 编号 | 名称 | 说明 |\n|---|---|---|\n" + "".join(
+        f"| {i} | 项目{i} | description 说明文字 {i} |\n" for i in range(rows)
+    )
+    converter = MarkdownConverter()
+    table = converter._parse_markdown(md_content)[0]
+    doc = Document()
+
+    start = time.perf_counter()
+    converter._process_table(table, doc)
+    print(f"{rows}行表格: {time.perf_counter() - start:.2f}秒")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Markdown转Word性能基准")
+    parser.add_argument("--size-mb", type=float, default=5, help="手册大小（MB）")
+    parser.add_argument("--skip-word", action="store_true", help="只比较解析，不生成Word文档")
+    parser.add_argument("--table-rows", type=int, default=0, help="另外测试单个大表格的行数")
+    args = parser.parse_args()
+
+    if args.table_rows:
+        bench_table(args.table_rows)
+
+    md_content = create_handbook(args.size_mb)
+    converter = MarkdownConverter()
+    print(f"手册大小 {len(md_content.encode('utf-8')) / 1024 / 1024:.1f} MB")
+
+    start = time.perf_counter()
+    legacy_parse(md_content)
+    print(f"旧解析（HTML往返 + codehilite）: {time.perf_counter() - start:.2f}秒")
+
+    start = time.perf_counter()
+    converter._parse_markdown(md_content)
+    print(f"直接使用解析树: {time.perf_counter() - start:.2f}秒")
+
+    if not args.skip_word:
+        output_path = os.path.join(tempfile.mkdtemp(), "handbook.docx")
+        start = time.perf_counter()
+        converter.to_word(md_content, output_path)
+        print(f"完整转换为Word: {time.perf_counter() - start:.2f}秒")
+        os.remove(output_path)
+
+
+if __name__ == "__main__":
+    main()
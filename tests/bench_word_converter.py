@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Word转Markdown性能基准：逐段解析样式的旧方式与预先计算标题级别的两种读取方式对比
+
+用法: python tests/bench_word_converter.py [--paragraphs 100000] [--profile]
+"""
+
+import os
+import sys
+import time
+import shutil
+import zipfile
+import argparse
+import cProfile
+import pstats
+import tempfile
+
+# 将项目根目录加入 Python 路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx import Document
+from src.core.word.word_converter import WordConverter
+
+
+def create_document(path, paragraphs):
+    """直接生成 document.xml，每10段一个标题，比逐段调用python-docx快得多"""
+    template = path + ".template.docx"
+    Document().save(template)
+
+    body = []
+    for i in range(paragraphs):
+        if i % 10 == 0:
+            style = f'<w:pPr><w:pStyle w:val="Heading{i // 10 % 3 + 1}"/></w:pPr>'
+        else:
+            style = ""
+        body.append(f"<w:p>{style}<w:r><w:t>第{i}段 示例文本 sample text</w:t></w:r></w:p>")
+    document_xml = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f'<w:body>{"".join(body)}<w:sectPr/></w:body></w:document>'
+    )
+
+    with zipfile.ZipFile(template) as source, zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as target:
+        for info in source.infolist():
+            data = document_xml.encode("utf-8") if info.filename == "word/document.xml" else source.read(info)
+            target.writestr(info.filename, data)
+    os.remove(template)
+
+
+def legacy_markdown(input_path, output_path):
+    """旧实现的主要开销：每段通过 para.style 解析样式、最多六次前缀比较、逐段执行XPath"""
+    doc = Document(input_path)
+    md_content = []
+    for para in doc.paragraphs:
+        name = para.style.name
+        level = next((n for n in range(1, 7) if name.startswith(f"Heading {n}")), 0)
+        para._element.xpath('.//w:drawing')
+        md_content.append(f"{'#' * level} {para.text}" if level else para.text)
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write("\n\n".join(md_content))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Word转Markdown性能基准")
+    parser.add_argument("--paragraphs", type=int, default=100000, help="段落数")
+    parser.add_argument("--profile", action="store_true", help="输出快速路径的函数耗时")
+    args = parser.parse_args()
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        input_path = os.path.join(temp_dir, "bench.docx")
+        create_document(input_path, args.paragraphs)
+        converter = WordConverter()
+        print(f"{args.paragraphs}段，文件大小 {os.path.getsize(input_path) / 1024:.0f} KB")
+
+        cases = [
+            ("旧实现（逐段解析样式）", lambda out: legacy_markdown(input_path, out)),
+            ("python-docx + 样式映射", lambda out: converter.save_as_markdown(
+                converter.read_word(input_path, fast=False), out)),
+            ("XML流式读取", lambda out: converter.save_as_markdown(converter.read_word(input_path), out)),
+        ]
+        for name, run in cases:
+            start = time.perf_counter()
+            run(os.path.join(temp_dir, "out.md"))
+            elapsed = time.perf_counter() - start
+            print(f"{name}: {elapsed:.2f}秒，每段 {elapsed / args.paragraphs * 1e6:.1f} 微秒")
+
+        if args.profile:
+            profiler = cProfile.Profile()
+            profiler.enable()
+            converter.save_as_markdown(converter.read_word(input_path), os.path.join(temp_dir, "out.md"))
+            profiler.disable()
+            pstats.Stats(profiler).sort_stats("cumulative").print_stats(15)
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+测试批量转换调度器的并发执行、结果顺序和停止
+"""
+
+import os
+import sys
+import tempfile
+
+# 将项目根目录加入 Python 路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx import Document
+from src.core.batch.batch_scheduler import BatchScheduler
+from src.core.text.text_processor import TextProcessor
+from src.core.word.word_converter import WordConverter
+
+
+def _create_text_files(temp_dir, count):
+    jobs = []
+    for i in range(count):
+        input_path = os.path.join(temp_dir, f"input{i}.txt")
+        with open(input_path, "w", encoding="utf-8") as f:
+            f.write(f"文件{i}: 苹果 香蕉")
+        jobs.append((input_path, os.path.join(temp_dir, f"output{i}.txt")))
+    return jobs
+
+
+def test_results_reported_in_file_order():
+    """线程池并发处理，结果按文件顺序回调"""
+    temp_dir = tempfile.mkdtemp()
+    jobs = _create_text_files(temp_dir, 12)
+
+    scheduler = BatchScheduler(
+        TextProcessor(), "text_batch_replace",
+        {"replace_rules": "苹果->apple\n香蕉->banana"}, max_workers=4
+    )
+    results = []
+    progress = []
+    completed = scheduler.run(
+        jobs,
+        lambda index, success, message: results.append((index, success)),
+        lambda current, total: progress.append((current, total))
+    )
+
+    assert completed == 12
+    assert results == [(i, True) for i in range(12)]
+    assert progress[-1] == (12, 12)
+    with open(jobs[5][1], encoding="utf-8") as f:
+        assert f.read() == "文件5: apple banana"
+
+
+def test_process_pool_conversion_and_failure():
+    """进程池处理 Word 转换，失败的文件不影响其他文件"""
+    temp_dir = tempfile.mkdtemp()
+    jobs = []
+    for i in range(3):
+        input_path = os.path.join(temp_dir, f"doc{i}.docx")
+        doc = Document()
+        doc.add_paragraph(f"段落{i}")
+        doc.save(input_path)
+        jobs.append((input_path, os.path.join(temp_dir, f"doc{i}.txt")))
+    jobs.insert(1, (os.path.join(temp_dir, "missing.docx"), os.path.join(temp_dir, "missing.txt")))
+
+    scheduler = BatchScheduler(WordConverter(), "word_to_text", max_workers=2)
+    results = []
+    scheduler.run(jobs, lambda index, success, message: results.append((index, success)))
+
+    assert results == [(0, True), (1, False), (2, True), (3, True)]
+    with open(jobs[3][1], encoding="utf-8") as f:
+        assert f.read() == "段落2"
+
+
+def test_stop_skips_remaining_files():
+    """停止后不再提交新任务，已处理的结果仍按顺序回调"""
+    temp_dir = tempfile.mkdtemp()
+    jobs = _create_text_files(temp_dir, 20)
+    scheduler = BatchScheduler(TextProcessor(), "text_to_markdown", max_workers=2)
+
+    results = []
+
+    def on_result(index, success, message):
+        results.append(index)
+        scheduler.stop()
+
+    completed = scheduler.run(jobs, on_result)
+
+    assert completed < len(jobs)
+    assert results == list(range(len(results)))
+    assert not os.path.exists(jobs[-1][1])
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+测试命令行入口：通配符输入、JSON 输出，且不加载图形界面
+
+测试中的转换都指定缓存目录或不使用缓存，不写入用户目录下的默认缓存
+"""
+
+import os
+import sys
+import json
+import subprocess
+import tempfile
+
+import fitz
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLI_PATH = os.path.join(PROJECT_DIR, "src", "cli.py")
+
+
+def test_convert_with_glob_and_json_output():
+    """通配符匹配的文件全部转换，结果以 JSON 输出"""
+    temp_dir = tempfile.mkdtemp()
+    for name in ("a", "b"):
+        pdf = fitz.open()
+        pdf.new_page().insert_text((72, 72), f"document {name}")
+        pdf.save(os.path.join(temp_dir, f"{name}.pdf"))
+        pdf.close()
+    output_dir = os.path.join(temp_dir, "out")
+
+    completed = subprocess.run(
+        [sys.executable, CLI_PATH, "convert", "pdf_to_text",
+         os.path.join(temp_dir, "*.pdf"), "-o", output_dir, "-j", "2", "--json",
+         "--cache-dir", os.path.join(temp_dir, "cache")],
+        capture_output=True, text=True, encoding="utf-8"
+    )
+
+    assert completed.returncode == 0, completed.stderr
+    report = json.loads(completed.stdout)
+    assert report["succeeded"] == 2
+    assert [os.path.basename(r["output"]) for r in report["results"]] == ["a.txt", "b.txt"]
+    assert os.listdir(os.path.join(temp_dir, "cache"))
+    with open(os.path.join(output_dir, "b.txt"), encoding="utf-8") as f:
+        assert "document b" in f.read()
+
+
+def test_cli_does_not_import_qt():
+    """命令行入口不导入 PyQt6"""
+    temp_dir = tempfile.mkdtemp()
+    input_path = os.path.join(temp_dir, "note.txt")
+    with open(input_path, "w", encoding="utf-8") as f:
+        f.write("<纯文本>")
+
+    code = (
+        "import sys\n"
+        f"sys.path.insert(0, {os.path.join(PROJECT_DIR, 'src')!r})\n"
+        "import cli\n"
+        f"status = cli.main(['convert', 'text_to_html', {input_path!r}, '-o', {temp_dir!r}, '--json', '--no-cache'])\n"
+        "assert status == 0\n"
+        "assert not any(name.startswith('PyQt6') for name in sys.modules)\n"
+    )
+    completed = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+
+    assert completed.returncode == 0, completed.stderr
+    assert os.path.exists(os.path.join(temp_dir, "note.html"))
+
+
+def test_same_name_in_subdirectories():
+    """目录和 ** 通配符输入保持子目录结构，分别指定的同名文件报错"""
+    temp_dir = tempfile.mkdtemp()
+    input_dir = os.path.join(temp_dir, "docs")
+    for name in ("a", "b"):
+        os.makedirs(os.path.join(input_dir, name))
+        with open(os.path.join(input_dir, name, "x.txt"), "w", encoding="utf-8") as f:
+            f.write(f"document {name}")
+
+    def run(inputs, output_dir, *extra):
+        return subprocess.run(
+            [sys.executable, CLI_PATH, "convert", "text_to_html", *inputs,
+             "-o", output_dir, "--json", "--no-cache", *extra],
+            capture_output=True, text=True, encoding="utf-8"
+        )
+
+    for inputs in ([input_dir], [os.path.join(input_dir, "**", "*.txt")]):
+        output_dir = tempfile.mkdtemp()
+        for _ in range(2):
+            completed = run(inputs, output_dir, "--sync")
+            assert completed.returncode == 0, completed.stderr
+        for name in ("a", "b"):
+            with open(os.path.join(output_dir, name, "x.html"), encoding="utf-8") as f:
+                assert f"document {name}" in f.read()
+
+    files = [os.path.join(input_dir, name, "x.txt") for name in ("a", "b")]
+    completed = run(files, os.path.join(temp_dir, "out"))
+    assert completed.returncode == 2
+    assert "输出路径相同" in completed.stderr
+    assert not os.path.exists(os.path.join(temp_dir, "out"))
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+测试 pandas 读取的工作簿直接以 DataFrame 导出 TXT 和 Markdown
+"""
+
+import os
+import sys
+import datetime
+import tempfile
+
+# 将项目根目录加入 Python 路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import openpyxl
+from src.core.excel.excel_converter import ExcelConverter
+from src.core.excel.tabular_workbook import TabularWorkbook
+
+
+def test_pandas_workbook_export():
+    """空值、日期和包含分隔符的文本按原样导出"""
+    temp_dir = tempfile.mkdtemp()
+    input_path = os.path.join(temp_dir, "data.xlsx")
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.title = "明细"
+    sheet.append(["编号", "名称", "日期"])
+    sheet.append([1, "a,b", datetime.datetime(2024, 5, 1)])
+    sheet.append([2, None, datetime.datetime(2024, 5, 2, 8, 30)])
+    workbook.create_sheet("空表")
+    workbook.save(input_path)
+
+    converter = ExcelConverter()
+    tabular = converter._read_with_pandas(input_path)
+    assert isinstance(tabular, TabularWorkbook)
+    assert tabular.sheetnames == ["明细", "空表"]
+
+    txt_path = os.path.join(temp_dir, "data.txt")
+    converter.save_as_txt(tabular, txt_path, delimiter=",")
+    with open(txt_path, encoding="utf-8") as f:
+        assert f.read() == (
+            "# 明细\n\n编号,名称,日期\n1,a,b,2024-05-01 00:00:00\n2,,2024-05-02 08:30:00\n\n\n"
+            "# 空表\n\n\n\n"
+        )
+
+    md_path = os.path.join(temp_dir, "data.md")
+    converter.save_as_markdown(tabular, md_path)
+    with open(os.path.join(temp_dir, "data-明细.md"), encoding="utf-8") as f:
+        assert f.read().splitlines() == [
+            "| 编号 | 名称  | 日期                  | ",
+            "| -- | --- | ------------------- | ",
+            "| 1  | a,b | 2024-05-01 00:00:00 | ",
+            "| 2  |     | 2024-05-02 08:30:00 | ",
+        ]
+    with open(os.path.join(temp_dir, "data-空表.md"), encoding="utf-8") as f:
+        assert f.read() == "*空工作表*\n\n"
+    assert list(tabular["明细"].values)[2] == ("2", "", "2024-05-02 08:30:00")
@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+测试多工作表并行导出 Markdown 与单进程结果一致
+"""
+
+import os
+import sys
+import tempfile
+
+# 将项目根目录加入 Python 路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import openpyxl
+from src.core.excel import excel_converter
+from src.core.excel.excel_converter import ExcelConverter
+
+
+def _export(converter, input_path, output_dir, max_workers):
+    os.makedirs(output_dir)
+    progress = []
+    workbook = converter.read_excel(input_path)
+    try:
+        converter.save_as_markdown(
+            workbook, os.path.join(output_dir, "book.md"), progress.append, max_workers=max_workers
+        )
+    finally:
+        workbook.close()
+    return progress
+
+
+def test_parallel_sheets_match_serial():
+    """每个进程读取自己的工作表，输出文件与单进程逐字节相同"""
+    temp_dir = tempfile.mkdtemp()
+    input_path = os.path.join(temp_dir, "book.xlsx")
+    workbook = openpyxl.Workbook(write_only=True)
+    for k in range(4):
+        sheet = workbook.create_sheet(f"表{k}")
+        sheet.append(["序号", "内容"])
+        for i in range(50):
+            sheet.append([i, "值" * (i % 5 + k)])
+    workbook.create_sheet("空表")
+    workbook.save(input_path)
+
+    converter = ExcelConverter()
+    original_min_size = excel_converter.PARALLEL_MIN_FILE_SIZE
+    excel_converter.PARALLEL_MIN_FILE_SIZE = 0
+    try:
+        serial_progress = _export(converter, input_path, os.path.join(temp_dir, "serial"), 1)
+        parallel_progress = _export(converter, input_path, os.path.join(temp_dir, "parallel"), 2)
+    finally:
+        excel_converter.PARALLEL_MIN_FILE_SIZE = original_min_size
+
+    names = sorted(os.listdir(os.path.join(temp_dir, "serial")))
+    assert names == sorted(os.listdir(os.path.join(temp_dir, "parallel")))
+    assert len(names) == 5
+    for name in names:
+        with open(os.path.join(temp_dir, "serial", name), "rb") as f:
+            serial_bytes = f.read()
+        with open(os.path.join(temp_dir, "parallel", name), "rb") as f:
+            assert f.read() == serial_bytes
+    assert serial_progress == parallel_progress == [20, 40, 60, 80, 100]
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+测试 Excel 以只读模式流式导出 TXT 和 Markdown
+"""
+
+import os
+import re
+import sys
+import tempfile
+import tracemalloc
+import zipfile
+
+# 将项目根目录加入 Python 路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import openpyxl
+from src.core.excel.excel_converter import ExcelConverter
+
+
+def _create_workbook(path, row_count):
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet("数据")
+    sheet.append(["编号", "名称", "金额"])
+    for i in range(row_count):
+        sheet.append([i, f"项目{i}", i * 1.5 if i % 3 else None])
+    workbook.save(path)
+
+
+def test_markdown_columns_aligned():
+    """两遍读取时列宽按整个工作表计算"""
+    temp_dir = tempfile.mkdtemp()
+    input_path = os.path.join(temp_dir, "small.xlsx")
+    output_path = os.path.join(temp_dir, "small.md")
+    _create_workbook(input_path, 12)
+
+    converter = ExcelConverter()
+    workbook = converter.read_excel(input_path)
+    try:
+        assert getattr(workbook, "read_only", False)
+        converter.save_as_markdown(workbook, output_path)
+    finally:
+        workbook.close()
+
+    with open(output_path, encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    assert lines[0] == "| 编号 | 名称   | 金额   | "
+    assert lines[1] == "| -- | ---- | ---- | "
+    assert lines[3] == "| 1  | 项目1  | 1.5  | "
+    assert lines[-1] == "| 11 | 项目11 | 16.5 | "
+
+
+def test_large_sheet_memory_stays_flat():
+    """大表导出时不在内存中保留全部行"""
+    temp_dir = tempfile.mkdtemp()
+    input_path = os.path.join(temp_dir, "large.xlsx")
+    _create_workbook(input_path, 8000)
+
+    converter = ExcelConverter()
+    workbook = converter.read_excel(input_path)
+    try:
+        tracemalloc.start()
+        converter.save_as_txt(workbook, os.path.join(temp_dir, "large.txt"), delimiter=",")
+        converter.save_as_markdown(workbook, os.path.join(temp_dir, "large.md"))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        workbook.close()
+
+    assert peak < 2 * 1024 * 1024
+    with open(os.path.join(temp_dir, "large.txt"), encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    assert lines[:3] == ["# 数据", "", "编号,名称,金额"]
+    assert lines[-3] == "7999,项目7999,11998.5"
+
+
+def test_stale_dimension_ignored():
+    """只读模式不按文件中过期的 <dimension> 读取，各行补齐到相同列数"""
+    temp_dir = tempfile.mkdtemp()
+    source_path = os.path.join(temp_dir, "source.xlsx")
+    input_path = os.path.join(temp_dir, "stale.xlsx")
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.title = "数据"
+    sheet.append(["编号", "名称", "金额"])
+    sheet.append([1])
+    sheet.append([2, "b", 3])
+    workbook.save(source_path)
+
+    # 将工作表中记录的尺寸改为只有A1
+    with zipfile.ZipFile(source_path) as src, zipfile.ZipFile(input_path, "w") as dst:
+        for item in src.infolist():
+            data = src.read(item.filename)
+            if item.filename == "xl/worksheets/sheet1.xml":
+                data, count = re.subn(rb'<dimension ref="[^"]*"', b'<dimension ref="A1"', data)
+                assert count == 1
+            dst.writestr(item, data)
+
+    converter = ExcelConverter()
+    workbook = converter.read_excel(input_path)
+    try:
+        assert getattr(workbook, "read_only", False)
+        converter.save_as_txt(workbook, os.path.join(temp_dir, "stale.txt"), delimiter=",")
+        converter.save_as_markdown(workbook, os.path.join(temp_dir, "stale.md"))
+    finally:
+        workbook.close()
+
+    with open(os.path.join(temp_dir, "stale.txt"), encoding="utf-8") as f:
+        assert f.read().splitlines()[2:5] == ["编号,名称,金额", "1,,", "2,b,3"]
+    with open(os.path.join(temp_dir, "stale.md"), encoding="utf-8") as f:
+        assert f.read().splitlines() == [
+            "| 编号 | 名称 | 金额 | ",
+            "| -- | -- | -- | ",
+            "| 1  |    |    | ",
+            "| 2  | b  | 3  | ",
+        ]
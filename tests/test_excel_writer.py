@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+测试只写模式的Excel写入器，以及xlrd读取的工作簿以DataFrame导出
+"""
+
+import os
+import sys
+import types
+import tempfile
+import tracemalloc
+from unittest import mock
+
+# 将项目根目录加入 Python 路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import openpyxl
+from src.core.excel.excel_converter import ExcelConverter
+from src.core.excel.excel_writer import ExcelWriter
+from src.core.excel.tabular_workbook import TabularWorkbook
+
+
+def test_rows_and_column_widths():
+    """按行写入的内容和列宽在保存后保持不变"""
+    output_path = os.path.join(tempfile.mkdtemp(), "output.xlsx")
+    with ExcelWriter(output_path) as writer:
+        sheet = writer.add_sheet("数据", column_widths=[8, None, 30])
+        sheet.append(["编号", "名称", "说明"])
+        sheet.append([1, None, "第一行"])
+        writer.add_sheet("空表")
+        writer.save()
+
+    workbook = openpyxl.load_workbook(output_path)
+    assert workbook.sheetnames == ["数据", "空表"]
+    sheet = workbook["数据"]
+    assert list(sheet.iter_rows(values_only=True)) == [("编号", "名称", "说明"), (1, None, "第一行")]
+    assert sheet.column_dimensions["A"].width == 8
+    assert sheet.column_dimensions["C"].width == 30
+
+
+def test_close_removes_temp_dir():
+    """保存后或未保存就关闭时都删除临时目录，未保存时不生成输出文件"""
+    temp_dir = tempfile.mkdtemp()
+    saved_path = os.path.join(temp_dir, "saved.xlsx")
+    with ExcelWriter(saved_path) as writer:
+        writer.add_sheet("数据").append(["a", "b"])
+        writer.save()
+    assert os.path.exists(saved_path)
+    assert not os.path.exists(writer.temp_dir)
+
+    unsaved_path = os.path.join(temp_dir, "unsaved.xlsx")
+    try:
+        with ExcelWriter(unsaved_path) as writer:
+            writer.add_sheet("数据").append(["a", "b"])
+            assert os.listdir(writer.temp_dir)
+            raise ValueError("转换出错")
+    except ValueError:
+        pass
+    assert not os.path.exists(writer.temp_dir)
+    assert not os.path.exists(unsaved_path)
+
+
+def test_large_sheet_memory_stays_flat():
+    """写入大量行时不在内存中保留单元格"""
+    output_path = os.path.join(tempfile.mkdtemp(), "large.xlsx")
+    tracemalloc.start()
+    with ExcelWriter(output_path) as writer:
+        sheet = writer.add_sheet("数据")
+        for i in range(5000):
+            sheet.append([i, f"项目{i}", i * 1.5])
+        writer.save()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert peak < 2 * 1024 * 1024
+    workbook = openpyxl.load_workbook(output_path, read_only=True)
+    try:
+        assert sum(1 for _ in workbook["数据"].iter_rows(values_only=True)) == 5000
+    finally:
+        workbook.close()
+
+
+class _FakeXlsSheet:
+    def __init__(self, rows):
+        self.rows = rows
+        self.nrows = len(rows)
+        self.ncols = max((len(row) for row in rows), default=0)
+
+    def cell_value(self, row_idx, col_idx):
+        value = self.rows[row_idx][col_idx]
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+
+class _FakeXlsBook:
+    def __init__(self, sheets):
+        self.sheets = sheets
+
+    def sheet_names(self):
+        return list(self.sheets)
+
+    def sheet_by_name(self, name):
+        return self.sheets[name]
+
+
+def test_xlrd_workbook_export():
+    """xlrd读取的数据第一行作为表头，空值和读取失败的单元格按原样导出"""
+    book = _FakeXlsBook({
+        "数据": _FakeXlsSheet([["编号", "名称"], [1.0, ""], [ValueError("bad"), "a,b"]]),
+        "空表": _FakeXlsSheet([]),
+    })
+    fake_xlrd = types.SimpleNamespace(open_workbook=lambda path: book)
+    temp_dir = tempfile.mkdtemp()
+
+    converter = ExcelConverter()
+    with mock.patch.dict(sys.modules, {"xlrd": fake_xlrd}):
+        workbook = converter._read_with_xlrd(os.path.join(temp_dir, "data.xls"))
+    assert isinstance(workbook, TabularWorkbook)
+    assert workbook.sheetnames == ["数据", "空表"]
+    assert list(workbook["数据"].values) == [("编号", "名称"), ("1.0", ""), ("[转换错误]", "a,b")]
+
+    txt_path = os.path.join(temp_dir, "data.txt")
+    converter.save_as_txt(workbook, txt_path, delimiter=",")
+    with open(txt_path, encoding="utf-8") as f:
+        assert f.read() == "# 数据\n\n编号,名称\n1.0,\n[转换错误],a,b\n\n\n# 空表\n\n\n\n"
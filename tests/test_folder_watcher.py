@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+测试监控目录：文件写完后自动转换，写入中的文件不会被提前转换
+"""
+
+import os
+import sys
+import time
+import queue
+import tempfile
+import threading
+
+# 将项目根目录加入 Python 路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.batch.folder_watcher import FolderWatcher, InotifyWatcher, PollingWatcher, create_watcher
+from src.core.text.text_processor import TextProcessor
+
+
+def _start_watcher(input_dir, output_dir, polling):
+    watcher = FolderWatcher(TextProcessor(), "text_to_html", [input_dir], output_dir, max_workers=2,
+                            polling=polling)
+    results = queue.Queue()
+    ready = threading.Event()
+    thread = threading.Thread(
+        target=watcher.run,
+        kwargs={"result_callback": lambda *result: results.put(result), "ready_callback": ready.set},
+        daemon=True
+    )
+    thread.start()
+    assert ready.wait(5)
+    return watcher, thread, results
+
+
+def _check_watch(polling):
+    temp_dir = tempfile.mkdtemp()
+    input_dir = os.path.join(temp_dir, "inbox")
+    output_dir = os.path.join(temp_dir, "out")
+    os.makedirs(input_dir)
+
+    # 开始监控前已存在的文件不处理
+    with open(os.path.join(input_dir, "old.txt"), "w", encoding="utf-8") as f:
+        f.write("old")
+
+    watcher, thread, results = _start_watcher(input_dir, output_dir, polling)
+    try:
+        # 分两次写入，inotify模式下写入过程中暂停也不会被提前转换
+        with open(os.path.join(input_dir, "new.txt"), "w", encoding="utf-8") as f:
+            f.write("first part ")
+            if not polling:
+                f.flush()
+                time.sleep(1.2)
+                assert results.empty()
+            f.write("second part")
+        closed_at = time.monotonic()
+
+        input_path, output_path, success, _ = results.get(timeout=5)
+        if not polling:
+            # 文件关闭后一秒内开始转换
+            assert time.monotonic() - closed_at < 1.0
+        assert success
+        assert input_path == os.path.join(input_dir, "new.txt")
+        with open(output_path, encoding="utf-8") as f:
+            assert "first part second part" in f.read()
+
+        # 新建的子目录同样被监控，输出保持子目录结构
+        os.makedirs(os.path.join(input_dir, "sub"))
+        time.sleep(0.2)
+        with open(os.path.join(input_dir, "sub", "nested.txt"), "w", encoding="utf-8") as f:
+            f.write("nested")
+        _, output_path, success, _ = results.get(timeout=5)
+        assert success
+        assert output_path == os.path.join(output_dir, "sub", "nested.html")
+
+        time.sleep(0.6)
+        assert results.empty()
+    finally:
+        watcher.stop()
+        thread.join(5)
+
+    assert not thread.is_alive()
+    assert not os.path.exists(os.path.join(output_dir, "old.html"))
+
+
+def test_watch_with_polling():
+    """轮询模式下转换新文件"""
+    _check_watch(polling=True)
+
+
+def test_watch_with_inotify():
+    """Linux上使用inotify，文件关闭后立即转换"""
+    watcher = create_watcher([tempfile.mkdtemp()], [".txt"])
+    watcher.close()
+    if sys.platform.startswith("linux"):
+        assert isinstance(watcher, InotifyWatcher)
+    else:
+        assert isinstance(watcher, PollingWatcher)
+        return
+    _check_watch(polling=False)
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+测试图片批量处理的多进程模式和 JPEG 降采样解码
+"""
+
+import os
+import sys
+import tempfile
+
+# 将项目根目录加入 Python 路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageChops, ImageStat
+from src.core.image import image_processor
+from src.core.image.image_processor import ImageProcessor
+
+
+def _create_jpeg(path, size):
+    image = Image.linear_gradient("L").resize(size).convert("RGB")
+    image = Image.merge("RGB", (image.getchannel(0), image.rotate(90).getchannel(0), image.getchannel(0)))
+    image.save(path, quality=90)
+
+
+def test_draft_resize_matches_full_decode():
+    """降采样解码后缩小的结果与完整解码的差异在容差内"""
+    temp_dir = tempfile.mkdtemp()
+    input_path = os.path.join(temp_dir, "photo.jpg")
+    _create_jpeg(input_path, (1600, 1200))
+
+    processor = ImageProcessor()
+    draft_path = os.path.join(temp_dir, "draft.jpg")
+    full_path = os.path.join(temp_dir, "full.jpg")
+    processor.resize_image(input_path, draft_path, 200, 0)
+
+    original_scale = image_processor.DRAFT_SCALE
+    image_processor.DRAFT_SCALE = 10 ** 6
+    try:
+        processor.resize_image(input_path, full_path, 200, 0)
+    finally:
+        image_processor.DRAFT_SCALE = original_scale
+
+    with Image.open(draft_path) as draft, Image.open(full_path) as full:
+        assert draft.size == full.size == (200, 150)
+        difference = ImageStat.Stat(ImageChops.difference(draft, full)).mean
+    assert max(difference) < 2
+
+
+def test_parallel_batch_keeps_input_order():
+    """进程池处理的结果按输入顺序返回，失败的文件单独记录"""
+    temp_dir = tempfile.mkdtemp()
+    input_files = []
+    for i in range(10):
+        path = os.path.join(temp_dir, f"img{i}.jpg")
+        _create_jpeg(path, (64 + i, 48))
+        input_files.append(path)
+    input_files.insert(3, os.path.join(temp_dir, "missing.jpg"))
+
+    processor = ImageProcessor()
+    progress = []
+    results = processor.batch_convert_format(
+        input_files, os.path.join(temp_dir, "out"), "png", progress.append, max_workers=2
+    )
+
+    assert [result[0] for result in results] == input_files
+    assert [result[2] for result in results] == [i != 3 for i in range(11)]
+    with Image.open(results[10][1]) as image:
+        assert image.format == "PNG" and image.size == (73, 48)
+    assert progress[-1] == 100
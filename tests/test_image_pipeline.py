@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+测试图片组合处理：一次解码、依次执行操作、最后只保存一次
+"""
+
+import os
+import sys
+import tempfile
+from unittest import mock
+
+# 将项目根目录加入 Python 路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+from src.core.image.image_processor import ImageProcessor
+from src.core.image.pipeline_presets import get_preset_operations
+from src.core.batch.batch_scheduler import get_output_path, run_conversion
+
+
+def _create_jpeg_with_exif(path, size):
+    image = Image.linear_gradient("L").resize(size).convert("RGB")
+    exif = Image.Exif()
+    exif[0x010F] = "TestCamera"  # Make
+    image.save(path, quality=95, exif=exif)
+
+
+def test_pipeline_decodes_once_and_saves_once():
+    """缩小、转格式、压缩、去除元数据只打开和保存一次"""
+    temp_dir = tempfile.mkdtemp()
+    input_path = os.path.join(temp_dir, "photo.jpg")
+    output_path = os.path.join(temp_dir, "out", "photo.webp")
+    _create_jpeg_with_exif(input_path, (2400, 1200))
+
+    operations = [
+        {"type": "resize", "width": 600, "height": 600, "keep_aspect_ratio": True},
+        {"type": "format", "format": "webp"},
+        {"type": "quality", "quality": 70},
+        {"type": "strip_metadata"},
+    ]
+
+    with mock.patch.object(Image, "open", wraps=Image.open) as open_spy, \
+            mock.patch.object(Image.Image, "save", autospec=True, side_effect=Image.Image.save) as save_spy:
+        original_size, output_size = ImageProcessor().process_pipeline(input_path, output_path, operations)
+
+    assert open_spy.call_count == 1
+    assert save_spy.call_count == 1
+    assert original_size == os.path.getsize(input_path)
+    assert output_size == os.path.getsize(output_path)
+
+    with Image.open(output_path) as result:
+        assert result.format == "WEBP"
+        assert result.size == (600, 300)
+        assert not result.getexif()
+
+
+def test_pipeline_keeps_metadata_and_only_shrinks():
+    """未去除元数据时保留 EXIF，only_shrink 不放大小图"""
+    temp_dir = tempfile.mkdtemp()
+    input_path = os.path.join(temp_dir, "small.jpg")
+    output_path = os.path.join(temp_dir, "small_out.jpg")
+    _create_jpeg_with_exif(input_path, (200, 100))
+
+    operations = [{"type": "resize", "width": 1600, "height": 1600, "only_shrink": True}]
+    ImageProcessor().process_pipeline(input_path, output_path, operations)
+
+    with Image.open(output_path) as result:
+        assert result.size == (200, 100)
+        assert result.getexif()[0x010F] == "TestCamera"
+
+
+def test_pipeline_preset_in_batch_scheduler():
+    """批量调度按预设确定输出扩展名，透明 PNG 转为 JPG 时去除透明通道"""
+    temp_dir = tempfile.mkdtemp()
+    input_path = os.path.join(temp_dir, "icon.png")
+    Image.new("RGBA", (800, 400), (255, 0, 0, 128)).save(input_path)
+
+    options = {"preset": "thumbnail"}
+    output_path = get_output_path(input_path, temp_dir, "image_pipeline", options)
+    assert output_path.endswith("icon.jpg")
+
+    assert run_conversion(ImageProcessor(), "image_pipeline", input_path, output_path, options)
+    with Image.open(output_path) as result:
+        assert result.format == "JPEG"
+        assert result.mode == "RGB"
+        assert max(result.size) == 320
+
+    assert get_preset_operations("web")[-1]["type"] == "strip_metadata"
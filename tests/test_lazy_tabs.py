@@ -0,0 +1,39 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+测试主窗口延迟创建标签页，启动时不加载转换依赖库
+"""
+
+import os
+import sys
+import subprocess
+import tempfile
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_tabs_created_on_first_use():
+    """只创建当前标签页，打开PDF文件时才加载PyMuPDF"""
+    code = (
+        "import sys\n"
+        f"sys.path.insert(0, {os.path.join(PROJECT_DIR, 'src')!r})\n"
+        "from PyQt6.QtWidgets import QApplication\n"
+        "app = QApplication([])\n"
+        "from ui.main_window import MainWindow\n"
+        "from utils.config import Config\n"
+        "window = MainWindow(Config())\n"
+        "heavy = ('fitz', 'docx', 'pandas', 'openpyxl', 'markdown', 'bs4', 'PIL')\n"
+        "assert not [name for name in heavy if name in sys.modules], sys.modules.keys()\n"
+        "assert window.word_tab is not None and window.pdf_tab is None\n"
+        "window.process_file('report.pdf')\n"
+        "assert window.pdf_tab is not None and window.tabs.currentIndex() == 3\n"
+        "assert 'fitz' not in sys.modules\n"
+        "window.pdf_tab.converter\n"
+        "assert 'fitz' in sys.modules\n"
+    )
+    # 配置和日志写入临时的用户目录，不影响真实的 ~/.file-converter
+    home_dir = tempfile.mkdtemp()
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen", HOME=home_dir, USERPROFILE=home_dir)
+    completed = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env)
+
+    assert completed.returncode == 0, completed.stderr
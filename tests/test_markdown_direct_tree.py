@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+测试Markdown直接由解析树生成Word，不经过HTML序列化和重新解析
+"""
+
+import os
+import sys
+import tempfile
+from unittest import mock
+
+# 将项目根目录加入 Python 路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import markdown
+from docx import Document
+from src.core.markdown.markdown_converter import MarkdownConverter
+
+
+MD_CONTENT = """# 标题 & 说明
+
+正文 `a < b && c` 与 <b>原始粗体</b> &copy; 2025
+
+```python
+if a < b and c & d:
+    print("<ok>")
+```
+
+<p>原始 <i>HTML</i> 段落</p>
+
+- 列表 **粗体**
+"""
+
+
+def _convert(md_content):
+    output_path = os.path.join(tempfile.mkdtemp(), "output.docx")
+    progress = []
+    with mock.patch.object(markdown.Markdown, "convert", side_effect=AssertionError("不应序列化为HTML")):
+        assert MarkdownConverter().to_word(md_content, output_path, progress_callback=progress.append)
+    assert progress[-1] == 100
+    return Document(output_path)
+
+
+def test_text_escaping_and_raw_html():
+    """代码中的特殊字符、字符实体和行内原始HTML与浏览器显示一致"""
+    doc = _convert(MD_CONTENT)
+    paragraphs = [p for p in doc.paragraphs if p.text.strip()]
+
+    assert paragraphs[0].style.name == "Heading 1"
+    assert paragraphs[0].text == "标题 & 说明"
+
+    body = paragraphs[1]
+    assert body.text == "正文 a < b && c 与 原始粗体 © 2025"
+    assert [run.text for run in body.runs if run.font.name == "Courier New"] == ["a < b && c"]
+    assert [run.text for run in body.runs if run.bold] == ["原始粗体"]
+
+    assert paragraphs[3].text == "原始 HTML 段落"
+    assert [run.text for run in paragraphs[3].runs if run.italic] == ["HTML"]
+
+    assert paragraphs[4].style.name == "List Bullet"
+    assert paragraphs[4].text == "列表 粗体"
+
+
+def test_code_block_kept_without_highlighting():
+    """围栏代码块原样输出为等宽字体段落"""
+    doc = _convert(MD_CONTENT)
+    code = [p for p in doc.paragraphs if p.runs and p.runs[0].font.name == "Courier New"]
+    assert len(code) == 1
+    assert code[0].text == 'if a < b and c & d:\n    print("<ok>")\n'
+
+
+def test_empty_markdown():
+    """空内容生成空文档"""
+    doc = _convert("  \n")
+    assert not [p for p in doc.paragraphs if p.text.strip()]
+
+
+def test_block_html_inside_paragraph():
+    """段落中的块级HTML不会拆分段落，内容和前后文本都保留"""
+    cases = {
+        "text <div>block</div> more": "text block more",
+        "para <p>x</p> tail": "para x tail",
+        "see <table><tr><td>c</td></tr></table> after": "see c after",
+        "a <ul><li>x</li></ul> b": "a x b",
+        "# h <div>x</div> y": "h x y",
+    }
+    for md_content, expected in cases.items():
+        doc = _convert(md_content)
+        assert [p.text for p in doc.paragraphs if p.text.strip()] == [expected]
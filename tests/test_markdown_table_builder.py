@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+测试Markdown表格一次生成XML：内容、表头粗体、列宽与逐个单元格设置时一致
+"""
+
+import os
+import sys
+import tempfile
+
+# 将项目根目录加入 Python 路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx import Document
+from docx.oxml.ns import qn
+from src.core.markdown.markdown_converter import MarkdownConverter, run_content_xml, text_width
+
+
+def _convert(md_content):
+    output_path = os.path.join(tempfile.mkdtemp(), "output.docx")
+    MarkdownConverter().to_word(md_content, output_path)
+    return Document(output_path)
+
+
+def test_text_width_and_run_content():
+    """非ASCII字符按1.5个字符计；制表符、换行和首尾空白与python-docx一致"""
+    assert text_width("abc") == 3
+    assert text_width("中文ab") == 5
+    assert run_content_xml("a\tb\nc") == "<w:t>a</w:t><w:tab/><w:t>b</w:t><w:br/><w:t>c</w:t>"
+    assert run_content_xml(" x & <y>") == '<w:t xml:space="preserve"> x &amp; &lt;y&gt;</w:t>'
+    assert run_content_xml("") == ""
+
+
+def test_table_content_header_and_widths():
+    """表格内容、表头粗体、单元格auto宽度和按内容分配的列宽"""
+    doc = _convert("""| 标题 | 年龄 | 详细描述 |
+| --- | --- | --- |
+| 张三 | 30 | 这是一个非常长的描述，用于测试列宽自适应功能是否生效 |
+| 李四 | | `a & b` |
+""")
+    table = doc.tables[0]
+    assert table.style.name == "Table Grid"
+    assert [[cell.text for cell in row.cells] for row in table.rows] == [
+        ["标题", "年龄", "详细描述"],
+        ["张三", "30", "这是一个非常长的描述，用于测试列宽自适应功能是否生效"],
+        ["李四", "", "a & b"],
+    ]
+    assert all(run.bold for cell in table.rows[0].cells for run in cell.paragraphs[0].runs)
+    assert not any(run.bold for cell in table.rows[1].cells for run in cell.paragraphs[0].runs)
+
+    tbl = table._tbl
+    assert {tcw.get(qn("w:type")) for tcw in tbl.iter(qn("w:tcW"))} == {"auto"}
+    widths = [int(col.get(qn("w:w"))) for col in tbl.iter(qn("w:gridCol"))]
+    # 内容较少的列保持最小宽度0.5英寸
+    assert widths[2] > widths[0] >= widths[1] == 720
+
+
+def test_large_table():
+    """大表格一次生成，行数较多时也很快完成"""
+    rows = "".join(f"| {i} | 项目{i} |\n" for i in range(5000))
+    doc = _convert("| 编号 | 名称 |\n|---|---|\n" + rows)
+    table = doc.tables[0]
+    assert len(table.rows) == 5001
+    assert table.cell(5000, 1).text == "项目4999"
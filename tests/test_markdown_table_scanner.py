@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+测试Markdown表格逐行扫描和提取到Excel
+"""
+
+import io
+import os
+import sys
+import tempfile
+
+# 将项目根目录加入 Python 路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import openpyxl
+from src.core.markdown.markdown_converter import MarkdownConverter
+from src.core.markdown.table_scanner import iter_markdown_tables, split_table_row
+
+
+def test_split_table_row():
+    """转义竖线和行内代码中的竖线不分隔单元格，首尾竖线可以省略"""
+    assert split_table_row("| a | b |") == ["a", "b"]
+    assert split_table_row("a | b") == ["a", "b"]
+    assert split_table_row(r"| a \| b | c |") == ["a | b", "c"]
+    assert split_table_row("| `x | y` | z |") == ["`x | y`", "z"]
+    assert split_table_row("| ``a ` | b`` | c |") == ["``a ` | b``", "c"]
+    # 未闭合的反引号按普通字符处理
+    assert split_table_row("| `a | b |") == ["`a", "b"]
+
+
+def test_iter_markdown_tables():
+    """对齐行确定表格开始，空行结束；代码块中和没有数据行的表格不提取"""
+    md_content = """# 文档
+
+| 名称 | 说明 |
+|:---|---:|
+| a | 1 |
+| b | 2 |
+段落之后的表格结束前没有空行
+
+```
+| 代码 | 块 |
+| --- | --- |
+| x | y |
+```
+
+| 只有表头 |
+| --- |
+
+标题 | 数量
+--- | ---
+c | 3
+"""
+    tables = list(iter_markdown_tables(io.StringIO(md_content)))
+    assert tables == [
+        [["名称", "说明"], ["a", "1"], ["b", "2"]],
+        [["标题", "数量"], ["c", "3"]],
+    ]
+
+
+def test_extract_tables_to_excel():
+    """相同表头的表格合并到一个工作表，其余表格依次写入另一个工作表"""
+    md_content = """| 名称 | 说明 |
+| --- | --- |
+| a \\| b | `x | y` |
+
+| 名称 | 说明 |
+| --- | --- |
+| c | d | 多余 |
+
+| 其他 |
+| --- |
+| e |
+
+| 第三 |
+| --- |
+| f |
+"""
+    output_path = os.path.join(tempfile.mkdtemp(), "tables.xlsx")
+    progress = []
+    assert MarkdownConverter().extract_tables_to_excel(md_content, output_path, progress.append)
+    assert progress[-1] == 100
+
+    workbook = openpyxl.load_workbook(output_path)
+    assert workbook.sheetnames == ["相同表头表格", "不同表头表格"]
+    assert list(workbook["相同表头表格"].iter_rows(values_only=True)) == [
+        ("名称", "说明"), ("a | b", "`x | y`"), ("c", "d"),
+    ]
+    assert list(workbook["不同表头表格"].iter_rows(values_only=True)) == [
+        ("其他",), ("e",), (None,), (None,), ("第三",), ("f",),
+    ]
+
+
+def test_extract_without_tables():
+    """没有表格时报错"""
+    output_path = os.path.join(tempfile.mkdtemp(), "tables.xlsx")
+    try:
+        MarkdownConverter().extract_tables_to_excel("# 标题\n\n正文", output_path)
+    except Exception as e:
+        assert "未找到表格数据" in str(e)
+    else:
+        assert False, "应当报错"
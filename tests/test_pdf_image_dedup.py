@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+测试 PDF 图片提取时重复图片只写入一次
+"""
+
+import io
+import os
+import sys
+import tempfile
+
+# 将项目根目录加入 Python 路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fitz
+from docx import Document
+from PIL import Image
+from src.core.pdf.pdf_converter import PDFConverter
+from src.core.pdf.image_cache import PDFImageCache
+
+
+def _png_bytes(color):
+    buffer = io.BytesIO()
+    Image.new("RGB", (32, 32), color).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _create_pdf_with_logo(path, page_count, logo):
+    """生成每页都带有同一张标志图片的测试 PDF"""
+    pdf = fitz.open()
+    xref = 0
+    for _ in range(page_count):
+        page = pdf.new_page()
+        if xref:
+            xref = page.insert_image(fitz.Rect(10, 10, 42, 42), xref=xref)
+        else:
+            xref = page.insert_image(fitz.Rect(10, 10, 42, 42), stream=logo)
+    pdf.save(path)
+    pdf.close()
+
+
+def test_extract_images_dedup_across_pages_and_documents():
+    """重复图片以硬链接写出，并统计节省的字节数"""
+    temp_dir = tempfile.mkdtemp()
+    logo = _png_bytes((200, 30, 30))
+    first_pdf = os.path.join(temp_dir, "first.pdf")
+    second_pdf = os.path.join(temp_dir, "second.pdf")
+    _create_pdf_with_logo(first_pdf, 4, logo)
+    _create_pdf_with_logo(second_pdf, 2, logo)
+
+    converter = PDFConverter()
+    cache = PDFImageCache()
+    for name in ("first", "second"):
+        pdf = converter.read_pdf(os.path.join(temp_dir, f"{name}.pdf"))
+        try:
+            count = converter.extract_images(pdf, os.path.join(temp_dir, name), image_cache=cache)
+        finally:
+            pdf.close()
+        assert count == len(os.listdir(os.path.join(temp_dir, name)))
+
+    assert cache.unique_images == 1
+    assert cache.duplicate_images == 5
+
+    first_image = os.path.join(temp_dir, "first", "page1_img1.png")
+    second_image = os.path.join(temp_dir, "second", "page2_img1.png")
+    with open(first_image, "rb") as f:
+        first_bytes = f.read()
+    with open(second_image, "rb") as f:
+        assert f.read() == first_bytes
+
+    if os.stat(first_image).st_nlink > 1:
+        assert cache.bytes_saved == 5 * len(first_bytes)
+    assert "重复图片5张" in cache.summary()
+
+
+def test_to_word_reuses_image_part():
+    """Word 中重复图片引用同一个图片部件"""
+    temp_dir = tempfile.mkdtemp()
+    pdf_path = os.path.join(temp_dir, "logo.pdf")
+    output_path = os.path.join(temp_dir, "logo.docx")
+    _create_pdf_with_logo(pdf_path, 3, _png_bytes((20, 120, 200)))
+
+    converter = PDFConverter()
+    cache = PDFImageCache()
+    pdf = converter.read_pdf(pdf_path)
+    try:
+        converter.to_word(pdf, output_path, image_cache=cache)
+    finally:
+        pdf.close()
+
+    doc = Document(output_path)
+    assert len(doc.inline_shapes) == 3
+    image_parts = [part for part in doc.part.package.iter_parts()
+                   if part.partname.startswith("/word/media/")]
+    assert len(image_parts) == 1
+    assert cache.unique_images == 1
+    assert cache.duplicate_images == 2
+
+
+def test_rerun_does_not_overwrite_linked_images():
+    """再次提取到同一目录时，不改写上次运行中与之硬链接的其他图片"""
+    temp_dir = tempfile.mkdtemp()
+    output_dir = os.path.join(temp_dir, "images")
+    first_pdf = os.path.join(temp_dir, "first.pdf")
+    second_pdf = os.path.join(temp_dir, "second.pdf")
+    _create_pdf_with_logo(first_pdf, 3, _png_bytes((200, 30, 30)))
+    _create_pdf_with_logo(second_pdf, 1, _png_bytes((30, 200, 30)))
+
+    converter = PDFConverter()
+    for pdf_path in (first_pdf, second_pdf):
+        pdf = converter.read_pdf(pdf_path)
+        try:
+            converter.extract_images(pdf, output_dir, image_cache=PDFImageCache())
+        finally:
+            pdf.close()
+        if pdf_path == first_pdf:
+            with open(os.path.join(output_dir, "page2_img1.png"), "rb") as f:
+                first_bytes = f.read()
+
+    with open(os.path.join(output_dir, "page1_img1.png"), "rb") as f:
+        assert f.read() != first_bytes
+    for name in ("page2_img1.png", "page3_img1.png"):
+        with open(os.path.join(output_dir, name), "rb") as f:
+            assert f.read() == first_bytes
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+测试 PDF 转文本的多进程模式与单进程输出一致
+"""
+
+import os
+import sys
+import tempfile
+
+# 将项目根目录加入 Python 路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fitz
+from src.core.pdf.pdf_converter import PDFConverter, PARALLEL_MIN_PAGES
+
+
+def _create_pdf(path, page_count):
+    """生成每页带有页码文本的测试 PDF"""
+    pdf = fitz.open()
+    for i in range(page_count):
+        page = pdf.new_page()
+        page.insert_text((72, 72), f"Page {i + 1} content")
+    pdf.save(path)
+    pdf.close()
+
+
+def test_parallel_text_matches_serial():
+    """多进程提取的文本按页序拼接，与单进程结果逐字节一致"""
+    temp_dir = tempfile.mkdtemp()
+    pdf_path = os.path.join(temp_dir, "sample.pdf")
+    serial_path = os.path.join(temp_dir, "serial.txt")
+    parallel_path = os.path.join(temp_dir, "parallel.txt")
+    _create_pdf(pdf_path, PARALLEL_MIN_PAGES + 17)
+
+    converter = PDFConverter()
+    progress = []
+
+    pdf = converter.read_pdf(pdf_path)
+    try:
+        converter.to_text(pdf, serial_path, max_workers=1)
+        converter.to_text(pdf, parallel_path, progress_callback=progress.append, max_workers=3)
+    finally:
+        pdf.close()
+
+    with open(serial_path, encoding="utf-8") as f:
+        serial_text = f.read()
+    with open(parallel_path, encoding="utf-8") as f:
+        parallel_text = f.read()
+
+    assert parallel_text == serial_text
+    assert serial_text.count("-" * 80) == PARALLEL_MIN_PAGES + 16
+    assert serial_text.index("Page 2 content") < serial_text.index("Page 70 content")
+
+    # 进度回调保持单调递增并以 100 结束
+    assert progress == sorted(progress)
+    assert progress[-1] == 100
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+测试 PDF 转 Word 时图片直接以内存流写入文档
+"""
+
+import io
+import os
+import sys
+import tempfile
+
+# 将项目根目录加入 Python 路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fitz
+from docx import Document
+from PIL import Image
+from src.core.pdf.pdf_converter import PDFConverter
+
+
+def _create_pdf_with_images(path, page_count):
+    """生成每页包含一张不同图片的测试 PDF"""
+    pdf = fitz.open()
+    for i in range(page_count):
+        buffer = io.BytesIO()
+        Image.new("RGB", (40, 30), (i * 40 % 256, 80, 160)).save(buffer, format="PNG")
+        page = pdf.new_page()
+        page.insert_text((72, 72), f"Page {i + 1}")
+        page.insert_image(fitz.Rect(72, 100, 232, 220), stream=buffer.getvalue())
+    pdf.save(path)
+    pdf.close()
+
+
+def test_to_word_without_image_files():
+    """不另存图片文件时，Word 中仍包含全部图片且不创建图片目录"""
+    temp_dir = tempfile.mkdtemp()
+    pdf_path = os.path.join(temp_dir, "sample.pdf")
+    output_path = os.path.join(temp_dir, "sample.docx")
+    _create_pdf_with_images(pdf_path, 3)
+
+    converter = PDFConverter()
+    pdf = converter.read_pdf(pdf_path)
+    try:
+        assert converter.to_word(pdf, output_path, save_image_files=False) is True
+    finally:
+        pdf.close()
+
+    assert not os.path.exists(os.path.join(temp_dir, "sample_images"))
+    doc = Document(output_path)
+    assert len(doc.inline_shapes) == 3
+    assert "Page 3" in "\n".join(p.text for p in doc.paragraphs)
+
+
+def test_to_word_saves_image_files_by_default():
+    """默认仍然把图片另存到 _images 目录"""
+    temp_dir = tempfile.mkdtemp()
+    pdf_path = os.path.join(temp_dir, "sample.pdf")
+    output_path = os.path.join(temp_dir, "sample.docx")
+    _create_pdf_with_images(pdf_path, 2)
+
+    converter = PDFConverter()
+    pdf = converter.read_pdf(pdf_path)
+    try:
+        converter.to_word(pdf, output_path)
+    finally:
+        pdf.close()
+
+    image_files = sorted(os.listdir(os.path.join(temp_dir, "sample_images")))
+    assert image_files == ["page1_img1.png", "page2_img1.png"]
+    assert len(Document(output_path).inline_shapes) == 2
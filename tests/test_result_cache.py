@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+测试转换结果缓存：命中复制、选项和规则参与缓存键、按使用时间清理
+"""
+
+import os
+import sys
+import time
+import tempfile
+
+# 将项目根目录加入 Python 路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import openpyxl
+from src.core.batch.batch_scheduler import BatchScheduler, get_output_path
+from src.core.cache.result_cache import ResultCache
+from src.core.excel.excel_converter import ExcelConverter
+from src.core.text.text_processor import TextProcessor
+
+
+def _run(scheduler, inputs, output_dir):
+    os.makedirs(output_dir, exist_ok=True)
+    jobs = [(path, get_output_path(path, output_dir, scheduler.conversion_type, scheduler.options))
+            for path in inputs]
+    results = []
+    scheduler.run(jobs, result_callback=lambda index, success, message: results.append(message))
+    return jobs, results
+
+
+def test_second_run_is_served_from_cache():
+    """相同内容的文件第二次转换直接复制缓存的结果"""
+    temp_dir = tempfile.mkdtemp()
+    input_path = os.path.join(temp_dir, "note.txt")
+    with open(input_path, "w", encoding="utf-8") as f:
+        f.write("苹果和香蕉\n")
+
+    cache = ResultCache(os.path.join(temp_dir, "cache"))
+    processor = TextProcessor()
+    processor.set_replace_rules("苹果->apple")
+    scheduler = BatchScheduler(processor, "text_batch_replace", {}, 1, cache)
+
+    jobs, results = _run(scheduler, [input_path], os.path.join(temp_dir, "out1"))
+    assert results == ["成功"]
+
+    jobs, results = _run(scheduler, [input_path], os.path.join(temp_dir, "out2"))
+    assert results == ["成功（缓存）"]
+    with open(jobs[0][1], encoding="utf-8") as f:
+        assert f.read() == "apple和香蕉\n"
+    assert cache.get_stats()["hits"] == 1
+
+    # 替换规则变化后缓存键不同，重新转换
+    processor.set_replace_rules("香蕉->banana")
+    jobs, results = _run(scheduler, [input_path], os.path.join(temp_dir, "out3"))
+    assert results == ["成功"]
+    with open(jobs[0][1], encoding="utf-8") as f:
+        assert f.read() == "苹果和banana\n"
+
+
+def test_options_and_content_change_the_key():
+    """输入内容或转换选项不同时缓存键不同"""
+    temp_dir = tempfile.mkdtemp()
+    input_path = os.path.join(temp_dir, "a.txt")
+    with open(input_path, "w", encoding="utf-8") as f:
+        f.write("hello")
+
+    cache = ResultCache(os.path.join(temp_dir, "cache"))
+    processor = TextProcessor()
+    output_path = os.path.join(temp_dir, "a.txt.out")
+    key = cache.make_key(processor, "text_encoding_convert", input_path, output_path, {"target_encoding": "UTF-8"})
+    assert key == cache.make_key(processor, "text_encoding_convert", input_path, output_path,
+                                 {"target_encoding": "UTF-8"})
+    assert key != cache.make_key(processor, "text_encoding_convert", input_path, output_path,
+                                 {"target_encoding": "GBK"})
+
+    time.sleep(0.01)
+    with open(input_path, "w", encoding="utf-8") as f:
+        f.write("world")
+    assert key != cache.make_key(processor, "text_encoding_convert", input_path, output_path,
+                                 {"target_encoding": "UTF-8"})
+
+
+def test_eviction_removes_least_recently_used_entries():
+    """总大小超过上限时先清理最久未使用的条目，附属目录一起缓存和恢复"""
+    temp_dir = tempfile.mkdtemp()
+    cache = ResultCache(os.path.join(temp_dir, "cache"), max_size=2500)
+
+    keys = []
+    for i in range(3):
+        output_path = os.path.join(temp_dir, f"doc{i}.md")
+        with open(output_path, "wb") as f:
+            f.write(b"x" * 1000)
+        os.makedirs(os.path.join(temp_dir, f"doc{i}_images"))
+        with open(os.path.join(temp_dir, f"doc{i}_images", "1.png"), "wb") as f:
+            f.write(b"p")
+        keys.append(f"{i:064d}")
+        assert cache.store(keys[-1], output_path)
+        # 确保使用时间不同
+        entry = cache.cache_dir / keys[-1][:2] / keys[-1]
+        os.utime(entry, (time.time() - 100 + i, time.time() - 100 + i))
+
+        if i == 1:
+            # 访问第一个条目，使其成为最近使用的条目
+            assert cache.restore(keys[0], os.path.join(temp_dir, "restored", "doc0.md"))
+
+    assert cache.get_stats()["evictions"] == 1
+    assert not cache.restore(keys[1], os.path.join(temp_dir, "restored", "doc1.md"))
+    assert cache.restore(keys[2], os.path.join(temp_dir, "restored", "doc2.md"))
+    assert os.path.exists(os.path.join(temp_dir, "restored", "doc2_images", "1.png"))
+
+
+def test_multi_sheet_outputs_cached():
+    """多工作表Excel转Markdown的各工作表文件一起缓存和恢复"""
+    temp_dir = tempfile.mkdtemp()
+    input_path = os.path.join(temp_dir, "book.xlsx")
+    workbook = openpyxl.Workbook()
+    workbook.active.title = "甲"
+    workbook.active.append(["a", 1])
+    workbook.create_sheet("乙").append(["b", 2])
+    workbook.save(input_path)
+
+    cache = ResultCache(os.path.join(temp_dir, "cache"))
+    scheduler = BatchScheduler(ExcelConverter(), "excel_to_markdown", {}, 1, cache)
+    jobs, results = _run(scheduler, [input_path], os.path.join(temp_dir, "out1"))
+    assert results == ["成功"]
+    assert cache.get_stats()["stores"] == 1
+
+    jobs, results = _run(scheduler, [input_path], os.path.join(temp_dir, "out2"))
+    assert results == ["成功（缓存）"]
+    assert sorted(os.listdir(os.path.join(temp_dir, "out2"))) == ["book-乙.md", "book-甲.md"]
+    with open(os.path.join(temp_dir, "out1", "book-乙.md"), encoding="utf-8") as f:
+        expected = f.read()
+    with open(os.path.join(temp_dir, "out2", "book-乙.md"), encoding="utf-8") as f:
+        assert f.read() == expected
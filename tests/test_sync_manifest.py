@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+测试增量同步：只转换新增或修改的文件，删除已删除文件的输出
+"""
+
+import os
+import sys
+import time
+import tempfile
+from unittest import mock
+
+# 将项目根目录加入 Python 路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import openpyxl
+from src.core.batch.batch_scheduler import BatchScheduler, get_output_path
+from src.core.batch.sync_manifest import SKIPPED_MESSAGE, SyncManifest
+from src.core.excel.excel_converter import ExcelConverter
+from src.core.text.text_processor import TextProcessor
+
+
+def _write(path, text):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def _sync(input_dir, output_dir, options=None, roots=None):
+    """按目录中当前的文件执行一次同步，返回 (文件名 -> 消息, 清单)"""
+    files = sorted(os.path.join(input_dir, name) for name in os.listdir(input_dir))
+    jobs = [(path, get_output_path(path, output_dir, "text_to_html")) for path in files]
+    manifest = SyncManifest(output_dir, "text_to_html", options, roots)
+    scheduler = BatchScheduler(TextProcessor(), "text_to_html", options, 1, manifest=manifest)
+
+    messages = {}
+    scheduler.run(jobs, result_callback=lambda index, success, message:
+                  messages.__setitem__(os.path.basename(jobs[index][0]), message))
+    return messages, manifest
+
+
+def test_sync_converts_only_changes_and_prunes_deleted():
+    """第二次同步跳过未变化的文件，修改的重新转换，删除的清理输出"""
+    temp_dir = tempfile.mkdtemp()
+    input_dir = os.path.join(temp_dir, "in")
+    output_dir = os.path.join(temp_dir, "out")
+    os.makedirs(input_dir)
+    os.makedirs(output_dir)
+    for name in ("a", "b", "c", "d"):
+        _write(os.path.join(input_dir, f"{name}.txt"), f"text {name}")
+
+    messages, manifest = _sync(input_dir, output_dir)
+    assert set(messages.values()) == {"成功"}
+    assert len(manifest.converted) == 4
+
+    # a 未变化；b 内容修改；c 只更新修改时间；d 删除；e 新增
+    _write(os.path.join(input_dir, "b.txt"), "text b changed")
+    later = time.time() + 10
+    os.utime(os.path.join(input_dir, "c.txt"), (later, later))
+    os.remove(os.path.join(input_dir, "d.txt"))
+    _write(os.path.join(input_dir, "e.txt"), "text e")
+
+    messages, manifest = _sync(input_dir, output_dir)
+    assert messages == {
+        "a.txt": SKIPPED_MESSAGE,
+        "b.txt": "成功",
+        "c.txt": SKIPPED_MESSAGE,
+        "e.txt": "成功",
+    }
+    assert manifest.pruned == [os.path.join(output_dir, "d.html")]
+    assert not os.path.exists(os.path.join(output_dir, "d.html"))
+    with open(os.path.join(output_dir, "b.html"), encoding="utf-8") as f:
+        assert "text b changed" in f.read()
+
+    # 清单已更新修改时间，第三次同步全部跳过且不再计算哈希
+    messages, manifest = _sync(input_dir, output_dir)
+    assert set(messages.values()) == {SKIPPED_MESSAGE}
+
+
+def test_sync_reconverts_when_output_missing_or_options_change():
+    """输出被删除或转换选项变化时重新转换"""
+    temp_dir = tempfile.mkdtemp()
+    input_dir = os.path.join(temp_dir, "in")
+    output_dir = os.path.join(temp_dir, "out")
+    os.makedirs(input_dir)
+    os.makedirs(output_dir)
+    _write(os.path.join(input_dir, "a.txt"), "text a")
+
+    _sync(input_dir, output_dir)
+    os.remove(os.path.join(output_dir, "a.html"))
+    messages, _ = _sync(input_dir, output_dir)
+    assert messages == {"a.txt": "成功"}
+
+    messages, _ = _sync(input_dir, output_dir, {"title": "changed"})
+    assert messages == {"a.txt": "成功"}
+
+
+def test_sync_reconverts_when_converter_version_changes():
+    """转换器的 CACHE_VERSION 与清单中记录的不同时重新转换"""
+    temp_dir = tempfile.mkdtemp()
+    input_dir = os.path.join(temp_dir, "in")
+    output_dir = os.path.join(temp_dir, "out")
+    os.makedirs(input_dir)
+    os.makedirs(output_dir)
+    _write(os.path.join(input_dir, "a.txt"), "text a")
+
+    _, manifest = _sync(input_dir, output_dir)
+    entry = manifest.entries[os.path.abspath(os.path.join(input_dir, "a.txt"))]
+    assert entry["converter"] == "TextProcessor"
+    assert entry["converter_version"] == TextProcessor.CACHE_VERSION
+
+    with mock.patch.object(TextProcessor, "CACHE_VERSION", TextProcessor.CACHE_VERSION + 1):
+        messages, _ = _sync(input_dir, output_dir)
+        assert messages == {"a.txt": "成功"}
+        messages, _ = _sync(input_dir, output_dir)
+        assert messages == {"a.txt": SKIPPED_MESSAGE}
+
+
+def test_prune_limited_to_scanned_roots():
+    """只删除本次扫描范围内已删除文件的输出，同一输出目录中其他输入目录的输出保留"""
+    temp_dir = tempfile.mkdtemp()
+    output_dir = os.path.join(temp_dir, "out")
+    os.makedirs(output_dir)
+    input_dirs = {}
+    for name in ("a", "b"):
+        input_dirs[name] = os.path.join(temp_dir, name)
+        os.makedirs(input_dirs[name])
+        _write(os.path.join(input_dirs[name], f"{name}1.txt"), f"text {name}1")
+        _write(os.path.join(input_dirs[name], f"{name}2.txt"), f"text {name}2")
+        _sync(input_dirs[name], output_dir)
+
+    # 目录 a 暂时不可用，同步目录 b 时不删除 a 的输出
+    os.rename(input_dirs["a"], input_dirs["a"] + ".offline")
+    os.remove(os.path.join(input_dirs["b"], "b2.txt"))
+    _, manifest = _sync(input_dirs["b"], output_dir)
+    assert manifest.pruned == [os.path.join(output_dir, "b2.html")]
+    _, manifest = _sync(input_dirs["b"], output_dir, roots=[input_dirs["b"]])
+    assert manifest.pruned == []
+    assert os.path.exists(os.path.join(output_dir, "a1.html"))
+    assert os.path.exists(os.path.join(output_dir, "a2.html"))
+
+    # 扫描范围包含 a 时删除
+    _, manifest = _sync(input_dirs["b"], output_dir, roots=[temp_dir])
+    assert sorted(manifest.pruned) == [os.path.join(output_dir, f"a{i}.html") for i in (1, 2)]
+
+
+def test_sync_multi_sheet_excel_outputs():
+    """多工作表Excel转Markdown只写出各工作表的文件，同步时检查和删除这些文件"""
+    temp_dir = tempfile.mkdtemp()
+    input_dir = os.path.join(temp_dir, "in")
+    output_dir = os.path.join(temp_dir, "out")
+    os.makedirs(input_dir)
+    os.makedirs(output_dir)
+    for name, sheet_names in (("book", ["甲", "乙"]), ("single", ["表"])):
+        workbook = openpyxl.Workbook()
+        workbook.active.title = sheet_names[0]
+        for sheet_name in sheet_names[1:]:
+            workbook.create_sheet(sheet_name)
+        for sheet in workbook.worksheets:
+            sheet.append([sheet.title, 1])
+        workbook.save(os.path.join(input_dir, f"{name}.xlsx"))
+
+    def sync():
+        files = sorted(os.path.join(input_dir, name) for name in os.listdir(input_dir))
+        jobs = [(path, get_output_path(path, output_dir, "excel_to_markdown")) for path in files]
+        manifest = SyncManifest(output_dir, "excel_to_markdown")
+        scheduler = BatchScheduler(ExcelConverter(), "excel_to_markdown", {}, 1, manifest=manifest)
+        messages = []
+        scheduler.run(jobs, result_callback=lambda index, success, message: messages.append(message))
+        return messages, manifest
+
+    sheet_outputs = [os.path.join(output_dir, name) for name in ("book-甲.md", "book-乙.md")]
+    messages, _ = sync()
+    assert messages == ["成功", "成功"]
+    assert not os.path.exists(os.path.join(output_dir, "book.md"))
+    assert all(os.path.exists(path) for path in sheet_outputs)
+
+    messages, _ = sync()
+    assert messages == [SKIPPED_MESSAGE, SKIPPED_MESSAGE]
+
+    # 任一工作表的输出缺失时重新转换
+    os.remove(sheet_outputs[1])
+    messages, _ = sync()
+    assert messages == ["成功", SKIPPED_MESSAGE]
+    assert os.path.exists(sheet_outputs[1])
+
+    os.remove(os.path.join(input_dir, "book.xlsx"))
+    _, manifest = sync()
+    assert manifest.pruned == sheet_outputs
+    assert not any(os.path.exists(path) for path in sheet_outputs)
+    assert os.path.exists(os.path.join(output_dir, "single.md"))
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+测试批量替换规则的一次扫描替换和跨块匹配
+"""
+
+import os
+import sys
+import random
+
+# 将项目根目录加入 Python 路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.text.replace_rules import ReplaceRule, ReplaceRuleSet, compile_rules
+
+
+def _reference_replace(text, rules):
+    """逐个位置查找最长匹配的参考实现"""
+    replacements = {}
+    for source, target in rules:
+        replacements.setdefault(source, target)
+    result = []
+    i = 0
+    while i < len(text):
+        match = max((s for s in replacements if text.startswith(s, i)), key=len, default=None)
+        if match:
+            result.append(replacements[match])
+            i += len(match)
+        else:
+            result.append(text[i])
+            i += 1
+    return "".join(result)
+
+
+def test_leftmost_longest_without_chaining():
+    """同一位置优先使用最长的规则，替换结果不再被替换"""
+    rule_set = ReplaceRuleSet([
+        ("ab", "1"), ("abcd", "2"), ("abc", "3"), ("苹果", "apple"), ("apple", "APPLE"), ("ab", "x")
+    ])
+
+    assert rule_set.replace("abcx abcd ab a") == "3x 2 1 a"
+    assert rule_set.replace("苹果 apple") == "apple APPLE"
+
+
+def test_chunks_match_whole_text():
+    """任意切分文本块，结果与整体替换相同"""
+    random.seed(7)
+    alphabet = "abc苹果"
+    rules = [("".join(random.choice(alphabet) for _ in range(random.randint(1, 5))), str(i))
+             for i in range(40)]
+    rule_set = ReplaceRuleSet(rules)
+
+    for _ in range(50):
+        text = "".join(random.choice(alphabet + "x") for _ in range(300))
+        cuts = sorted(random.sample(range(1, len(text)), 30))
+        chunks = [text[start:end] for start, end in zip([0] + cuts, cuts + [len(text)])]
+
+        expected = _reference_replace(text, rules)
+        assert rule_set.replace(text) == expected
+        assert "".join(rule_set.replace_chunks(chunks)) == expected
+
+
+def test_regex_rules_and_hit_counts():
+    """正则规则支持分组引用，逐行匹配，并统计每条规则的命中次数"""
+    rules_text = "苹果->apple\nre:(\\d+)元->\\1 CNY\n\nre:^#+\\s*->标题：\n无效规则"
+    rule_set = compile_rules(rules_text)
+    rule_set.reset_hits()
+
+    assert len(rule_set) == 3
+    chunks = ["# 苹果 12", "元\n#  价格 3元\n", "苹", "果"]
+    assert "".join(rule_set.replace_chunks(chunks)) == "标题：apple 12 CNY\n标题：价格 3 CNY\napple"
+
+    regex_rule = ReplaceRule("(\\d+)元", "\\1 CNY", True)
+    assert rule_set.hits[regex_rule] == 2
+    assert rule_set.top_rules(1) == [(ReplaceRule("苹果", "apple", False), 2)]
+
+
+def test_rule_sets_cached_by_text():
+    """相同的规则文本返回同一个规则集，规则集可以按内容比较"""
+    first = compile_rules("a->b\nre:x+->y")
+    assert compile_rules("a->b\nre:x+->y") is first
+    assert first == ReplaceRuleSet([ReplaceRule("a", "b", False), ReplaceRule("x+", "y", True)])
+    assert len({first, ReplaceRuleSet(first.rules)}) == 1
+
+
+def test_regex_rules_match_within_lines():
+    """跨行的正则规则不匹配，整体替换与任意切分的文本块结果相同"""
+    rule_set = ReplaceRuleSet([ReplaceRule("a\\n\\nb", "X", True), ReplaceRule("b$", "B", True)])
+    text = "a\n\nb\nab\n"
+    expected = "a\n\nB\naB\n"
+
+    assert rule_set.replace(text) == expected
+    for cut in range(1, len(text)):
+        assert "".join(rule_set.replace_chunks([text[:cut], text[cut:]])) == expected
+    assert "".join(rule_set.replace_chunks(["a\n", "\nb"])) == rule_set.replace("a\n\nb") == "a\n\nB"
+
+
+def test_invalid_regex_replacement():
+    """替换文本引用不存在的分组时，编译规则集即报错"""
+    for rules_text in ("re:a->\\3", "re:(a->b"):
+        try:
+            compile_rules(rules_text)
+        except Exception as e:
+            assert "替换规则中的正则表达式无效" in str(e)
+        else:
+            assert False, "应当报错"
@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+测试文本处理按块流式读写，结果与整体处理一致
+"""
+
+import os
+import sys
+import tempfile
+
+# 将项目根目录加入 Python 路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.text import text_processor
+from src.core.text.text_processor import TextProcessor
+
+
+def _write_bytes(path, data):
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def _read_text(path, encoding="utf-8"):
+    with open(path, encoding=encoding, newline="") as f:
+        return f.read()
+
+
+def test_chunks_split_multibyte_characters_and_lines():
+    """块边界落在多字节字符和行中间时，输出与整体处理相同"""
+    temp_dir = tempfile.mkdtemp()
+    input_path = os.path.join(temp_dir, "input.txt")
+    content = "苹果<香蕉> & 'x'\r\n" * 500
+    _write_bytes(input_path, content.encode("gbk"))
+
+    processor = TextProcessor()
+    processor.set_replace_rules("苹果->apple\napple->APPLE\n香蕉->banana")
+
+    original_chunk_size = text_processor.CHUNK_SIZE
+    original_sample_size = text_processor.DETECT_SAMPLE_SIZE
+    text_processor.CHUNK_SIZE = 7
+    text_processor.DETECT_SAMPLE_SIZE = 64
+    try:
+        processor.convert_encoding(input_path, os.path.join(temp_dir, "out.txt"), "utf-16")
+        processor.text_to_markdown(input_path, os.path.join(temp_dir, "out.md"))
+        processor.text_to_html(input_path, os.path.join(temp_dir, "out.html"))
+        progress = []
+        processor.batch_replace(input_path, os.path.join(temp_dir, "out.rep"), progress.append)
+    finally:
+        text_processor.CHUNK_SIZE = original_chunk_size
+        text_processor.DETECT_SAMPLE_SIZE = original_sample_size
+
+    assert _read_text(os.path.join(temp_dir, "out.txt"), "utf-16") == content
+    assert _read_text(os.path.join(temp_dir, "out.md")) == "# 转换自文本文件\n\n```\n" + content + "\n```\n"
+    html = _read_text(os.path.join(temp_dir, "out.html"))
+    assert "<pre>" + processor._escape_html(content) + "</pre>\n" in html
+    assert _read_text(os.path.join(temp_dir, "out.rep")) == content.replace("苹果", "apple").replace("香蕉", "banana")
+    assert progress[-1] == 100 and progress == sorted(progress)
+
+
+def test_decode_error_after_sample_falls_back():
+    """样本之后出现无法解码的字节时改用下一个编码"""
+    temp_dir = tempfile.mkdtemp()
+    input_path = os.path.join(temp_dir, "input.txt")
+    data = b"plain text\n" * 10000 + b"\xff\xfe tail\n"
+    _write_bytes(input_path, data)
+
+    processor = TextProcessor()
+    output_path = os.path.join(temp_dir, "out.txt")
+    processor.convert_encoding(input_path, output_path, "utf-8")
+
+    assert _read_text(output_path) == data.decode("latin-1")
+
+
+def test_replace_hits_counted_once_after_fallback():
+    """样本之后解码失败重新处理时，替换规则的命中次数只统计成功的一次"""
+    temp_dir = tempfile.mkdtemp()
+    input_path = os.path.join(temp_dir, "input.txt")
+    data = b"apple pie\n" * 10000 + b"\xff apple\n"
+    _write_bytes(input_path, data)
+
+    processor = TextProcessor()
+    processor.set_replace_rules("apple->pear")
+    processor.rule_set.reset_hits()
+    output_path = os.path.join(temp_dir, "out.txt")
+    # 解码失败前已有多个块完成替换
+    original_chunk_size = text_processor.CHUNK_SIZE
+    text_processor.CHUNK_SIZE = 4096
+    try:
+        processor.batch_replace(input_path, output_path)
+    finally:
+        text_processor.CHUNK_SIZE = original_chunk_size
+
+    assert _read_text(output_path) == data.decode("latin-1").replace("apple", "pear")
+    assert processor.rule_set.top_rules(1)[0][1] == 10001
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+测试Word转Markdown/HTML时导出图片并生成实际链接
+"""
+
+import os
+import sys
+import tempfile
+
+# 将项目根目录加入 Python 路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx import Document
+from docx.shared import Inches
+from PIL import Image
+from src.core.word.word_converter import WordConverter
+
+
+def _create_document(temp_dir):
+    red_path = os.path.join(temp_dir, "red.png")
+    blue_path = os.path.join(temp_dir, "blue.jpg")
+    Image.new("RGB", (40, 20), (255, 0, 0)).save(red_path)
+    Image.new("RGB", (20, 40), (0, 0, 255)).save(blue_path)
+
+    doc = Document()
+    doc.add_paragraph("图片前")
+    doc.add_picture(red_path, width=Inches(1))
+    table = doc.add_table(rows=1, cols=1)
+    table.cell(0, 0).text = "表格"
+    doc.add_picture(blue_path, width=Inches(1))
+    # 同一图片再次出现
+    doc.add_picture(red_path, width=Inches(1))
+
+    input_path = os.path.join(temp_dir, "input.docx")
+    doc.save(input_path)
+    return input_path
+
+
+def test_markdown_exports_each_image_once():
+    """每张图片只导出一次，Markdown中链接到导出的文件，与python-docx路径结果相同"""
+    temp_dir = tempfile.mkdtemp()
+    input_path = _create_document(temp_dir)
+    converter = WordConverter()
+
+    outputs = []
+    for fast in (True, False):
+        output_path = os.path.join(temp_dir, f"输出 {fast}", "result.md")
+        os.makedirs(os.path.dirname(output_path))
+        converter.save_as_markdown(converter.read_word(input_path, fast=fast), output_path, max_workers=4)
+
+        images_dir = os.path.join(os.path.dirname(output_path), "result_images")
+        names = sorted(os.listdir(images_dir))
+        assert len(names) == 2
+        with Image.open(os.path.join(images_dir, names[0])) as image:
+            assert image.size in ((40, 20), (20, 40))
+
+        with open(output_path, "r", encoding="utf-8") as f:
+            outputs.append(f.read())
+    assert outputs[0] == outputs[1]
+
+    markdown = outputs[0]
+    links = [line for line in markdown.splitlines() if line.startswith("![")]
+    assert len(links) == 3
+    assert links[0] == links[2]
+    assert links[0].endswith(".png)") and links[1].endswith((".jpg)", ".jpeg)"))
+    assert all("](result_images/" in link for link in links)
+    assert "image_path" not in markdown
+    # 图片和表格保持文档顺序
+    assert markdown.index("图片前") < markdown.index(links[0]) < markdown.index("| 表格 |") < markdown.index(links[1])
+
+
+def test_html_links_and_disabled_images():
+    """HTML中链接到导出的图片，不包含图片时不创建图片目录"""
+    temp_dir = tempfile.mkdtemp()
+    input_path = _create_document(temp_dir)
+    converter = WordConverter()
+
+    output_path = os.path.join(temp_dir, "my doc.html")
+    converter.save_as_html(converter.read_word(input_path), output_path)
+    with open(output_path, "r", encoding="utf-8") as f:
+        content = f.read()
+    assert content.count('<img src="my%20doc_images/') == 3
+    assert len(os.listdir(os.path.join(temp_dir, "my doc_images"))) == 2
+
+    output_path = os.path.join(temp_dir, "plain.md")
+    converter.save_as_markdown(converter.read_word(input_path), output_path, include_images=False)
+    assert not os.path.exists(os.path.join(temp_dir, "plain_images"))
+    with open(output_path, "r", encoding="utf-8") as f:
+        assert "![" not in f.read()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+测试在压缩包层面移除Word文档中的图片
+"""
+
+import os
+import sys
+import zipfile
+import tempfile
+
+# 将项目根目录加入 Python 路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx import Document
+from docx.shared import Inches
+from PIL import Image
+from src.core.word.word_converter import WordConverter
+
+
+def _create_document(temp_dir):
+    image_path = os.path.join(temp_dir, "noise.png")
+    Image.effect_noise((300, 300), 64).convert("RGB").save(image_path)
+
+    doc = Document()
+    doc.add_paragraph("图片前")
+    doc.add_picture(image_path, width=Inches(2))
+    doc.add_paragraph("图片后")
+    table = doc.add_table(rows=1, cols=2)
+    table.cell(0, 0).text = "表格"
+    table.cell(0, 1).paragraphs[0].add_run().add_picture(image_path, width=Inches(1))
+    doc.sections[0].header.paragraphs[0].add_run("页眉").add_picture(image_path, width=Inches(0.5))
+
+    input_path = os.path.join(temp_dir, "input.docx")
+    doc.save(input_path)
+    return input_path
+
+
+def test_remove_images_drops_media_and_keeps_text():
+    """移除正文、表格和页眉中的图片，删除图片部件，文本保持不变"""
+    temp_dir = tempfile.mkdtemp()
+    input_path = _create_document(temp_dir)
+    output_path = os.path.join(temp_dir, "output.docx")
+
+    progress = []
+    assert WordConverter().remove_images(input_path, output_path, progress_callback=progress.append)
+    assert progress[-1] == 100
+
+    with zipfile.ZipFile(output_path) as package:
+        assert package.testzip() is None
+        names = package.namelist()
+        assert not [name for name in names if name.startswith("word/media/")]
+        for name in names:
+            if name.endswith(".xml") or name.endswith(".rels"):
+                content = package.read(name).decode("utf-8")
+                assert "w:drawing" not in content
+                assert "relationships/image" not in content
+
+        # 未修改的部件按原数据复制
+        with zipfile.ZipFile(input_path) as original:
+            assert package.read("word/styles.xml") == original.read("word/styles.xml")
+            assert package.getinfo("word/styles.xml").compress_size == \
+                original.getinfo("word/styles.xml").compress_size
+
+    assert os.path.getsize(output_path) < os.path.getsize(input_path)
+
+    doc = Document(output_path)
+    assert [p.text for p in doc.paragraphs] == ["图片前", "", "图片后"]
+    assert doc.tables[0].cell(0, 0).text == "表格"
+    assert doc.sections[0].header.paragraphs[0].text == "页眉"
+
+
+def test_remove_images_same_text_as_python_docx_path():
+    """两种方式移除图片后文档文本相同"""
+    temp_dir = tempfile.mkdtemp()
+    input_path = _create_document(temp_dir)
+    converter = WordConverter()
+
+    texts = []
+    for fast in (True, False):
+        output_path = os.path.join(temp_dir, f"output_{fast}.docx")
+        converter.remove_images(input_path, output_path, fast=fast)
+        texts.append([p.text for p in Document(output_path).paragraphs])
+    assert texts[0] == texts[1]
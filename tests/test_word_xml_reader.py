@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+测试Word文档XML流式读取：与python-docx结果一致，并按文档顺序输出段落和表格
+"""
+
+import os
+import sys
+import tempfile
+
+# 将项目根目录加入 Python 路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx import Document
+from docx.oxml import OxmlElement
+from src.core.word.word_converter import WordConverter
+from src.core.word.word_xml_reader import WordParagraph, WordTable, WordXmlDocument
+
+
+def _create_document(path):
+    doc = Document()
+    doc.add_heading("标题一", level=1)
+    doc.add_paragraph("第一段")
+
+    table = doc.add_table(rows=3, cols=3)
+    table.cell(0, 0).text = "姓名"
+    table.cell(0, 1).text = "年龄"
+    table.cell(0, 2).text = "城市"
+    table.cell(1, 0).merge(table.cell(2, 0)).text = "张三"
+    table.cell(1, 1).merge(table.cell(1, 2)).text = "合并"
+    table.cell(2, 1).text = "20"
+    table.cell(2, 2).text = "北京"
+
+    doc.add_heading("标题二", level=2)
+    paragraph = doc.add_paragraph("制表")
+    run = paragraph.add_run()
+    run.add_tab()
+    run.add_text("换行")
+    run.add_break()
+    run.add_text("结束")
+
+    # 超链接中的文字
+    hyperlink = OxmlElement("w:hyperlink")
+    link_run = OxmlElement("w:r")
+    link_text = OxmlElement("w:t")
+    link_text.text = "链接"
+    link_run.append(link_text)
+    hyperlink.append(link_run)
+    paragraph._p.append(hyperlink)
+
+    doc.save(path)
+
+
+def test_fast_reader_matches_python_docx():
+    """两种读取方式得到相同的段落和表格"""
+    temp_dir = tempfile.mkdtemp()
+    input_path = os.path.join(temp_dir, "input.docx")
+    _create_document(input_path)
+
+    converter = WordConverter()
+    fast_blocks = [block for block, _ in converter.iter_blocks(converter.read_word(input_path))]
+    docx_blocks = [block for block, _ in converter.iter_blocks(converter.read_word(input_path, fast=False))]
+    assert fast_blocks == docx_blocks
+
+    # 段落和表格按文档顺序交替出现
+    assert [type(block) for block in fast_blocks] == [
+        WordParagraph, WordParagraph, WordTable, WordParagraph, WordParagraph
+    ]
+    assert fast_blocks[0].style == "Heading 1"
+    assert fast_blocks[3].style == "Heading 2"
+    assert [block.level for block in fast_blocks if isinstance(block, WordParagraph)] == [1, 0, 2, 0]
+    assert fast_blocks[4].text == "制表\t换行\n结束链接"
+    assert fast_blocks[2].rows == [
+        ["姓名", "年龄", "城市"],
+        ["张三", "合并", "合并"],
+        ["张三", "20", "北京"],
+    ]
+
+    # 与python-docx的段落和表格范围一致
+    doc = Document(input_path)
+    assert [block.text for block in fast_blocks if isinstance(block, WordParagraph)] == \
+        [paragraph.text for paragraph in doc.paragraphs]
+
+
+def test_save_outputs_identical_and_in_document_order():
+    """文本、Markdown、HTML输出与python-docx路径相同，表格位于前后段落之间"""
+    temp_dir = tempfile.mkdtemp()
+    input_path = os.path.join(temp_dir, "input.docx")
+    _create_document(input_path)
+    converter = WordConverter()
+
+    for method, extension in (
+        (converter.save_as_text, "txt"),
+        (converter.save_as_markdown, "md"),
+        (converter.save_as_html, "html"),
+    ):
+        outputs = []
+        for fast in (True, False):
+            output_path = os.path.join(temp_dir, f"output_{fast}.{extension}")
+            progress = []
+            assert method(converter.read_word(input_path, fast=fast), output_path,
+                          progress_callback=progress.append)
+            assert progress[-1] == 100
+            with open(output_path, "r", encoding="utf-8") as f:
+                outputs.append(f.read())
+        assert outputs[0] == outputs[1]
+
+    with open(os.path.join(temp_dir, "output_True.md"), "r", encoding="utf-8") as f:
+        markdown = f.read()
+    assert markdown.index("第一段") < markdown.index("| 姓名 | 年龄 | 城市 |") < markdown.index("## 标题二")
+    assert markdown.startswith("# 标题一")
+
+
+def test_unknown_style_uses_default_style():
+    """未设置或不存在的样式ID使用默认段落样式"""
+    temp_dir = tempfile.mkdtemp()
+    input_path = os.path.join(temp_dir, "input.docx")
+    Document().save(input_path)
+
+    doc = WordXmlDocument(input_path)
+    assert doc.style_name(None) == "Normal"
+    assert doc.style_name("NotExists") == "Normal"